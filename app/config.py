@@ -5,7 +5,7 @@ from typing import Literal
 
 class Settings(BaseSettings):
     # LLM Provider settings
-    llm_provider: Literal["anthropic", "openai", "google", "groq", "together"] = "together"
+    llm_provider: Literal["anthropic", "openai", "google", "groq", "together", "mock"] = "together"
     llm_model: str = "meta-llama/Llama-3.3-70B-Instruct-Turbo"
 
     # API Keys for different providers
@@ -15,25 +15,155 @@ class Settings(BaseSettings):
     groq_api_key: str = ""
     together_api_key: str = ""
 
+    # Provider pool: providers tried in order (default: just llm_provider), and
+    # the model for each (JSON, e.g. {"groq": "llama-3.3-70b-versatile"}; unlisted
+    # providers use llm_model). Providers without an API key are skipped.
+    llm_providers: list[str] = []
+    llm_models: dict[str, str] = {}
+    # Circuit breaker: consecutive failures before a provider is skipped, and
+    # seconds before it gets a trial request again
+    llm_circuit_failures: int = 5
+    llm_circuit_cooldown: float = 30.0
+    # Hedging: when the first provider has not answered after the delay (seconds;
+    # unset = its observed p95 latency), send the prompt to the next one as well
+    llm_hedge: bool = False
+    llm_hedge_delay: float | None = None
+
+    # Mock provider (llm_provider = "mock") for offline load tests: median latency
+    # (ms), its distribution and spread (lognormal sigma, or +/- fraction for
+    # uniform), injected failure and malformed-JSON rates, and the random seed.
+    # With a cassette directory, recorded responses are replayed (latency scaled
+    # by mock_replay_speed); mock_record saves real provider responses there.
+    mock_latency_ms: float = 800.0
+    mock_latency_distribution: Literal["fixed", "uniform", "lognormal"] = "lognormal"
+    mock_latency_spread: float = 0.5
+    mock_error_rate: float = 0.0
+    mock_malformed_rate: float = 0.0
+    mock_seed: int = 0
+    mock_cassette_dir: Path | None = None
+    mock_record: bool = False
+    mock_replay_speed: float = 1.0
+
+    # Shared provider HTTP clients: connection pool size and timeouts (seconds)
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_connect_timeout: float = 10.0
+    llm_request_timeout: float = 120.0
+
+    # Provider throttling: per-provider requests and estimated prompt tokens per
+    # minute (JSON objects, e.g. {"groq": 30}; unset = unlimited), ceiling for the
+    # adaptive concurrency cap, and retries with exponential backoff (seconds)
+    llm_requests_per_minute: dict[str, int] = {}
+    llm_tokens_per_minute: dict[str, int] = {}
+    llm_max_concurrency: int = 16
+    llm_max_retries: int = 5
+    llm_retry_base_delay: float = 1.0
+    llm_retry_max_delay: float = 60.0
+
+    # LLM response cache: in-memory LRU in front of a size- and TTL-bounded disk tier
+    llm_cache_enabled: bool = True
+    llm_cache_dir: Path = Path(__file__).parent.parent / "data" / "llm_cache"
+    llm_cache_memory_entries: int = 256
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+    llm_cache_ttl_hours: float = 30 * 24
+
+    # Near-duplicate papers (off by default): a paper whose title and abstract
+    # are at least this similar (estimated Jaccard of word 3-grams) to a stored
+    # assessment scored with the same axes reuses its scores, category and
+    # recommendations without any LLM call; only the tier is recomputed
+    duplicate_detection: bool = False
+    duplicate_threshold: float = 0.8
+
+    # Structured output: ask providers for JSON matching a schema built from the
+    # axes (OpenAI/Together JSON schema, Groq/Gemini JSON mode, Anthropic tool use)
+    llm_structured_output: bool = False
+
+    # Prompt budget: scoring prompts over this many (estimated) tokens have the
+    # paper's snippet, then its abstract, cut to fit. Install tiktoken for exact
+    # OpenAI counts; other providers use a fixed characters-per-token ratio.
+    scoring_prompt_max_tokens: int = 6000
+
+    # Category: when the scoring response has none, a local classifier predicts
+    # it; the separate LLM detection call is made only below this confidence.
+    # Train the model with `python -m scripts.train_category_classifier`.
+    category_classifier: bool = True
+    category_min_confidence: float = 0.85
+    category_model_file: Path = Path(__file__).parent.parent / "data" / "category_model.json"
+
+    # Scoring: one prompt for all axes ("single"), or one prompt per axes section
+    # sent concurrently ("sections"). Axes missing or malformed in a response are
+    # re-asked on their own: once in single mode, up to section_max_retries times
+    # per section.
+    scoring_mode: Literal["single", "sections"] = "single"
+    section_max_retries: int = 1
+
+    # POST /api/assess/batch: papers assessed at once, and items per request
+    batch_concurrency: int = 8
+    batch_max_items: int = 500
+
+    # POST /api/assess/jobs: background workers, queue bound, and how long
+    # finished jobs are kept. Job state is persisted in jobs_file; queued and
+    # interrupted jobs are resumed on startup.
+    job_workers: int = 4
+    job_queue_max: int = 1000
+    job_retention_hours: float = 7 * 24
+    jobs_file: Path = Path(__file__).parent.parent / "data" / "jobs.db"
+
     # Data paths
     data_dir: Path = Path(__file__).parent.parent / "data"
     assessments_file: Path = Path(__file__).parent.parent / "data" / "assessments.json"
     axes_file: Path = Path(__file__).parent.parent / "data" / "axes.json"
 
+    # Storage backend for assessments: append-only JSON log (default) or SQLite
+    storage_backend: Literal["json", "sqlite"] = "json"
+    sqlite_file: Path = Path(__file__).parent.parent / "data" / "assessments.db"
+
+    # Append-only assessment log, partitioned by time; segments within a
+    # partition rotate once they reach segment_max_bytes
+    assessments_log_dir: Path = Path(__file__).parent.parent / "data" / "assessments"
+    segment_max_bytes: int = 8 * 1024 * 1024
+    partition_granularity: Literal["year", "month", "day"] = "month"
+
+    # Record encoding and block compression for new log segments (orjson,
+    # msgpack and zstd need their optional packages); compacted partitions
+    # are always compressed. Existing segments stay readable after a change.
+    storage_codec: Literal["json", "orjson", "msgpack"] = "json"
+    storage_compression: Literal["none", "gzip", "zstd"] = "none"
+    archive_compression: Literal["gzip", "zstd"] = "gzip"
+
+    # Running dashboard totals, kept in step with the store and saved at most
+    # this often (and on shutdown)
+    aggregates_file: Path = Path(__file__).parent.parent / "data" / "dashboard_aggregates.json"
+    aggregates_save_interval_seconds: float = 30.0
+
+    # Group commit: new assessments are flushed together, one fsync per batch
+    write_batch_max_size: int = 64
+    write_batch_max_delay_ms: int = 5
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-    def get_api_key(self) -> str:
-        """Get the API key for the configured provider"""
+    def get_api_key(self, provider: str | None = None) -> str:
+        """Get the API key for a provider (default: the configured one)"""
         keys = {
             "anthropic": self.anthropic_api_key,
             "openai": self.openai_api_key,
             "google": self.google_api_key,
             "groq": self.groq_api_key,
             "together": self.together_api_key,
+            # The mock provider needs no key
+            "mock": "mock",
         }
-        return keys.get(self.llm_provider, "")
+        return keys.get(provider or self.llm_provider, "")
+
+    def get_model(self, provider: str | None = None) -> str:
+        """Get the model for a provider (default: the configured one)"""
+        return self.llm_models.get(provider or self.llm_provider, self.llm_model)
+
+    def get_providers(self) -> list[str]:
+        """Providers in failover order"""
+        return self.llm_providers or [self.llm_provider]
 
 
 settings = Settings()
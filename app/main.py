@@ -1,21 +1,45 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 
+from app.config import settings
 from app.routes import fetch, assess, history, dashboard
+from app.services import storage, aggregates, duplicate_index, job_queue, llm_clients
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services and flush them on shutdown"""
+    llm_clients.start_clients()
+    storage.start_writer()
+    await asyncio.to_thread(storage.warm_record_index)
+    # Validate (or rebuild) the dashboard totals before the first write arrives
+    await asyncio.to_thread(aggregates.get_aggregates)
+    if settings.duplicate_detection:
+        await asyncio.to_thread(duplicate_index.get_duplicate_index)
+    await job_queue.start_workers()
+    yield
+    await job_queue.stop_workers()
+    await storage.stop_writer()
+    await asyncio.to_thread(aggregates.save_aggregates)
+    await llm_clients.close_clients()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="AI Dual-Use Risk Assessor",
     description="Assess research papers for dual-use risks and governance recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Setup templates
@@ -1,10 +1,17 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 import uuid
 
 
+def naive_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, the form timestamps are stored and compared in"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class Dissemination(str, Enum):
     INTERNAL = "Internal only"
     PREPRINT = "Preprint / arXiv only"
@@ -91,6 +98,17 @@ class Assessment(BaseModel):
     tier: Tier
     recommendations: list[str]
     axes_used: Optional[list[AxisInfo]] = None
+    axes_version: Optional[str] = None  # Hash of the axes config used for scoring
+    llm_provider: Optional[str] = None  # Provider(s) and model(s) that produced the scores
+    llm_model: Optional[str] = None
+    prompt_tokens: Optional[int] = None  # Tokens sent and received by this assessment's LLM calls
+    completion_tokens: Optional[int] = None
+    duplicate_of: Optional[str] = None  # Assessment whose scores were reused for a near-duplicate paper
+    duplicate_similarity: Optional[float] = None
+
+    def naive_timestamp(self) -> datetime:
+        """Timestamp as naive UTC (older records may carry an offset)"""
+        return naive_utc(self.timestamp)
 
 
 class AssessmentsStore(BaseModel):
@@ -98,6 +116,44 @@ class AssessmentsStore(BaseModel):
     assessments: list[Assessment] = []
 
 
+class AssessmentPage(BaseModel):
+    """One page of assessments, most recent first"""
+    items: list[Assessment]
+    next_cursor: Optional[str] = None
+
+
+class AssessmentFilters(BaseModel):
+    """Filters for listing stored assessments (None means no filter)"""
+    date_from: Optional[datetime] = None  # inclusive
+    date_to: Optional[datetime] = None  # exclusive
+    category: Optional[str] = None
+    tier: Optional[str] = None
+    dissemination: Optional[str] = None
+    audience: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        """True when no filter is set"""
+        return not any(self.model_dump().values())
+
+    def matches(self, a: Assessment) -> bool:
+        """Check a single assessment against the filters"""
+        ts = a.naive_timestamp()
+        if self.date_from and ts < self.date_from:
+            return False
+        if self.date_to and ts >= self.date_to:
+            return False
+        category = a.input.category.value if a.input.category else None
+        if self.category and category != self.category:
+            return False
+        if self.tier and a.tier.value != self.tier:
+            return False
+        if self.dissemination and a.input.dissemination.value != self.dissemination:
+            return False
+        if self.audience and a.input.audience.value != self.audience:
+            return False
+        return True
+
+
 class URLFetchRequest(BaseModel):
     """Request to fetch and parse a URL"""
     url: str
@@ -121,6 +177,48 @@ class AssessRequest(BaseModel):
     dissemination: Dissemination
     audience: Audience
     # category is auto-detected by LLM, not required from user
+    no_cache: bool = False  # Re-run LLM calls instead of reusing cached responses
+
+
+class BatchAssessRequest(BaseModel):
+    """Several papers to assess in one call"""
+    items: list[AssessRequest]
+    concurrency: Optional[int] = Field(None, ge=1)  # Capped by settings.batch_concurrency
+
+
+class BatchItemResult(BaseModel):
+    """Outcome for one item of a batch, by its position in the request"""
+    index: int
+    assessment: Optional[Assessment] = None
+    error: Optional[str] = None
+
+
+class BatchAssessResponse(BaseModel):
+    """Per-item results of a batch assessment"""
+    results: list[BatchItemResult]
+    succeeded: int
+    failed: int
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AssessJob(BaseModel):
+    """Background assessment job; its assessment is stored under the job id"""
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex[:8])
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: int = 0
+    request: AssessRequest
+    assessment: Optional[Assessment] = None
+    error: Optional[str] = None
+    retry_after: Optional[float] = None  # Set when failed because the LLM providers were unavailable
 
 
 class RiskAxis(BaseModel):
@@ -132,6 +230,16 @@ class RiskAxis(BaseModel):
     reverse_scored: bool = False
 
 
+class ScoringResult(BaseModel):
+    """Outcome of scoring one paper"""
+    scores: RiskScores
+    axes_used: list[RiskAxis]
+    category: Optional[str] = None
+    axes_version: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+
+
 class UniversalAxesConfig(BaseModel):
     """Universal axes configuration file structure"""
     universal: bool = True
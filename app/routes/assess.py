@@ -1,8 +1,21 @@
+import asyncio
+import json
+import logging
+from typing import Any
 from fastapi import APIRouter, HTTPException
-from app.models import AssessRequest, Assessment, ResearchInput, AxisInfo, ResearchCategory
-from app.services.risk_scorer import score_research
-from app.services.governance import compute_tier, generate_llm_recommendations
-from app.services.storage import add_assessment
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.models import AssessJob, AssessRequest, Assessment, BatchAssessRequest, BatchAssessResponse, BatchItemResult
+from app.services.pipeline import build_assessment, stream_assessment
+from app.services.storage import add_assessment, add_assessments
+from app.services.job_queue import JobQueueFullError, JobQueueNotRunningError, get_job, submit_job
+from app.services.rate_limiter import LLMUnavailableError
+from app.services import llm_cache
+from app.services.provider_pool import get_pool
+from app.services.risk_scorer import scoring_flights
+from app.services.governance import recommendation_flights
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -15,81 +28,137 @@ async def assess_paper(request: AssessRequest):
     if not request.abstract.strip():
         raise HTTPException(status_code=400, detail="Abstract is required")
 
-    # Score using LLM - category is auto-detected
-    scores, axes_used, detected_category = await score_research(
-        title=request.title,
-        abstract=request.abstract,
-        snippet=request.snippet
-    )
+    try:
+        with llm_cache.bypass(request.no_cache):
+            assessment = await build_assessment(request)
+    except LLMUnavailableError as e:
+        headers = {"Retry-After": str(int(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
+
+    # Save (returns once the record is durably written)
+    await add_assessment(assessment)
+
+    return assessment
+
+
+@router.post("/assess/jobs", response_model=AssessJob, status_code=202)
+async def submit_assessment_job(request: AssessRequest):
+    """Queue a paper for assessment in the background; poll the returned job for the result"""
+    if not request.abstract.strip():
+        raise HTTPException(status_code=400, detail="Abstract is required")
+
+    try:
+        return await submit_job(request)
+    except (JobQueueFullError, JobQueueNotRunningError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/assess/jobs/{job_id}", response_model=AssessJob)
+async def get_assessment_job(job_id: str):
+    """Status of a background assessment job, with its assessment once done"""
+    try:
+        job = await get_job(job_id)
+    except JobQueueNotRunningError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
 
-    # Convert detected category string to enum (default to biomedical if not recognized)
-    category_enum = None
-    if detected_category:
+@router.post("/assess/stream")
+async def assess_paper_stream(request: AssessRequest):
+    """Assess a paper, streaming progress as server-sent events.
+
+    Emits `axes`, `category`, one `axis` per score as the model writes it,
+    `scores`, `tier` and `recommendations`, then `assessment` with the stored
+    record. Failures after the stream has started arrive as an `error` event.
+    """
+    if not request.abstract.strip():
+        raise HTTPException(status_code=400, detail="Abstract is required")
+
+    async def events():
         try:
-            category_enum = ResearchCategory(detected_category)
-        except ValueError:
-            # Try to match common variations
-            category_map = {
-                "biomedical": ResearchCategory.BIOMEDICAL,
-                "life_sciences": ResearchCategory.BIOMEDICAL,
-                "semiconductor": ResearchCategory.SEMICONDUCTOR,
-                "ai_hardware": ResearchCategory.SEMICONDUCTOR,
-                "ai_ml": ResearchCategory.AI_ML,
-                "ai": ResearchCategory.AI_ML,
-                "ml": ResearchCategory.AI_ML,
-                "machine_learning": ResearchCategory.AI_ML,
-                "cybersecurity": ResearchCategory.CYBERSECURITY,
-                "security": ResearchCategory.CYBERSECURITY,
-                "chemistry": ResearchCategory.CHEMISTRY,
-                "materials": ResearchCategory.CHEMISTRY,
-                "nuclear": ResearchCategory.NUCLEAR,
-                "radiological": ResearchCategory.NUCLEAR
-            }
-            category_enum = category_map.get(detected_category.lower())
-
-    # Compute tier based on scores and metadata
-    tier = compute_tier(scores, request.dissemination, request.audience)
-
-    # Generate LLM-based recommendations considering category, risk, and regulations
-    recommendations = await generate_llm_recommendations(
-        title=request.title,
-        abstract=request.abstract,
-        category=detected_category,
-        tier=tier,
-        scores=scores
-    )
+            with llm_cache.bypass(request.no_cache):
+                async for event, data in stream_assessment(request):
+                    if event == "axes":
+                        yield sse_event(event, [ax.model_dump() for ax in data])
+                    elif event == "category":
+                        yield sse_event(event, {"category": data})
+                    elif event == "axis":
+                        axis_id, score = data
+                        yield sse_event(event, {"id": axis_id, **score.model_dump()})
+                    elif event == "scores":
+                        yield sse_event(event, data.model_dump())
+                    elif event == "tier":
+                        yield sse_event(event, {"tier": data.value})
+                    elif event == "recommendations":
+                        yield sse_event(event, {"recommendations": data})
+                    elif event == "assessment":
+                        await add_assessment(data)
+                        yield sse_event(event, data.model_dump(mode="json"))
+        except LLMUnavailableError as e:
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            logger.error(f"Streaming assessment failed: {e}")
+            yield sse_event("error", {"detail": str(e) or type(e).__name__})
 
-    # Build assessment record
-    research_input = ResearchInput(
-        title=request.title,
-        abstract=request.abstract,
-        snippet=request.snippet,
-        source_url=request.source_url,
-        dissemination=request.dissemination,
-        audience=request.audience,
-        category=category_enum
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    # Convert axes to AxisInfo for storage
-    axes_info = [
-        AxisInfo(
-            id=ax.id,
-            name=ax.name,
-            section=getattr(ax, 'section', None),
-            reverse_scored=getattr(ax, 'reverse_scored', False)
-        )
-        for ax in axes_used
-    ]
-
-    assessment = Assessment(
-        input=research_input,
-        scores=scores,
-        tier=tier,
-        recommendations=recommendations,
-        axes_used=axes_info
+
+@router.post("/assess/batch", response_model=BatchAssessResponse)
+async def assess_batch(batch: BatchAssessRequest):
+    """Assess many papers concurrently and store them in one write"""
+    if len(batch.items) > settings.batch_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_max_items} items per batch")
+
+    limit = min(batch.concurrency or settings.batch_concurrency, settings.batch_concurrency)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def assess_one(index: int, request: AssessRequest) -> BatchItemResult:
+        if not request.abstract.strip():
+            return BatchItemResult(index=index, error="Abstract is required")
+        async with semaphore:
+            try:
+                with llm_cache.bypass(request.no_cache):
+                    return BatchItemResult(index=index, assessment=await build_assessment(request))
+            except Exception as e:
+                return BatchItemResult(index=index, error=str(e) or type(e).__name__)
+
+    results = await asyncio.gather(*(assess_one(i, r) for i, r in enumerate(batch.items)))
+
+    assessments = [r.assessment for r in results if r.assessment is not None]
+    if assessments:
+        await add_assessments(sorted(assessments, key=lambda a: a.naive_timestamp()))
+
+    return BatchAssessResponse(
+        results=results,
+        succeeded=len(assessments),
+        failed=len(results) - len(assessments)
     )
 
-    # Save to JSON
-    add_assessment(assessment)
 
-    return assessment
+@router.get("/llm/providers")
+async def llm_provider_health():
+    """Circuit state, failure counts, p95 latency and token usage per configured provider"""
+    return get_pool().stats()
+
+
+@router.get("/llm-cache/stats")
+async def llm_cache_stats():
+    """Hit/miss counters of the LLM response cache and of request coalescing"""
+    return {
+        **llm_cache.get_cache().stats(),
+        "coalesced": {
+            "scoring": scoring_flights.counters,
+            "recommendations": recommendation_flights.counters,
+        },
+    }
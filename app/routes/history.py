@@ -1,14 +1,54 @@
-from fastapi import APIRouter, HTTPException
-from app.models import Assessment
-from app.services.storage import get_all_assessments, get_assessment
+import base64
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from datetime import datetime, timedelta
+from app.models import Assessment, AssessmentFilters, AssessmentPage, naive_utc
+from app.routes.dashboard import parse_date
+from app.services.storage import page_assessments, iter_serialized_assessments, get_assessment
 
 router = APIRouter()
 
 
-@router.get("/history", response_model=list[Assessment])
-async def list_assessments():
-    """Get all past assessments"""
-    return get_all_assessments()
+def encode_cursor(a: Assessment) -> str:
+    """Opaque cursor pointing just past the given assessment"""
+    raw = f"{a.naive_timestamp().isoformat(timespec='microseconds')}|{a.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor into its (timestamp, id) key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, assessment_id = raw.split("|", 1)
+        return naive_utc(datetime.fromisoformat(ts)), assessment_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history", response_model=AssessmentPage)
+async def list_assessments(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    date_from: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every match, one per line")
+):
+    """Get past assessments, newest first, one page at a time"""
+    to_date = parse_date(date_to)
+    filters = AssessmentFilters(
+        date_from=parse_date(date_from),
+        date_to=to_date + timedelta(days=1) if to_date else None
+    )
+
+    if format == "ndjson":
+        lines = (line + b"\n" for line in iter_serialized_assessments(filters))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    before = decode_cursor(cursor) if cursor else None
+    items = page_assessments(limit + 1, before, filters)
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return AssessmentPage(items=items[:limit], next_cursor=next_cursor)
 
 
 @router.get("/history/{assessment_id}", response_model=Assessment)
@@ -0,0 +1,199 @@
+"""Materialized dashboard aggregates for the unfiltered dashboard.
+
+Running totals (tier and category counts, per-axis sums and counts with
+reverse scoring applied, daily trend buckets and the most recent high-risk
+paper) are updated in O(axes) for every persisted assessment. Unfiltered
+/api/dashboard/stats reads them directly instead of scanning the history.
+The totals record the storage marker they match; a write is only folded in
+when the store was at that marker just before it, and if the store changed
+behind their back they are rebuilt once from a full scan. They are saved
+next to the store at most every `aggregates_save_interval_seconds` and on
+shutdown; a file left behind by a crash no longer matches the store and is
+rebuilt on the next start.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.config import settings
+from app.models import Assessment, Tier
+from app.services import storage
+from app.services.score_matrix import configured_axis_ids, summarize_stats
+
+logger = logging.getLogger(__name__)
+
+HIGH_TIERS = {Tier.HIGH, Tier.CRITICAL}
+
+# high_risk_by_category keys must be strings on disk; "" stands for no category
+NO_CATEGORY = ""
+
+
+class DayBucket(BaseModel):
+    """Assessments on one day"""
+    total: int = 0
+    high_critical: int = 0
+
+
+class DashboardAggregates(BaseModel):
+    """Running totals over every stored assessment"""
+    marker: list = []
+    record_count: int = 0
+    risk_counts: dict[str, int] = {t.value: 0 for t in Tier}
+    category_counts: dict[str, int] = {}
+    category_latest: dict[str, datetime] = {}
+    high_risk_by_category: dict[str, int] = {}
+    high_risk_latest: dict[str, datetime] = {}
+    axis_sums: dict[str, int] = {}
+    axis_counts: dict[str, int] = {}
+    daily: dict[str, DayBucket] = {}
+    recent_high_risk: Optional[dict] = None
+    recent_high_risk_at: Optional[datetime] = None
+
+    def apply(self, a: Assessment):
+        """Fold one assessment into the totals"""
+        ts = a.naive_timestamp()
+        high = a.tier in HIGH_TIERS
+        self.record_count += 1
+        self.risk_counts[a.tier.value] = self.risk_counts.get(a.tier.value, 0) + 1
+
+        category = a.input.category.value if a.input.category else None
+        label = category or "unknown"
+        self.category_counts[label] = self.category_counts.get(label, 0) + 1
+        if label not in self.category_latest or ts > self.category_latest[label]:
+            self.category_latest[label] = ts
+
+        for axis_id, axis_score in a.scores.scores.items():
+            score = 3 - axis_score.score if axis_score.reverse_scored else axis_score.score
+            self.axis_sums[axis_id] = self.axis_sums.get(axis_id, 0) + score
+            self.axis_counts[axis_id] = self.axis_counts.get(axis_id, 0) + 1
+
+        bucket = self.daily.setdefault(ts.date().isoformat(), DayBucket())
+        bucket.total += 1
+
+        if high:
+            bucket.high_critical += 1
+            key = category or NO_CATEGORY
+            self.high_risk_by_category[key] = self.high_risk_by_category.get(key, 0) + 1
+            if key not in self.high_risk_latest or ts > self.high_risk_latest[key]:
+                self.high_risk_latest[key] = ts
+            if self.recent_high_risk_at is None or ts > self.recent_high_risk_at:
+                self.recent_high_risk_at = ts
+                self.recent_high_risk = {
+                    "id": a.id,
+                    "title": a.input.title or "Untitled",
+                    "tier": a.tier.value,
+                    "category": category,
+                    "timestamp": a.model_dump(mode="json")["timestamp"]
+                }
+
+    def stats(self) -> dict:
+        """Unfiltered /api/dashboard/stats payload"""
+        def newest_first(latest: dict[str, datetime]) -> list[str]:
+            return sorted(latest, key=lambda k: latest[k], reverse=True)
+
+        configured = configured_axis_ids()
+        axis_ids = [a for a in configured if a in self.axis_sums]
+        axis_ids += [a for a in self.axis_sums if a not in configured]
+
+        return summarize_stats(
+            total=self.record_count,
+            risk_counts=dict(self.risk_counts),
+            category_counts={c: self.category_counts[c] for c in newest_first(self.category_latest)},
+            high_risk_by_category={
+                (c or None): self.high_risk_by_category[c] for c in newest_first(self.high_risk_latest)
+            },
+            axis_ids=axis_ids,
+            axis_sums=[self.axis_sums[a] for a in axis_ids],
+            axis_counts=[self.axis_counts[a] for a in axis_ids],
+            recent_high_risk=self.recent_high_risk,
+            trend={d: b.model_dump() for d, b in self.daily.items()}
+        )
+
+
+_lock = threading.Lock()
+_aggregates: DashboardAggregates | None = None
+# Whether _aggregates has changes not yet saved, and when it was last saved
+_dirty = False
+_saved_at = 0.0
+
+
+def _save(aggregates: DashboardAggregates):
+    global _dirty, _saved_at
+    path = settings.aggregates_file
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(aggregates.model_dump_json())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _dirty = False
+    _saved_at = time.monotonic()
+
+
+def _load() -> DashboardAggregates | None:
+    if not settings.aggregates_file.exists():
+        return None
+    try:
+        return DashboardAggregates.model_validate_json(settings.aggregates_file.read_bytes())
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable dashboard aggregates: {e}")
+        return None
+
+
+def rebuild_aggregates() -> DashboardAggregates:
+    """Recompute the aggregates from every stored assessment"""
+    global _aggregates
+    with _lock:
+        aggregates = DashboardAggregates()
+        for a in reversed(storage.get_all_assessments()):
+            aggregates.apply(a)
+        aggregates.marker = storage.store_marker()
+        _save(aggregates)
+        _aggregates = aggregates
+        logger.info(f"Rebuilt dashboard aggregates from {aggregates.record_count} assessments")
+        return aggregates
+
+
+def get_aggregates() -> DashboardAggregates:
+    """Current aggregates, loaded from disk or rebuilt if the store moved on"""
+    global _aggregates
+    marker = storage.store_marker()
+    with _lock:
+        if _aggregates is None:
+            _aggregates = _load()
+        if _aggregates is not None and _aggregates.marker == marker:
+            return _aggregates
+    return rebuild_aggregates()
+
+
+def save_aggregates():
+    """Save unsaved changes to the totals (called on app shutdown)"""
+    with _lock:
+        if _aggregates is not None and _dirty:
+            _save(_aggregates)
+
+
+def _on_assessments_added(
+    assessments: list[Assessment],
+    generation_before: int | None,
+    generation_after: int,
+    marker_before: list
+):
+    """Fold new assessments in if the totals matched the store before the write"""
+    global _dirty
+    with _lock:
+        # Otherwise the next get_aggregates() sees a marker mismatch and rebuilds
+        if _aggregates is None or _aggregates.marker != marker_before:
+            return
+        for a in assessments:
+            _aggregates.apply(a)
+        _aggregates.marker = storage.store_marker()
+        _dirty = True
+        if time.monotonic() - _saved_at >= settings.aggregates_save_interval_seconds:
+            _save(_aggregates)
+
+
+storage.add_write_listener(_on_assessments_added)
@@ -0,0 +1,150 @@
+"""Process-wide cache of parsed assessments.
+
+Holds every Assessment once it has been read, with an id index and a
+timestamp-ordered view. The cache is tagged with the storage fingerprint
+(segment names, sizes and mtimes) it was built from and rebuilt when that
+changes, so writes from another process are picked up on the next read.
+Writes made through this process update it in place instead.
+
+Cached objects are shared between requests and must not be mutated. Reads
+hand out views of the cached list rather than copies; writes replace the
+list instead of inserting into it, so a view never changes under a reader.
+"""
+import bisect
+import threading
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Callable, Hashable, Iterable, Iterator
+from app.models import Assessment, AssessmentFilters
+
+
+def _sort_key(a: Assessment) -> tuple[datetime, str]:
+    return a.naive_timestamp(), a.id
+
+
+class NewestFirst(Sequence):
+    """Read-only, most recent first view of a list ordered oldest first"""
+
+    __slots__ = ("_ascending",)
+
+    def __init__(self, ascending: list[Assessment]):
+        self._ascending = ascending
+
+    def __len__(self) -> int:
+        return len(self._ascending)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("assessment index out of range")
+        return self._ascending[len(self) - 1 - index]
+
+    def __iter__(self) -> Iterator[Assessment]:
+        return reversed(self._ascending)
+
+    def __reversed__(self) -> Iterator[Assessment]:
+        return iter(self._ascending)
+
+
+class AssessmentCache:
+    """Indexed in-memory copy of the assessment store"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._fingerprint: Hashable | None = None
+        self._ascending: list[Assessment] = []
+        self._by_id: dict[str, Assessment] = {}
+        # Bumped on every in-place change or rebuild
+        self.generation = 0
+
+    def _ensure(self, fingerprint: Hashable, loader: Callable[[], Iterable[Assessment]]):
+        if self._fingerprint == fingerprint:
+            return
+        items = list(loader())
+        items.sort(key=_sort_key)
+        self._ascending = items
+        self._by_id = {a.id: a for a in items}
+        self._fingerprint = fingerprint
+        self.generation += 1
+
+    def is_current(self, fingerprint: Hashable) -> bool:
+        """True when the cache was built from (or patched up to) this fingerprint"""
+        with self._lock:
+            return self._fingerprint == fingerprint
+
+    def all(self, fingerprint: Hashable, loader: Callable[[], Iterable[Assessment]]) -> NewestFirst:
+        """All assessments, most recent first (a view, not a copy)"""
+        with self._lock:
+            self._ensure(fingerprint, loader)
+            return NewestFirst(self._ascending)
+
+    def page(
+        self,
+        fingerprint: Hashable,
+        loader: Callable[[], Iterable[Assessment]],
+        limit: int,
+        before: tuple[datetime, str] | None = None,
+        filters: AssessmentFilters | None = None
+    ) -> list[Assessment]:
+        """Up to `limit` assessments older than the (timestamp, id) key `before`, newest first"""
+        with self._lock:
+            self._ensure(fingerprint, loader)
+            items = self._ascending
+            end = len(items)
+            if before is not None:
+                end = bisect.bisect_left(items, before, key=_sort_key)
+            if filters and filters.date_to:
+                end = min(end, bisect.bisect_left(items, (filters.date_to, ""), key=_sort_key))
+
+            page = []
+            for i in range(end - 1, -1, -1):
+                a = items[i]
+                if filters and filters.date_from and a.naive_timestamp() < filters.date_from:
+                    break
+                if filters is None or filters.matches(a):
+                    page.append(a)
+                    if len(page) >= limit:
+                        break
+            return page
+
+    def get(
+        self,
+        assessment_id: str,
+        fingerprint: Hashable,
+        loader: Callable[[], Iterable[Assessment]]
+    ) -> Assessment | None:
+        """O(1) lookup by id"""
+        with self._lock:
+            self._ensure(fingerprint, loader)
+            return self._by_id.get(assessment_id)
+
+    def add(self, assessments: Iterable[Assessment], before: Hashable, after: Hashable) -> bool:
+        """Apply a write made by this process; returns whether the cache was patched.
+
+        `before` is the storage fingerprint observed just before the write; if
+        the cache was not built from it, something else changed the store and
+        the cache is dropped instead of patched.
+        """
+        with self._lock:
+            if self._fingerprint != before:
+                self.invalidate()
+                return False
+            items = list(self._ascending)
+            for a in assessments:
+                bisect.insort(items, a, key=_sort_key)
+                self._by_id[a.id] = a
+            self._ascending = items
+            self._fingerprint = after
+            self.generation += 1
+            return True
+
+    def invalidate(self):
+        """Drop everything; the next read rebuilds from storage"""
+        with self._lock:
+            self._fingerprint = None
+            self._ascending = []
+            self._by_id = {}
+            self.generation += 1
@@ -0,0 +1,212 @@
+"""Local research category classifier.
+
+A linear model over TF-IDF weighted words and word pairs of the title and
+abstract predicts the ResearchCategory with a softmax confidence, in well
+under a millisecond on the CPU. `python -m scripts.train_category_classifier`
+fits it to the categories of stored assessments and writes it to
+CATEGORY_MODEL_FILE, which is reloaded when it changes. Until a model has
+been trained, a built-in keyword model is used: each keyword adds to its
+category's score, so it is confident only when several keywords point to
+the same category and few to any other.
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from app.config import settings
+from app.models import ResearchCategory
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_IDS = [c.value for c in ResearchCategory]
+
+# Common variations of category ids that LLMs return
+CATEGORY_ALIASES = {
+    "life_sciences": "biomedical",
+    "ai_hardware": "semiconductor",
+    "ai": "ai_ml",
+    "ml": "ai_ml",
+    "machine_learning": "ai_ml",
+    "security": "cybersecurity",
+    "materials": "chemistry",
+    "radiological": "nuclear",
+}
+
+# Built-in model: each keyword adds this to its category's logit (4 agreeing keywords ~ 0.9)
+SEED_WEIGHT = 1.0
+SEED_KEYWORDS = {
+    "biomedical": [
+        "crispr", "gene editing", "genome", "gene", "protein", "pathogen", "pathogens", "virus", "viral",
+        "bacteria", "bacterial", "vaccine", "drug discovery", "clinical", "patients", "disease", "cell",
+        "cells", "dna", "rna", "toxin", "infection", "biology", "biomedical", "medical",
+    ],
+    "semiconductor": [
+        "semiconductor", "chip", "chips", "eda", "accelerator", "accelerators", "fpga", "asic", "transistor",
+        "lithography", "wafer", "fabrication", "circuit", "circuits", "hardware", "gpu", "vlsi", "rtl",
+    ],
+    "ai_ml": [
+        "language model", "language models", "llm", "llms", "neural network", "neural networks", "deep learning",
+        "machine learning", "transformer", "reinforcement learning", "fine tuning", "pretraining",
+        "training", "model architecture", "diffusion", "benchmark",
+    ],
+    "cybersecurity": [
+        "vulnerability", "vulnerabilities", "exploit", "exploits", "malware", "attack", "attacks", "adversarial",
+        "intrusion", "security", "cybersecurity", "phishing", "ransomware", "fuzzing", "penetration",
+        "cve", "zero day", "backdoor",
+    ],
+    "chemistry": [
+        "chemical", "chemistry", "synthesis", "compound", "compounds", "molecule", "molecules", "molecular",
+        "catalyst", "reaction", "polymer", "materials", "energetic materials", "explosive", "explosives",
+        "nerve agent", "precursor", "precursors",
+    ],
+    "nuclear": [
+        "nuclear", "reactor", "reactors", "uranium", "plutonium", "enrichment", "fission", "fusion",
+        "radiation", "radiological", "isotope", "isotopes", "fuel cycle", "neutron", "radioactive",
+    ],
+}
+
+
+def normalize_category(value: str | None) -> str | None:
+    """Category id for an id or a known alias (None if not recognized)"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    return value if value in CATEGORY_IDS else CATEGORY_ALIASES.get(value)
+
+
+def features(title: str, abstract: str) -> Counter:
+    """Counts of the words and adjacent word pairs of a paper"""
+    words = re.findall(r"[a-z0-9]+", f"{title} {abstract}".lower())
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts
+
+
+class CategoryModel:
+    """Softmax linear model over TF-IDF features"""
+
+    def __init__(self, classes: list[str], vocabulary: dict[str, int], idf: np.ndarray,
+                 weights: np.ndarray, bias: np.ndarray, normalize: bool = True, trained_on: int = 0):
+        self.classes = classes
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights  # (features, classes)
+        self.bias = bias
+        self.normalize = normalize  # L2-normalize feature vectors (trained models)
+        self.trained_on = trained_on
+
+    @classmethod
+    def seed(cls) -> "CategoryModel":
+        """Keyword model used until one has been trained"""
+        vocabulary = {}
+        rows = []
+        for column, category in enumerate(CATEGORY_IDS):
+            for keyword in SEED_KEYWORDS.get(category, []):
+                vocabulary[keyword] = len(rows)
+                row = np.zeros(len(CATEGORY_IDS))
+                row[column] = SEED_WEIGHT
+                rows.append(row)
+        return cls(
+            CATEGORY_IDS, vocabulary, np.ones(len(rows)), np.array(rows), np.zeros(len(CATEGORY_IDS)),
+            normalize=False
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CategoryModel":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["classes"],
+            {term: i for i, term in enumerate(data["terms"])},
+            np.array(data["idf"]),
+            np.array(data["weights"]),
+            np.array(data["bias"]),
+            data.get("normalize", True),
+            data.get("trained_on", 0)
+        )
+
+    def save(self, path: Path):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        data = {
+            "classes": self.classes,
+            "normalize": self.normalize,
+            "trained_on": self.trained_on,
+            "terms": terms,
+            "idf": np.round(self.idf, 5).tolist(),
+            "weights": np.round(self.weights, 5).tolist(),
+            "bias": np.round(self.bias, 5).tolist(),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def vectorize(self, counts: Counter) -> tuple[list[int], np.ndarray]:
+        """Feature indices and TF-IDF values (log-scaled counts) of known terms"""
+        known = [t for t in counts if t in self.vocabulary]
+        index = [self.vocabulary[t] for t in known]
+        if not index:
+            return index, np.zeros(0)
+        values = np.array([1.0 + math.log(counts[t]) for t in known]) * self.idf[index]
+        return index, values / np.linalg.norm(values) if self.normalize else values
+
+    def probabilities(self, counts: Counter) -> np.ndarray:
+        index, values = self.vectorize(counts)
+        logits = self.bias + values @ self.weights[index] if index else self.bias.copy()
+        logits = np.exp(logits - logits.max())
+        return logits / logits.sum()
+
+    def predict(self, title: str, abstract: str) -> tuple[str, float]:
+        """Most likely category and its probability"""
+        probabilities = self.probabilities(features(title, abstract))
+        best = int(np.argmax(probabilities))
+        return self.classes[best], float(probabilities[best])
+
+
+_lock = threading.Lock()
+_model: CategoryModel | None = None
+_model_stamp: tuple | None = None
+
+
+def _model_file_stamp() -> tuple | None:
+    try:
+        st = os.stat(settings.category_model_file)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_model() -> CategoryModel:
+    """Trained model, reloaded when its file changes; the keyword model if there is none"""
+    global _model, _model_stamp
+    stamp = _model_file_stamp()
+    if _model is not None and _model_stamp == stamp:
+        return _model
+
+    with _lock:
+        if _model is not None and _model_stamp == stamp:
+            return _model
+        model = None
+        if stamp is not None:
+            try:
+                model = CategoryModel.load(settings.category_model_file)
+                logger.info(f"Loaded category model trained on {model.trained_on} assessments")
+            except Exception as e:
+                logger.warning(f"Could not load category model {settings.category_model_file}: {e}")
+        if model is None:
+            # A file caught mid-write keeps the last good model
+            model = _model if _model is not None and stamp is not None else CategoryModel.seed()
+        _model = model
+        _model_stamp = stamp
+        return _model
+
+
+def predict_category(title: str, abstract: str) -> tuple[str, float]:
+    """(category id, confidence) from the local model"""
+    return get_model().predict(title, abstract)
@@ -0,0 +1,238 @@
+"""Record encodings and block compression for assessment log segments.
+
+A segment's file name says how it is stored: the record encoding suffix
+(".jsonl" for JSON Lines, ".msgpack" for length-prefixed MessagePack),
+optionally followed by a compression suffix (".gz", ".zst"). Compressed
+segments are a series of independently compressed blocks, one per append,
+so appending never rewrites earlier data. Segments written with different
+settings can live side by side in one log.
+
+orjson, msgpack and zstandard are optional and only imported when used.
+"""
+import gzip
+import logging
+import struct
+import zlib
+from pathlib import Path
+from typing import Literal
+from app.models import Assessment
+
+logger = logging.getLogger(__name__)
+
+CodecName = Literal["json", "orjson", "msgpack"]
+CompressionName = Literal["none", "gzip", "zstd"]
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class RecordCodec:
+    """Encodes assessments to bytes and frames them within a segment"""
+    name = ""
+    suffix = ""
+
+    def encode(self, a: Assessment) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> Assessment:
+        raise NotImplementedError
+
+    def frame(self, payloads: list[bytes]) -> bytes:
+        raise NotImplementedError
+
+    def unframe(self, data: bytes) -> tuple[list[bytes], bool]:
+        """Records in `data`, and whether it ended on a record boundary"""
+        raise NotImplementedError
+
+    def spans(self, data, start: int = 0) -> tuple[list[tuple[int, int]], int]:
+        """(offset, length) of every complete record from `start`, and the end of the last one"""
+        raise NotImplementedError
+
+    def to_json(self, payload: bytes) -> bytes:
+        """Record as a JSON document"""
+        return self.decode(payload).model_dump_json().encode("utf-8")
+
+
+class JsonCodec(RecordCodec):
+    """One JSON document per line, encoded by pydantic"""
+    name = "json"
+    suffix = ".jsonl"
+
+    def encode(self, a: Assessment) -> bytes:
+        return a.model_dump_json().encode("utf-8")
+
+    def decode(self, payload: bytes) -> Assessment:
+        return Assessment.model_validate_json(payload)
+
+    def frame(self, payloads: list[bytes]) -> bytes:
+        return b"".join(p + b"\n" for p in payloads)
+
+    def unframe(self, data: bytes) -> tuple[list[bytes], bool]:
+        return [line for line in data.splitlines() if line.strip()], not data or data.endswith(b"\n")
+
+    def spans(self, data, start: int = 0) -> tuple[list[tuple[int, int]], int]:
+        spans = []
+        pos = start
+        while (end := data.find(b"\n", pos)) != -1:
+            if data[pos:end].strip():
+                spans.append((pos, end - pos))
+            pos = end + 1
+        return spans, pos
+
+    def to_json(self, payload: bytes) -> bytes:
+        return payload
+
+
+class OrjsonCodec(JsonCodec):
+    """Same JSON Lines layout, serialized with orjson"""
+    name = "orjson"
+
+    def encode(self, a: Assessment) -> bytes:
+        import orjson
+        return orjson.dumps(a.model_dump(mode="json"))
+
+    def decode(self, payload: bytes) -> Assessment:
+        import orjson
+        return Assessment.model_validate(orjson.loads(payload))
+
+
+class MsgpackCodec(RecordCodec):
+    """MessagePack records, each prefixed with its 4-byte big-endian length"""
+    name = "msgpack"
+    suffix = ".msgpack"
+
+    def encode(self, a: Assessment) -> bytes:
+        import msgpack
+        return msgpack.packb(a.model_dump(mode="json"))
+
+    def decode(self, payload: bytes) -> Assessment:
+        import msgpack
+        return Assessment.model_validate(msgpack.unpackb(payload))
+
+    def frame(self, payloads: list[bytes]) -> bytes:
+        return b"".join(_FRAME_HEADER.pack(len(p)) + p for p in payloads)
+
+    def unframe(self, data: bytes) -> tuple[list[bytes], bool]:
+        spans, end = self.spans(data)
+        if end != len(data):
+            logger.warning(f"Ignoring {len(data) - end} trailing bytes of a torn MessagePack record")
+        return [data[offset:offset + length] for offset, length in spans], end == len(data)
+
+    def spans(self, data, start: int = 0) -> tuple[list[tuple[int, int]], int]:
+        spans = []
+        pos = start
+        while pos + _FRAME_HEADER.size <= len(data):
+            (length,) = _FRAME_HEADER.unpack_from(data, pos)
+            begin = pos + _FRAME_HEADER.size
+            if begin + length > len(data):
+                break
+            spans.append((begin, length))
+            pos = begin + length
+        return spans, pos
+
+
+class BlockCompression:
+    """Compresses each appended block independently"""
+    name = "none"
+    suffix = ""
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> tuple[bytes, bool]:
+        """Decompressed blocks, and whether the last block was complete"""
+        return data, True
+
+
+class GzipCompression(BlockCompression):
+    name = "gzip"
+    suffix = ".gz"
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6)
+
+    def decompress(self, data: bytes) -> tuple[bytes, bool]:
+        # One gzip member per block; keep every complete member if the last is torn
+        chunks = []
+        while data:
+            d = zlib.decompressobj(wbits=31)
+            try:
+                chunks.append(d.decompress(data))
+            except zlib.error as e:
+                logger.warning(f"Ignoring unreadable gzip block: {e}")
+                return b"".join(chunks), False
+            if not d.eof:
+                logger.warning("Ignoring a torn gzip block")
+                chunks.pop()
+                return b"".join(chunks), False
+            data = d.unused_data
+        return b"".join(chunks), True
+
+
+class ZstdCompression(BlockCompression):
+    name = "zstd"
+    suffix = ".zst"
+
+    def compress(self, data: bytes) -> bytes:
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    def decompress(self, data: bytes) -> tuple[bytes, bool]:
+        import zstandard
+        # One zstd frame per block; keep every complete frame if the last is torn
+        chunks = []
+        while data:
+            d = zstandard.ZstdDecompressor().decompressobj()
+            try:
+                chunks.append(d.decompress(data))
+            except zstandard.ZstdError as e:
+                logger.warning(f"Ignoring unreadable zstd block: {e}")
+                return b"".join(chunks), False
+            if not d.eof:
+                logger.warning("Ignoring a torn zstd block")
+                chunks.pop()
+                return b"".join(chunks), False
+            data = d.unused_data
+        return b"".join(chunks), True
+
+
+CODECS: dict[str, RecordCodec] = {c.name: c for c in (JsonCodec(), OrjsonCodec(), MsgpackCodec())}
+COMPRESSIONS: dict[str, BlockCompression] = {
+    c.name: c for c in (BlockCompression(), GzipCompression(), ZstdCompression())
+}
+
+
+def get_codec(name: str) -> RecordCodec:
+    if name not in CODECS:
+        raise ValueError(f"Unknown storage codec: {name}")
+    return CODECS[name]
+
+
+def get_compression(name: str) -> BlockCompression:
+    if name not in COMPRESSIONS:
+        raise ValueError(f"Unknown storage compression: {name}")
+    return COMPRESSIONS[name]
+
+
+def segment_format(name: str, preferred: RecordCodec | None = None) -> tuple[str, RecordCodec, BlockCompression] | None:
+    """Split a segment file name into (stem, codec, compression).
+
+    Returns None for files that are not segments. `preferred` decodes segments
+    whose suffix it shares (so orjson reads the .jsonl files it writes).
+    """
+    compression = COMPRESSIONS["none"]
+    for c in COMPRESSIONS.values():
+        if c.suffix and name.endswith(c.suffix):
+            compression = c
+            name = name.removesuffix(c.suffix)
+            break
+    for codec in (preferred, CODECS["json"], CODECS["msgpack"]):
+        if codec is not None and name.endswith(codec.suffix):
+            return name.removesuffix(codec.suffix), codec, compression
+    return None
+
+
+def read_payloads(path: Path, codec: RecordCodec, compression: BlockCompression) -> tuple[list[bytes], bool]:
+    """Encoded records of one segment file, oldest first, and whether its tail is intact"""
+    data, complete = compression.decompress(path.read_bytes())
+    payloads, aligned = codec.unframe(data)
+    return payloads, complete and aligned
@@ -0,0 +1,166 @@
+"""Near-duplicate detection over stored assessments (MinHash + LSH).
+
+The same paper often arrives several times with slightly different text: an
+arXiv abstract page, the PDF, a conference page. Each stored assessment's
+title and abstract are normalized (case, punctuation, PDF hyphenation), split
+into overlapping word 3-grams, and reduced to a MinHash signature, whose
+agreement with another signature estimates the Jaccard similarity of their
+3-gram sets. Signatures are bucketed by bands (locality-sensitive hashing), so a
+lookup only compares against papers that share at least one band.
+
+The index is built once from the storage cache and extended in place when
+new assessments are written through this process. It records the storage
+marker it matches, so a lookup only has to compare markers; it is rebuilt
+only when the store changed behind its back.
+"""
+import re
+import threading
+import zlib
+import numpy as np
+from app.models import Assessment
+from app.services import storage
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Multiply-shift hashing ((a * x + b) mod 2**64) >> 32 with odd a, one (a, b) pair
+# per permutation; fixed parameters keep signatures stable
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+# Word-hash multipliers that make a shingle hash depend on word order
+_POSITION = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 1], dtype=np.uint64)
+
+
+def normalize_paper_text(title: str, abstract: str) -> list[str]:
+    """Words of title and abstract with case, punctuation and line-break hyphenation removed"""
+    text = f"{title} {abstract}".lower()
+    if "-\n" in text:
+        text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text)
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def shingle_hashes(words: list[str]) -> np.ndarray:
+    """32-bit hashes of the word 3-grams (of the whole text when shorter)"""
+    word_hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    size = min(SHINGLE_SIZE, len(words))
+    n = len(words) - size + 1
+    combined = sum(word_hashes[i:i + n] * _POSITION[SHINGLE_SIZE - size + i] for i in range(size))
+    return (combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+
+
+def minhash(title: str, abstract: str) -> np.ndarray | None:
+    """MinHash signature (uint32[NUM_PERM]) of a paper, or None when it has no words"""
+    words = normalize_paper_text(title, abstract)
+    if not words:
+        return None
+    hashes = shingle_hashes(words)
+    permuted = (np.multiply.outer(_A, hashes) + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list[bytes]:
+    return [bytes([band]) + signature[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+
+class DuplicateIndex:
+    """MinHash signatures of stored assessments with LSH buckets"""
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.axes_versions: list[str | None] = []
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self.buckets: dict[bytes, list[int]] = {}
+        self._size = 0
+
+    @classmethod
+    def from_assessments(cls, assessments: list[Assessment]) -> "DuplicateIndex":
+        index = cls()
+        index.add(assessments)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, assessments: list[Assessment]):
+        for a in assessments:
+            signature = minhash(a.input.title, a.input.abstract)
+            if signature is None:
+                continue
+            if self._size == len(self.signatures):
+                grown = np.zeros((max(64, self._size * 2), NUM_PERM), dtype=np.uint32)
+                grown[:self._size] = self.signatures[:self._size]
+                self.signatures = grown
+            row = self._size
+            self.signatures[row] = signature
+            self.ids.append(a.id)
+            self.axes_versions.append(a.axes_version)
+            for key in band_keys(signature):
+                self.buckets.setdefault(key, []).append(row)
+            self._size += 1
+
+    def find(self, title: str, abstract: str, axes_version: str | None, threshold: float) -> tuple[str, float] | None:
+        """(id, similarity) of the most similar assessment scored with `axes_version`, if above threshold"""
+        signature = minhash(title, abstract)
+        if signature is None:
+            return None
+        rows = {row for key in band_keys(signature) for row in self.buckets.get(key, ())}
+        rows = [row for row in rows if self.axes_versions[row] == axes_version]
+        if not rows:
+            return None
+        similarities = (self.signatures[rows] == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            return None
+        # Ties (e.g. exact resubmissions) go to the most recent assessment
+        candidates = [rows[i] for i in np.flatnonzero(similarities == similarities[best])]
+        return self.ids[max(candidates)], float(similarities[best])
+
+
+_lock = threading.Lock()
+_index: DuplicateIndex | None = None
+_index_marker: list | None = None
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Duplicate index for the current store, rebuilt only when the store changed behind it"""
+    global _index, _index_marker
+    marker = storage.store_marker()
+    with _lock:
+        if _index is not None and _index_marker == marker:
+            return _index
+    assessments = storage.get_all_assessments()
+    with _lock:
+        _index = DuplicateIndex.from_assessments(list(reversed(assessments)))
+        _index_marker = marker
+        return _index
+
+
+def find_duplicate(title: str, abstract: str, axes_version: str, threshold: float) -> tuple[Assessment, float] | None:
+    """A stored assessment of (almost) the same paper, scored with the same axes, and its similarity"""
+    index = get_duplicate_index()
+    with _lock:
+        match = index.find(title, abstract, axes_version, threshold)
+    if match is None:
+        return None
+    assessment = storage.get_assessment(match[0])
+    return (assessment, match[1]) if assessment is not None else None
+
+
+def _on_assessments_added(
+    assessments: list[Assessment],
+    generation_before: int | None,
+    generation_after: int,
+    marker_before: list
+):
+    """Index new assessments in place when the index matched the store before the write"""
+    global _index_marker
+    with _lock:
+        if _index is not None and _index_marker == marker_before:
+            _index.add(assessments)
+            _index_marker = storage.store_marker()
+
+
+storage.add_write_listener(_on_assessments_added)
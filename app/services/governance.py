@@ -1,8 +1,18 @@
 import logging
+from app.config import settings
 from app.models import RiskScores, Tier, Dissemination, Audience
+from app.services import llm_cache
+from app.services.single_flight import SingleFlight, flight_key, normalize_text
+from app.services.token_budget import truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Abstract budget of the recommendations prompt
+RECOMMENDATION_ABSTRACT_TOKENS = 128
+
+# Concurrent recommendation requests for the same assessment share one LLM call
+recommendation_flights = SingleFlight("recommendations")
+
 
 def compute_tier(scores: RiskScores, dissemination: Dissemination, audience: Audience) -> Tier:
     """
@@ -156,7 +166,7 @@ def build_recommendations_prompt(
 
 ## Research Paper
 **Title:** {title}
-**Abstract:** {abstract[:500]}...
+**Abstract:** {truncate_to_tokens(abstract, RECOMMENDATION_ABSTRACT_TOKENS, settings.get_providers()[0])}
 
 ## Assessment Results
 **Category:** {category or "General AI/Technology"}
@@ -229,13 +239,29 @@ async def generate_llm_recommendations(
     scores: RiskScores
 ) -> list[str]:
     """Generate contextual recommendations using LLM based on category, risk, and regulations"""
-    from app.services.risk_scorer import call_llm
+    key = flight_key(
+        normalize_text(title), normalize_text(abstract), category, tier.value, scores.model_dump(),
+        [(p, settings.get_model(p)) for p in settings.get_providers()], llm_cache.bypassed()
+    )
+    return await recommendation_flights.do(
+        key, lambda: _generate_llm_recommendations(title, abstract, category, tier, scores)
+    )
+
+
+async def _generate_llm_recommendations(
+    title: str,
+    abstract: str,
+    category: str | None,
+    tier: Tier,
+    scores: RiskScores
+) -> list[str]:
+    from app.services.risk_scorer import complete
 
     prompt = build_recommendations_prompt(title, abstract, category, tier, scores)
 
     try:
-        response_text = await call_llm(prompt)
-        recommendations = parse_recommendations_response(response_text)
+        response = await complete(prompt, lambda text: bool(parse_recommendations_response(text)))
+        recommendations = parse_recommendations_response(response.text)
 
         if recommendations:
             logger.info(f"Generated {len(recommendations)} LLM recommendations")
@@ -0,0 +1,236 @@
+"""Background assessment jobs.
+
+`POST /api/assess/jobs` records a job and returns at once; a fixed pool of
+worker tasks runs the pipeline for queued jobs, so slow providers hold a
+worker rather than an HTTP connection, and at most `job_workers`
+assessments run in job mode at a time. Each state change is written to a
+small SQLite database, so job status survives a restart: queued jobs are
+queued again, and jobs that were running are re-run unless their
+assessment (stored under the job id) was already saved. Finished jobs are
+dropped after `job_retention_hours`, checked at startup and then hourly.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from app.config import settings
+from app.models import AssessJob, AssessRequest, JobStatus
+from app.services import llm_cache, storage
+from app.services.pipeline import build_assessment
+from app.services.rate_limiter import LLMUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps for finished jobs past their retention
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at);
+"""
+
+
+class JobQueueFullError(Exception):
+    """Raised when job_queue_max jobs are already waiting"""
+
+
+class JobQueueNotRunningError(Exception):
+    """Raised when jobs are submitted or looked up before start() or after stop()"""
+
+
+class JobStore:
+    """Job documents in a SQLite database, one row per job"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, job: AssessJob):
+        finished_at = job.finished_at.isoformat(timespec="microseconds") if job.finished_at else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, finished_at, doc) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status.value, job.created_at.isoformat(timespec="microseconds"), finished_at,
+                 job.model_dump_json())
+            )
+
+    def get(self, job_id: str) -> AssessJob | None:
+        with self._lock:
+            row = self._conn.execute("SELECT doc FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return AssessJob.model_validate_json(row[0]) if row else None
+
+    def unfinished(self) -> list[AssessJob]:
+        """Queued and running jobs, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        return [AssessJob.model_validate_json(r[0]) for r in rows]
+
+    def prune(self, finished_before: datetime) -> int:
+        """Delete jobs that finished before the given time"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (finished_before.isoformat(timespec="microseconds"),)
+            )
+        return cursor.rowcount
+
+
+class JobQueue:
+    """Persistent job store plus the worker tasks that drain it"""
+
+    def __init__(self):
+        self._store: JobStore | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._pruner: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, workers: int):
+        """Open the store, resume unfinished jobs and start the workers"""
+        if self.running:
+            return
+        self._store = await asyncio.to_thread(JobStore, settings.jobs_file)
+        await self._prune()
+
+        self._queue = asyncio.Queue()
+        for job in await asyncio.to_thread(self._store.unfinished):
+            if job.status == JobStatus.RUNNING:
+                # Interrupted: finished if its assessment was saved before the restart
+                assessment = await asyncio.to_thread(storage.get_assessment, job.id)
+                if assessment is not None:
+                    await self._finish(job, JobStatus.DONE, assessment=assessment)
+                    continue
+                job.status = JobStatus.QUEUED
+                await self._save(job)
+            self._queue.put_nowait(job)
+        if self._queue.qsize():
+            logger.info(f"Resuming {self._queue.qsize()} assessment jobs")
+
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"assessment-job-worker-{i}")
+            for i in range(max(1, workers))
+        ]
+        self._pruner = asyncio.create_task(self._prune_periodically(), name="assessment-job-pruner")
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are resumed on the next start"""
+        tasks = self._workers + ([self._pruner] if self._pruner else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, request: AssessRequest) -> AssessJob:
+        """Record a queued job for the request and hand it to the workers"""
+        if not self.running:
+            raise JobQueueNotRunningError("The assessment job queue is not running")
+        if self._queue.qsize() >= settings.job_queue_max:
+            raise JobQueueFullError(f"{self._queue.qsize()} assessment jobs are already queued")
+        job = AssessJob(request=request)
+        await self._save(job)
+        self._queue.put_nowait(job)
+        return job
+
+    async def get(self, job_id: str) -> AssessJob | None:
+        if not self.running:
+            raise JobQueueNotRunningError("The assessment job queue is not running")
+        return await asyncio.to_thread(self._store.get, job_id)
+
+    async def _prune(self):
+        cutoff = datetime.utcnow() - timedelta(hours=settings.job_retention_hours)
+        pruned = await asyncio.to_thread(self._store.prune, cutoff)
+        if pruned:
+            logger.info(f"Dropped {pruned} finished jobs older than {settings.job_retention_hours:g} hours")
+
+    async def _prune_periodically(self):
+        while True:
+            await asyncio.sleep(PRUNE_INTERVAL)
+            try:
+                await self._prune()
+            except Exception as e:
+                logger.error(f"Pruning finished assessment jobs failed: {e}")
+
+    async def _save(self, job: AssessJob):
+        await asyncio.to_thread(self._store.save, job)
+
+    async def _finish(self, job: AssessJob, status: JobStatus, **fields):
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        for name, value in fields.items():
+            setattr(job, name, value)
+        await self._save(job)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AssessJob):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.attempts += 1
+        await self._save(job)
+
+        try:
+            with llm_cache.bypass(job.request.no_cache):
+                assessment = await build_assessment(job.request)
+            # Stored under the job id so an interrupted job can tell that it finished
+            assessment = assessment.model_copy(update={"id": job.id})
+            await storage.add_assessment(assessment)
+        except LLMUnavailableError as e:
+            await self._finish(job, JobStatus.FAILED, error=str(e), retry_after=e.retry_after)
+        except Exception as e:
+            logger.error(f"Assessment job {job.id} failed: {e}")
+            await self._finish(job, JobStatus.FAILED, error=str(e) or type(e).__name__)
+        else:
+            await self._finish(job, JobStatus.DONE, assessment=assessment)
+
+
+_jobs = JobQueue()
+
+
+async def start_workers():
+    """Resume persisted jobs and start the worker pool (called on app startup)"""
+    await _jobs.start(settings.job_workers)
+
+
+async def stop_workers():
+    """Stop the worker pool (called on app shutdown, before the storage writer stops)"""
+    await _jobs.stop()
+
+
+async def submit_job(request: AssessRequest) -> AssessJob:
+    return await _jobs.submit(request)
+
+
+async def get_job(job_id: str) -> AssessJob | None:
+    return await _jobs.get(job_id)
@@ -0,0 +1,204 @@
+"""Content-addressed cache of LLM responses.
+
+Responses are keyed by a SHA-256 of (provider, model, prompt, generation
+parameters), so re-assessing the same paper never pays for the same prompt
+twice. A bounded in-memory LRU sits in front of a disk tier under
+settings.llm_cache_dir (one small JSON file per response) with a TTL and a
+total size limit; the least recently used files are evicted first.
+
+A request can bypass lookups with `bypass()`; fresh responses are still
+stored so the cache is refreshed.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+def cache_key(provider: str, model: str, prompt: str, params: dict) -> str:
+    """Stable hash of everything that determines a response"""
+    material = json.dumps([provider, model, prompt, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def bypass(enabled: bool = True):
+    """Skip cache lookups for LLM calls made inside this block"""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def bypassed() -> bool:
+    """Whether the current request skips cache lookups"""
+    return _bypass.get()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + disk) response cache"""
+
+    def __init__(self, directory: Path, max_memory_entries: int, max_disk_bytes: int, ttl_seconds: float):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._disk_bytes: int | None = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, text: str):
+        with self._lock:
+            self._memory[key] = (created, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        """Cached response text, or None (counts a hit or a miss)"""
+        if bypassed():
+            with self._lock:
+                self.counters["bypassed"] += 1
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        path = self._path(key)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            record = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable LLM cache entry {path.name}: {e}")
+            self._delete(path)
+            record = None
+
+        if record is not None and self._expired(record["created"]):
+            self._delete(path)
+            record = None
+        if record is None:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+
+        # Touch so size-based eviction removes the least recently used files first
+        os.utime(path)
+        self._remember(key, record["created"], record["text"])
+        with self._lock:
+            self.counters["disk_hits"] += 1
+        return record["text"]
+
+    def put(self, key: str, text: str, provider: str = "", model: str = ""):
+        """Store a response in both tiers"""
+        created = time.time()
+        self._remember(key, created, text)
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"created": created, "provider": provider, "model": model, "text": text})
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(path)
+
+        with self._lock:
+            self.counters["stores"] += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += path.stat().st_size
+        if self._disk_size() > self.max_disk_bytes:
+            self._evict()
+
+    def _delete(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _disk_size(self) -> int:
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._entries())
+            return self._disk_bytes
+
+    def _evict(self):
+        """Drop expired files, then least recently used ones, down to 90% of the limit"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        evicted = 0
+        for mtime, size, path in entries:
+            if total <= target and time.time() - mtime <= self.ttl_seconds:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.counters["evictions"] += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} LLM cache entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_cache() -> LLMResponseCache:
+    """Process-wide response cache configured from settings"""
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache(
+            settings.llm_cache_dir,
+            settings.llm_cache_memory_entries,
+            settings.llm_cache_max_bytes,
+            settings.llm_cache_ttl_hours * 3600
+        )
+    return _cache
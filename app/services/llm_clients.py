@@ -0,0 +1,89 @@
+"""Long-lived async clients for the LLM providers.
+
+Clients are built once (at app startup for the configured provider, or on
+first use) and shared by every request, so HTTP connections are pooled and
+no provider call blocks the event loop. Pool size and timeouts come from
+settings. SDK-level retries are off because the rate limiter owns retries.
+Provider SDKs are imported lazily; only the ones in use need to be installed.
+"""
+import logging
+from typing import Any
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OpenAI-compatible providers and their API base URLs (None = SDK default)
+OPENAI_COMPATIBLE_BASE_URLS = {
+    "openai": None,
+    "groq": "https://api.groq.com/openai/v1",
+    "together": "https://api.together.xyz/v1",
+}
+
+# Built clients by provider
+_clients: dict[str, Any] = {}
+
+
+def _http_options() -> dict:
+    import httpx
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections
+        ),
+        "timeout": httpx.Timeout(settings.llm_request_timeout, connect=settings.llm_connect_timeout),
+    }
+
+
+def build_client(provider: str) -> Any:
+    """Create the async client for a provider"""
+    api_key = settings.get_api_key(provider)
+
+    if provider == "anthropic":
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+        return AsyncAnthropic(
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(**_http_options())
+        )
+    elif provider in OPENAI_COMPATIBLE_BASE_URLS:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        return AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,
+            base_url=OPENAI_COMPATIBLE_BASE_URLS[provider],
+            http_client=DefaultAsyncHttpxClient(**_http_options())
+        )
+    elif provider == "google":
+        # The Gemini SDK manages its own transport; configure it once per process
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai
+    elif provider == "mock":
+        from app.services import mock_llm
+        return mock_llm
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def get_client(provider: str) -> Any:
+    """Shared async client for a provider, built on first use"""
+    client = _clients.get(provider)
+    if client is None:
+        client = _clients[provider] = build_client(provider)
+        logger.info(f"Created {provider} client (max {settings.llm_max_connections} connections)")
+    return client
+
+
+def start_clients():
+    """Build the configured providers' clients (called on app startup)"""
+    for provider in settings.get_providers():
+        if settings.get_api_key(provider):
+            get_client(provider)
+
+
+async def close_clients():
+    """Close pooled connections (called on app shutdown)"""
+    for provider, client in list(_clients.items()):
+        if provider not in ("google", "mock"):
+            await client.close()
+    _clients.clear()
@@ -0,0 +1,183 @@
+"""Offline stand-in for an LLM provider, for load testing (llm_provider = "mock").
+
+Responses are derived from a hash of the prompt, so the same prompt always
+gets the same answer, and they follow the formats the pipeline asks for:
+the scoring prompt (one score per axis in its JSON template, plus the
+category when asked), the recommendations prompt (a JSON array citing the
+listed regulations) and the category detection prompt.
+
+Latency follows a configurable distribution, and a share of calls can fail
+with a retryable error or return malformed JSON. When a cassette directory is
+configured, recorded real responses are replayed instead (with their
+recorded latency), falling back to synthesized ones for unknown prompts.
+Real provider responses are recorded there while `mock_record` is on.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from pathlib import Path
+from typing import AsyncIterator
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["biomedical", "semiconductor", "ai_ml", "cybersecurity", "chemistry", "nuclear"]
+
+_rng = random.Random(settings.mock_seed)
+
+
+class MockLLMError(Exception):
+    """Injected provider failure (looks like an HTTP 503 to the rate limiter)"""
+    status_code = 503
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+
+
+def prompt_key(prompt: str) -> str:
+    """Cassette key: independent of provider and model, so any recording replays"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+# -- synthesized responses ------------------------------------------------
+
+def _scoring_response(prompt: str) -> str:
+    axis_ids = re.findall(r'"([A-Za-z0-9_]+)": \{"score": <0-3>', prompt)
+    response = {}
+    if '"category": "<category_id>"' in prompt:
+        response["category"] = _category(prompt)
+    for axis_id in axis_ids:
+        h = _digest(prompt, axis_id)
+        # Skewed towards low scores, like real assessments
+        score = [0, 0, 1, 1, 1, 2, 2, 3][h[0] % 8]
+        response[axis_id] = {
+            "score": score,
+            "rationale": f"Mock rationale for {axis_id}: signal level {score} based on the paper content."
+        }
+    return "```json\n" + json.dumps(response, indent=2) + "\n```"
+
+
+def _recommendations_response(prompt: str) -> str:
+    regulations = re.findall(r"^- (.+)$", prompt.split("## Relevant Regulatory Frameworks", 1)[-1], re.MULTILINE)
+    regulations = regulations or ["applicable regulations"]
+    tier = re.search(r"\*\*Risk Tier:\*\* (\w+)", prompt)
+    level = tier.group(1) if tier else "assessed"
+    h = _digest(prompt)
+    count = 2 + h[0] % 2
+    return json.dumps([
+        f"Given the {level} risk tier, review release plans against {regulations[(h[1] + i) % len(regulations)]} "
+        f"before publication (mock recommendation {i + 1})."
+        for i in range(count)
+    ])
+
+
+def _category(prompt: str) -> str:
+    return CATEGORIES[_digest(prompt, "category")[0] % len(CATEGORIES)]
+
+
+def synthesize(prompt: str) -> str:
+    """Deterministic response in the format the prompt asks for"""
+    if '{"score": <0-3>' in prompt:
+        return _scoring_response(prompt)
+    if "governance recommendations" in prompt:
+        return _recommendations_response(prompt)
+    if "Category ID:" in prompt:
+        return _category(prompt)
+    return "OK"
+
+
+def corrupt(text: str) -> str:
+    """Malformed variant of a JSON response: truncated or with a stray character"""
+    if _rng.random() < 0.5:
+        return text[:max(1, int(len(text) * _rng.uniform(0.3, 0.9)))]
+    pos = _rng.randrange(len(text)) if text else 0
+    return text[:pos] + _rng.choice(['"', ",", "}", "\n"]) + text[pos:]
+
+
+def latency() -> float:
+    """Seconds for one synthesized call, drawn from the configured distribution"""
+    median = settings.mock_latency_ms / 1000
+    if settings.mock_latency_distribution == "fixed":
+        return median
+    if settings.mock_latency_distribution == "uniform":
+        return max(0.0, _rng.uniform(median * (1 - settings.mock_latency_spread), median * (1 + settings.mock_latency_spread)))
+    # Lognormal: a long right tail, like real provider latency
+    return _rng.lognormvariate(0, settings.mock_latency_spread) * median
+
+
+# -- cassettes ------------------------------------------------------------
+
+def _cassette_path(key: str) -> Path:
+    return settings.mock_cassette_dir / key[:2] / f"{key}.json"
+
+
+def load_recording(prompt: str) -> dict | None:
+    if settings.mock_cassette_dir is None:
+        return None
+    path = _cassette_path(prompt_key(prompt))
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cassette {path.name}: {e}")
+        return None
+
+
+def record(prompt: str, provider: str, model: str, text: str, seconds: float):
+    """Save a real provider response to the cassette directory"""
+    if settings.mock_cassette_dir is None or not settings.mock_record:
+        return
+    path = _cassette_path(prompt_key(prompt))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({
+        "provider": provider,
+        "model": model,
+        "latency": round(seconds, 3),
+        "recorded": time.time(),
+        "text": text
+    }), encoding="utf-8")
+    tmp.replace(path)
+
+
+# -- provider interface ---------------------------------------------------
+
+def _plan(prompt: str, schema: dict | None) -> tuple[str, float]:
+    """Response text and latency for one call, raising injected failures"""
+    recording = load_recording(prompt)
+    if recording is not None:
+        text, seconds = recording["text"], recording.get("latency", 0.0) * settings.mock_replay_speed
+    else:
+        text, seconds = synthesize(prompt), latency()
+        if schema is not None:
+            # Structured output comes back as bare JSON
+            text = text.removeprefix("```json\n").removesuffix("\n```")
+
+    if _rng.random() < settings.mock_error_rate:
+        raise MockLLMError("mock provider: injected failure")
+    if text.lstrip("`json\n").startswith(("{", "[")) and _rng.random() < settings.mock_malformed_rate:
+        text = corrupt(text)
+    return text, seconds
+
+
+async def complete(prompt: str, schema: dict | None = None) -> str:
+    """One mock completion"""
+    text, seconds = _plan(prompt, schema)
+    await asyncio.sleep(seconds)
+    return text
+
+
+async def stream(prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Mock completion in chunks; about a fifth of the latency comes before the first one"""
+    text, seconds = _plan(prompt, schema)
+    chunks = [text[i:i + 24] for i in range(0, len(text), 24)] or [""]
+    await asyncio.sleep(seconds * 0.2)
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(seconds * 0.8 / len(chunks))
@@ -0,0 +1,191 @@
+"""The assessment pipeline: LLM scoring, tier, recommendations.
+
+Shared by the assess endpoints. Builds the Assessment record without storing
+it, so callers decide how to persist. `stream_assessment` runs the same steps
+but reports each result as soon as it is known. A near-duplicate of a stored
+paper reuses that assessment's scores and recommendations without any LLM call.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator
+from app.config import settings
+from app.models import AssessRequest, Assessment, ResearchInput, AxisInfo, ResearchCategory, RiskAxis, ScoringResult, Tier
+from app.services import llm_cache
+from app.services.category_classifier import normalize_category
+from app.services.duplicate_index import find_duplicate
+from app.services.risk_scorer import get_axes_snapshot, score_research, score_research_stream
+from app.services.governance import compute_tier, generate_llm_recommendations
+from app.services.token_budget import TokenUsage, metered
+
+logger = logging.getLogger(__name__)
+
+
+def category_enum(detected_category: str | None) -> ResearchCategory | None:
+    """Convert a detected category string to the enum (None if not recognized)"""
+    if not detected_category:
+        return None
+    category = normalize_category(detected_category)
+    return ResearchCategory(category) if category else None
+
+
+def axes_info(axes_used: list[RiskAxis]) -> list[AxisInfo]:
+    """Convert axes to AxisInfo for storage"""
+    return [
+        AxisInfo(
+            id=ax.id,
+            name=ax.name,
+            section=getattr(ax, 'section', None),
+            reverse_scored=getattr(ax, 'reverse_scored', False)
+        )
+        for ax in axes_used
+    ]
+
+
+def make_assessment(
+    request: AssessRequest,
+    result: ScoringResult,
+    tier: Tier,
+    recommendations: list[str],
+    usage: TokenUsage
+) -> Assessment:
+    """Build the assessment record"""
+    research_input = ResearchInput(
+        title=request.title,
+        abstract=request.abstract,
+        snippet=request.snippet,
+        source_url=request.source_url,
+        dissemination=request.dissemination,
+        audience=request.audience,
+        category=category_enum(result.category)
+    )
+
+    return Assessment(
+        input=research_input,
+        scores=result.scores,
+        tier=tier,
+        recommendations=recommendations,
+        axes_used=axes_info(result.axes_used),
+        axes_version=result.axes_version,
+        llm_provider=result.provider,
+        llm_model=result.model,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens
+    )
+
+
+async def find_reusable(request: AssessRequest) -> Assessment | None:
+    """A stored near-duplicate's assessment rebuilt for this request (tier recomputed), if any"""
+    if not settings.duplicate_detection or llm_cache.bypassed():
+        return None
+    found = await asyncio.to_thread(
+        find_duplicate, request.title, request.abstract, get_axes_snapshot().version, settings.duplicate_threshold
+    )
+    if found is None:
+        return None
+    match, similarity = found
+    original = match.duplicate_of or match.id
+    logger.info(f"Reusing assessment {original} for near-duplicate paper (similarity {similarity:.2f})")
+
+    research_input = ResearchInput(
+        title=request.title,
+        abstract=request.abstract,
+        snippet=request.snippet,
+        source_url=request.source_url,
+        dissemination=request.dissemination,
+        audience=request.audience,
+        category=match.input.category
+    )
+    return Assessment(
+        input=research_input,
+        scores=match.scores,
+        tier=compute_tier(match.scores, request.dissemination, request.audience),
+        recommendations=match.recommendations,
+        axes_used=match.axes_used,
+        axes_version=match.axes_version,
+        llm_provider=match.llm_provider,
+        llm_model=match.llm_model,
+        prompt_tokens=0,
+        completion_tokens=0,
+        duplicate_of=original,
+        duplicate_similarity=round(similarity, 3)
+    )
+
+
+async def build_assessment(request: AssessRequest) -> Assessment:
+    """Score, tier and recommend for one paper"""
+    reused = await find_reusable(request)
+    if reused is not None:
+        return reused
+
+    with metered() as usage:
+        # Score using LLM - category is auto-detected
+        result = await score_research(
+            title=request.title,
+            abstract=request.abstract,
+            snippet=request.snippet
+        )
+
+        # Compute tier based on scores and metadata
+        tier = compute_tier(result.scores, request.dissemination, request.audience)
+
+        # Generate LLM-based recommendations considering category, risk, and regulations
+        recommendations = await generate_llm_recommendations(
+            title=request.title,
+            abstract=request.abstract,
+            category=result.category,
+            tier=tier,
+            scores=result.scores
+        )
+
+    return make_assessment(request, result, tier, recommendations, usage)
+
+
+async def stream_assessment(request: AssessRequest) -> AsyncIterator[tuple[str, Any]]:
+    """Run the pipeline, yielding (event, data) pairs as results arrive.
+
+    Events: "axes" (list[AxisInfo]), "category" (str), "axis" (id,
+    AxisScore), "scores" (the final RiskScores), "tier" (Tier),
+    "recommendations" (list[str]), and last "assessment" (the unsaved
+    Assessment).
+    """
+    reused = await find_reusable(request)
+    if reused is not None:
+        yield "axes", reused.axes_used or []
+        if reused.input.category is not None:
+            yield "category", reused.input.category.value
+        for axis_id, score in reused.scores.scores.items():
+            yield "axis", (axis_id, score)
+        yield "scores", reused.scores
+        yield "tier", reused.tier
+        yield "recommendations", reused.recommendations
+        yield "assessment", reused
+        return
+
+    result = None
+    with metered() as usage:
+        async for event, data in score_research_stream(
+            title=request.title,
+            abstract=request.abstract,
+            snippet=request.snippet
+        ):
+            if event == "result":
+                result = data
+            elif event == "axes":
+                yield event, axes_info(data)
+            else:
+                yield event, data
+        yield "scores", result.scores
+
+        tier = compute_tier(result.scores, request.dissemination, request.audience)
+        yield "tier", tier
+
+        recommendations = await generate_llm_recommendations(
+            title=request.title,
+            abstract=request.abstract,
+            category=result.category,
+            tier=tier,
+            scores=result.scores
+        )
+        yield "recommendations", recommendations
+
+    yield "assessment", make_assessment(request, result, tier, recommendations, usage)
@@ -0,0 +1,281 @@
+"""Failover, hedging and health tracking across the configured LLM providers.
+
+Providers are tried in settings order (`llm_providers`, default just
+`llm_provider`), skipping any without an API key. Each provider has a health
+record: recent latencies and a circuit breaker that stops sending to it after
+`llm_circuit_failures` consecutive failures, then lets a single trial request
+through once `llm_circuit_cooldown` has passed.
+
+A call goes to the first healthy provider. If it fails (after its own rate
+limiter retries) or returns a response the caller cannot use, the next one
+is tried. With `llm_hedge` on, a slow first provider does not have to fail:
+once the hedge delay passes (its p95 latency unless configured) the prompt is
+also sent to the next provider, and the first usable response wins.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable
+from pydantic import BaseModel
+from app.config import settings
+from app.services.rate_limiter import LLMUnavailableError, error_status
+from app.services.token_budget import provider_usage
+
+logger = logging.getLogger(__name__)
+
+# Hedge delay until a provider has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 10.0
+MIN_LATENCY_SAMPLES = 20
+
+
+class LLMResponse(BaseModel):
+    """Response text and where it came from"""
+    text: str
+    provider: str
+    model: str
+    cached: bool = False
+
+
+def counts_against_provider(error: Exception) -> bool:
+    """Failures that say something about the provider rather than the prompt"""
+    status = error_status(error)
+    return status is None or status >= 500 or status in (401, 403, 429)
+
+
+class ProviderHealth:
+    """Latency history and circuit breaker for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.latencies: deque[float] = deque(maxlen=200)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.llm_circuit_cooldown:
+            return "half-open"
+        return "open"
+
+    def available(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.probing)
+
+    def begin(self):
+        if self.state == "half-open":
+            self.probing = True
+
+    def cancel(self):
+        self.probing = False
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logger.info(f"{self.provider} recovered; closing its circuit")
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.probing = False
+        if not counts_against_provider(error):
+            return
+        self.consecutive_failures += 1
+        if self.opened_at is not None or self.consecutive_failures >= settings.llm_circuit_failures:
+            if self.opened_at is None:
+                logger.warning(f"Opening circuit for {self.provider} after {self.consecutive_failures} failures")
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, settings.llm_circuit_cooldown - (time.monotonic() - self.opened_at))
+
+    def p95(self) -> float | None:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+class ProviderPool:
+    """Ordered providers with failover and optional hedging"""
+
+    def __init__(self):
+        self.health: dict[str, ProviderHealth] = {}
+
+    def _health(self, provider: str) -> ProviderHealth:
+        health = self.health.get(provider)
+        if health is None:
+            health = self.health[provider] = ProviderHealth(provider)
+        return health
+
+    def providers(self) -> list[str]:
+        """Configured providers that have an API key, in failover order"""
+        return [p for p in settings.get_providers() if settings.get_api_key(p)]
+
+    def candidates(self) -> list[str]:
+        """Providers to try now; raises LLMUnavailableError when every circuit is open"""
+        providers = self.providers()
+        if not providers:
+            raise ValueError(f"No API key configured for provider: {settings.llm_provider}")
+        available = [p for p in providers if self._health(p).available()]
+        if not available:
+            retry_after = min(self._health(p).retry_after() for p in providers)
+            raise LLMUnavailableError(
+                ", ".join(providers), RuntimeError("circuit open for every provider"), retry_after or None
+            )
+        return available
+
+    def hedge_delay(self, provider: str) -> float:
+        if settings.llm_hedge_delay is not None:
+            return settings.llm_hedge_delay
+        return self._health(provider).p95() or DEFAULT_HEDGE_DELAY
+
+    def _start(self, provider: str, call: Callable[[str], Awaitable[str]]) -> asyncio.Task:
+        health = self._health(provider)
+        health.begin()
+
+        async def attempt() -> LLMResponse:
+            started = time.monotonic()
+            try:
+                text = await call(provider)
+            except asyncio.CancelledError:
+                health.cancel()
+                raise
+            except Exception as e:
+                health.record_failure(e)
+                raise
+            health.record_success(time.monotonic() - started)
+            return LLMResponse(text=text, provider=provider, model=settings.get_model(provider))
+
+        return asyncio.ensure_future(attempt())
+
+    async def complete(
+        self,
+        call: Callable[[str], Awaitable[str]],
+        validate: Callable[[str], bool] | None = None
+    ) -> LLMResponse:
+        """First usable response from the providers.
+
+        `call(provider)` sends the prompt to one provider. A response that
+        fails `validate` moves on to the next provider; if none is usable the
+        first response is returned anyway so the caller can salvage it.
+        """
+        candidates = self.candidates()
+        pending: dict[asyncio.Task, str] = {}
+        errors: list[Exception] = []
+        fallback: LLMResponse | None = None
+        next_index = 0
+
+        try:
+            while pending or next_index < len(candidates):
+                if not pending:
+                    pending[self._start(candidates[next_index], call)] = candidates[next_index]
+                    next_index += 1
+
+                hedge = settings.llm_hedge and len(pending) == 1 and next_index < len(candidates)
+                timeout = self.hedge_delay(next(iter(pending.values()))) if hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    provider = candidates[next_index]
+                    logger.info(f"Hedging slow {next(iter(pending.values()))} request with {provider}")
+                    pending[self._start(provider, call)] = provider
+                    next_index += 1
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        logger.warning(f"{provider} failed: {e}")
+                        errors.append(e)
+                        continue
+                    if validate is None or validate(response.text):
+                        return response
+                    logger.warning(f"{provider} returned an unusable response")
+                    fallback = fallback or response
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if fallback is not None:
+            return fallback
+        unavailable = [e for e in errors if isinstance(e, LLMUnavailableError)]
+        raise (unavailable[0] if unavailable else errors[-1])
+
+    async def stream(self, open_stream: Callable[[str], AsyncIterator[str]]) -> AsyncIterator[LLMResponse]:
+        """Stream from the first provider that starts answering.
+
+        Providers that fail before their first chunk are skipped; once text
+        has been yielded an error propagates. Streams are not hedged.
+        """
+        errors: list[Exception] = []
+        for provider in self.candidates():
+            health = self._health(provider)
+            health.begin()
+            model = settings.get_model(provider)
+            started = time.monotonic()
+            chunks = open_stream(provider)
+            try:
+                first = await anext(chunks)
+            except StopAsyncIteration:
+                health.record_success(time.monotonic() - started)
+                return
+            except asyncio.CancelledError:
+                health.cancel()
+                raise
+            except Exception as e:
+                health.record_failure(e)
+                logger.warning(f"{provider} failed: {e}")
+                errors.append(e)
+                continue
+
+            try:
+                yield LLMResponse(text=first, provider=provider, model=model)
+                async for text in chunks:
+                    yield LLMResponse(text=text, provider=provider, model=model)
+            except Exception as e:
+                health.record_failure(e)
+                raise
+            finally:
+                # Also ends a trial request abandoned by the consumer
+                health.cancel()
+                await chunks.aclose()
+            health.record_success(time.monotonic() - started)
+            return
+
+        unavailable = [e for e in errors if isinstance(e, LLMUnavailableError)]
+        raise (unavailable[0] if unavailable else errors[-1])
+
+    def stats(self) -> dict:
+        return {p: {**self._health(p).stats(), **provider_usage(p)} for p in settings.get_providers()}
+
+
+_pool: ProviderPool | None = None
+
+
+def get_pool() -> ProviderPool:
+    global _pool
+    if _pool is None:
+        _pool = ProviderPool()
+    return _pool
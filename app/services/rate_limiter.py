@@ -0,0 +1,234 @@
+"""Per-provider throttling for LLM calls.
+
+Every provider call goes through a ProviderLimiter, which combines:
+
+- token buckets for requests/minute and (estimated prompt) tokens/minute,
+  configured per provider in settings; unset means unlimited;
+- an AIMD concurrency cap: it grows by about one slot per window of
+  successful calls and halves when the provider answers 429 or 5xx;
+- retries with exponential backoff and full jitter, honouring Retry-After.
+
+When retries run out on an overload error, LLMUnavailableError is raised so
+callers can fail the request instead of storing placeholder scores.
+"""
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ServiceUnavailable", "DeadlineExceeded"}
+
+
+class LLMUnavailableError(Exception):
+    """The provider stayed rate-limited or unavailable through every retry"""
+
+    def __init__(self, provider: str, cause: Exception, retry_after: float | None = None):
+        super().__init__(f"{provider} unavailable after retries: {cause}")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def error_status(error: Exception) -> int | None:
+    """HTTP status carried by a provider SDK error, if any"""
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Delay requested by the provider through Retry-After (seconds or HTTP date)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in RETRYABLE_ERRORS or isinstance(error, asyncio.TimeoutError)
+
+
+def is_overload(error: Exception) -> bool:
+    """Errors that mean the provider wants less traffic"""
+    status = error_status(error)
+    return status == 429 or (status is not None and status >= 500) or type(error).__name__ == "ServiceUnavailable"
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute, holding at most a minute's worth"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        # Requests larger than the bucket wait for a full bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) * 60 / self.per_minute)
+
+
+class AdaptiveConcurrency:
+    """AIMD cap on in-flight calls"""
+
+    def __init__(self, name: str, minimum: int, maximum: int):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, overloaded: bool = False):
+        async with self._changed:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit / 2)
+                logger.warning(f"{self.name} overloaded; concurrency limit now {int(self.limit)}")
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._changed.notify_all()
+
+
+class ProviderLimiter:
+    """Rate limits, adaptive concurrency and retries for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        rpm = settings.llm_requests_per_minute.get(provider)
+        tpm = settings.llm_tokens_per_minute.get(provider)
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(provider, 1, settings.llm_max_concurrency)
+
+    async def _admit(self, prompt_tokens: int):
+        """Wait for the rate limits and a concurrency slot"""
+        if self.requests:
+            await self.requests.acquire()
+        if self.tokens:
+            await self.tokens.acquire(prompt_tokens)
+        await self.concurrency.acquire()
+
+    async def _backoff(self, error: Exception, attempt: int) -> int:
+        """Sleep before the next attempt, or re-raise if `error` is final; returns the next attempt number"""
+        if not is_retryable(error):
+            raise error
+        retry_after = retry_after_seconds(error)
+        if attempt >= settings.llm_max_retries:
+            raise LLMUnavailableError(self.provider, error, retry_after) from error
+        backoff = random.uniform(0, min(settings.llm_retry_max_delay, settings.llm_retry_base_delay * 2 ** attempt))
+        delay = max(backoff, retry_after or 0)
+        attempt += 1
+        logger.warning(
+            f"{self.provider} call failed ({error}); retry {attempt}/{settings.llm_max_retries} in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+        return attempt
+
+    async def run(self, call: Callable[[], Awaitable[str]], prompt_tokens: int) -> str:
+        """Run a provider call under the limits, retrying transient failures"""
+        attempt = 0
+        while True:
+            await self._admit(prompt_tokens)
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                # e.g. the losing side of a hedged request; give the slot back
+                await self.concurrency.release()
+                raise
+            except Exception as e:
+                await self.concurrency.release(overloaded=is_overload(e))
+                attempt = await self._backoff(e, attempt)
+                continue
+            await self.concurrency.release()
+            return result
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[str]], prompt_tokens: int) -> AsyncIterator[str]:
+        """Stream a provider response under the limits.
+
+        Failures before the first chunk are retried like `run`; once text has
+        been yielded an error propagates, since the caller has seen part of it.
+        """
+        attempt = 0
+        while True:
+            await self._admit(prompt_tokens)
+            chunks = open_stream()
+            try:
+                first = await anext(chunks)
+            except asyncio.CancelledError:
+                await self.concurrency.release()
+                raise
+            except StopAsyncIteration:
+                await self.concurrency.release()
+                return
+            except Exception as e:
+                await self.concurrency.release(overloaded=is_overload(e))
+                attempt = await self._backoff(e, attempt)
+                continue
+            break
+
+        overloaded = False
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            await chunks.aclose()
+            await self.concurrency.release(overloaded=overloaded)
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        limiter = _limiters[provider] = ProviderLimiter(provider)
+    return limiter
@@ -0,0 +1,316 @@
+"""Random access to the assessment log through per-segment offset indexes.
+
+Every segment gets a sidecar file (<segment>.idx) holding the id, timestamp,
+byte offset and length of each record in it. Sidecars load without parsing
+any records and are merged into one (timestamp, id)-ordered array, so a
+lookup by id or a page of history only decodes the records it returns.
+Uncompressed segments are memory-mapped; compressed segments and archives
+are decompressed on access (the most recent one is kept).
+
+A sidecar remembers the inode and size of the segment it describes. When a
+segment grows only its new tail is indexed; a replaced segment (e.g. a
+re-compacted archive) is indexed again from scratch.
+"""
+import logging
+import mmap
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+from app.models import Assessment, AssessmentFilters
+from app.services.codecs import RecordCodec, segment_format
+from app.services.segment_log import SegmentLog
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = ".idx"
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _micros(ts: datetime) -> int:
+    return (ts - EPOCH) // ONE_MICROSECOND
+
+
+class SegmentIndex:
+    """Offsets of the records in one segment, in file order"""
+
+    def __init__(
+        self,
+        inode: int = 0,
+        size: int = 0,
+        data_size: int = 0,
+        ids: np.ndarray | None = None,
+        timestamps: np.ndarray | None = None,
+        offsets: np.ndarray | None = None,
+        lengths: np.ndarray | None = None
+    ):
+        self.inode = inode
+        # Bytes of the file covered, and of its (decompressed) record data
+        self.size = size
+        self.data_size = data_size
+        self.ids = ids if ids is not None else np.array([], dtype="U1")
+        self.timestamps = timestamps if timestamps is not None else np.array([], dtype=np.int64)
+        self.offsets = offsets if offsets is not None else np.array([], dtype=np.int64)
+        self.lengths = lengths if lengths is not None else np.array([], dtype=np.int64)
+
+    @classmethod
+    def load(cls, path: Path) -> "SegmentIndex | None":
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as z:
+                inode, size, data_size = (int(v) for v in z["meta"])
+                return cls(inode, size, data_size, z["ids"], z["timestamps"], z["offsets"], z["lengths"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable offset index {path.name}: {e}")
+            return None
+
+    def save(self, path: Path):
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array([self.inode, self.size, self.data_size], dtype=np.int64),
+                ids=self.ids,
+                timestamps=self.timestamps,
+                offsets=self.offsets,
+                lengths=self.lengths
+            )
+        tmp.replace(path)
+
+
+class RecordIndex:
+    """Id and timestamp index over every record of a segment log"""
+
+    def __init__(self, log: SegmentLog):
+        self.log = log
+        self._lock = threading.Lock()
+        self._fingerprint: tuple | None = None
+        self._segments: dict[str, SegmentIndex] = {}
+        self._maps: dict[str, tuple[int, int, mmap.mmap]] = {}
+        self._decompressed: tuple[str, int, int, bytes] | None = None
+
+        # Merged view, ordered by (timestamp, id)
+        self._names: list[str] = []
+        self._ids = np.array([], dtype="U1")
+        self._timestamps = np.array([], dtype=np.int64)
+        self._segment_nos = np.array([], dtype=np.int32)
+        self._offsets = np.array([], dtype=np.int64)
+        self._lengths = np.array([], dtype=np.int64)
+        self._by_id: dict[str, int] = {}
+
+    def close(self):
+        """Release memory maps (before segments are replaced or removed)"""
+        with self._lock:
+            for *_, mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            self._decompressed = None
+            self._fingerprint = None
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the log; returns the record count"""
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    # -- maintenance ----------------------------------------------------
+
+    def _refresh(self):
+        fingerprint = self.log.fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+
+        present = {}
+        replaced = False
+        for name, _, _ in fingerprint:
+            segment = self.log.directory / name
+            st = segment.stat()
+            current = self._segments.get(name) or SegmentIndex.load(segment.with_name(name + SIDECAR_SUFFIX))
+            if current is not None and (current.inode != st.st_ino or current.size > st.st_size):
+                replaced = replaced or name in self._segments
+                current = None
+            if current is None or current.size != st.st_size:
+                current = self._index_tail(segment, current, st)
+                current.save(segment.with_name(name + SIDECAR_SUFFIX))
+            present[name] = current
+        removed = set(self._segments) - set(present)
+
+        for name in removed:
+            if name in self._maps:
+                self._maps.pop(name)[2].close()
+        self._remove_orphan_sidecars(present)
+
+        previous = self._segments
+        self._segments = present
+        self._fingerprint = fingerprint
+        if previous and not removed and not replaced and self._extend(previous):
+            return
+        self._rebuild()
+
+    def _index_tail(self, segment: Path, previous: SegmentIndex | None, st) -> SegmentIndex:
+        """Index the records added to a segment since `previous` was taken"""
+        _, codec, compression = segment_format(segment.name, self.log.codec)
+        data = self._data(segment.name)
+        start = previous.data_size if previous else 0
+        spans, end = codec.spans(data, start)
+
+        ids, timestamps, offsets, lengths = [], [], [], []
+        for offset, length in spans:
+            try:
+                a = codec.decode(data[offset:offset + length])
+            except ValueError as e:
+                logger.warning(f"Not indexing unreadable record in {segment.name}: {e}")
+                continue
+            ids.append(a.id)
+            timestamps.append(_micros(a.naive_timestamp()))
+            offsets.append(offset)
+            lengths.append(length)
+
+        base = previous or SegmentIndex()
+        return SegmentIndex(
+            inode=st.st_ino,
+            size=st.st_size,
+            data_size=end,
+            ids=np.concatenate([base.ids, np.array(ids, dtype=str)]) if ids else base.ids,
+            timestamps=np.concatenate([base.timestamps, np.array(timestamps, dtype=np.int64)]),
+            offsets=np.concatenate([base.offsets, np.array(offsets, dtype=np.int64)]),
+            lengths=np.concatenate([base.lengths, np.array(lengths, dtype=np.int64)])
+        )
+
+    def _remove_orphan_sidecars(self, present: dict[str, SegmentIndex]):
+        for sidecar in self.log.directory.glob(f"*{SIDECAR_SUFFIX}"):
+            if sidecar.name.removesuffix(SIDECAR_SUFFIX) not in present:
+                sidecar.unlink(missing_ok=True)
+
+    def _rebuild(self):
+        """Merge every segment index into one (timestamp, id)-ordered view"""
+        self._names = list(self._segments)
+        indexes = list(self._segments.values())
+        if not indexes:
+            indexes = [SegmentIndex()]
+        ids = np.concatenate([s.ids for s in indexes])
+        timestamps = np.concatenate([s.timestamps for s in indexes])
+        order = np.lexsort((ids, timestamps))
+        self._ids = ids[order]
+        self._timestamps = timestamps[order]
+        self._segment_nos = np.concatenate([
+            np.full(len(s.ids), n, dtype=np.int32) for n, s in enumerate(indexes)
+        ])[order]
+        self._offsets = np.concatenate([s.offsets for s in indexes])[order]
+        self._lengths = np.concatenate([s.lengths for s in indexes])[order]
+        # Later entries win, as in the assessment cache
+        self._by_id = {assessment_id: pos for pos, assessment_id in enumerate(self._ids.tolist())}
+
+    def _extend(self, previous: dict[str, SegmentIndex]) -> bool:
+        """Append records added since the last refresh, if they sort after everything indexed.
+
+        Returns False when a full rebuild is needed instead.
+        """
+        names = self._names + [name for name in self._segments if name not in previous]
+        new = []
+        for n, name in enumerate(names):
+            current = self._segments[name]
+            start = len(previous[name].ids) if name in previous else 0
+            for i in range(start, len(current.ids)):
+                new.append((
+                    int(current.timestamps[i]), str(current.ids[i]), n,
+                    int(current.offsets[i]), int(current.lengths[i])
+                ))
+        new.sort()
+        if new and len(self._ids) and new[0][:2] < (int(self._timestamps[-1]), str(self._ids[-1])):
+            return False
+
+        start = len(self._ids)
+        self._names = names
+        if new:
+            self._ids = np.concatenate([self._ids, np.array([r[1] for r in new], dtype=str)])
+        self._timestamps = np.concatenate([self._timestamps, np.array([r[0] for r in new], dtype=np.int64)])
+        self._segment_nos = np.concatenate([self._segment_nos, np.array([r[2] for r in new], dtype=np.int32)])
+        self._offsets = np.concatenate([self._offsets, np.array([r[3] for r in new], dtype=np.int64)])
+        self._lengths = np.concatenate([self._lengths, np.array([r[4] for r in new], dtype=np.int64)])
+        for pos, r in enumerate(new, start):
+            self._by_id[r[1]] = pos
+        return True
+
+    # -- record access --------------------------------------------------
+
+    def _data(self, name: str):
+        """Record data of a segment: a memory map, or the decompressed bytes"""
+        segment = self.log.directory / name
+        _, _, compression = segment_format(name, self.log.codec)
+        st = segment.stat()
+        if compression.suffix:
+            cached = self._decompressed
+            if cached is None or cached[:3] != (name, st.st_ino, st.st_size):
+                data, _ = compression.decompress(segment.read_bytes())
+                cached = self._decompressed = (name, st.st_ino, st.st_size, data)
+            return cached[3]
+
+        if st.st_size == 0:
+            return b""
+        mapped = self._maps.get(name)
+        if mapped is None or mapped[:2] != (st.st_ino, st.st_size):
+            if mapped is not None:
+                mapped[2].close()
+            with open(segment, "rb") as f:
+                mapped = (st.st_ino, st.st_size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[name] = mapped
+        return mapped[2]
+
+    def _decode(self, pos: int) -> Assessment | None:
+        name = self._names[self._segment_nos[pos]]
+        offset = int(self._offsets[pos])
+        payload = self._data(name)[offset:offset + int(self._lengths[pos])]
+        codec: RecordCodec = segment_format(name, self.log.codec)[1]
+        try:
+            return codec.decode(payload)
+        except ValueError as e:
+            logger.warning(f"Skipping unreadable record in {name}: {e}")
+            return None
+
+    def _position(self, before: tuple[datetime, str]) -> int:
+        """Number of entries ordered before the (timestamp, id) key"""
+        ts = _micros(before[0])
+        lo = int(np.searchsorted(self._timestamps, ts, side="left"))
+        hi = int(np.searchsorted(self._timestamps, ts, side="right"))
+        return lo + int(np.searchsorted(self._ids[lo:hi], before[1], side="left"))
+
+    def get(self, assessment_id: str) -> Assessment | None:
+        with self._lock:
+            self._refresh()
+            pos = self._by_id.get(assessment_id)
+            return self._decode(pos) if pos is not None else None
+
+    def page(
+        self,
+        limit: int,
+        before: tuple[datetime, str] | None = None,
+        filters: AssessmentFilters | None = None
+    ) -> list[Assessment]:
+        """Up to `limit` matching assessments older than `before`, newest first.
+
+        Date bounds are resolved on the index; other filters decode candidates
+        newest first until the page is full.
+        """
+        filters = filters or AssessmentFilters()
+        with self._lock:
+            self._refresh()
+            lo, hi = 0, len(self._ids)
+            if filters.date_from:
+                lo = int(np.searchsorted(self._timestamps, _micros(filters.date_from), side="left"))
+            if filters.date_to:
+                hi = min(hi, int(np.searchsorted(self._timestamps, _micros(filters.date_to), side="left")))
+            if before is not None:
+                hi = min(hi, self._position(before))
+
+            result = []
+            for pos in range(hi - 1, lo - 1, -1):
+                if len(result) >= limit:
+                    break
+                a = self._decode(pos)
+                if a is not None and filters.matches(a):
+                    result.append(a)
+            return result
@@ -1,10 +1,33 @@
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Callable
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from app.config import settings
-from app.models import RiskScores, AxisScore, RiskAxis
+from app.models import RiskScores, AxisScore, RiskAxis, ResearchCategory, ScoringResult
+from app.services.llm_clients import get_client
+from app.services.provider_pool import LLMResponse, get_pool
+from app.services import llm_cache, mock_llm
+from app.services.category_classifier import normalize_category, predict_category
+from app.services.rate_limiter import LLMUnavailableError, get_limiter
+from app.services.single_flight import SingleFlight, flight_key, normalize_text
+from app.services.token_budget import budget_tokens, count_tokens, fit_paper, record_usage, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Generation parameters shared by every provider call (part of the cache key)
+MAX_TOKENS = 2048
+
+# Abstract budget of the category detection prompt
+CATEGORY_ABSTRACT_TOKENS = 256
+
+# Concurrent scoring of the same paper shares one set of LLM calls
+scoring_flights = SingleFlight("scoring")
+
 
 def load_axes_config() -> dict:
     """Load axes configuration from JSON file"""
@@ -15,10 +38,8 @@ def load_axes_config() -> dict:
         return {"universal": True, "axes": []}
 
 
-def get_universal_axes() -> list[RiskAxis]:
-    """Get universal risk axes (applies to all categories)"""
-    config = load_axes_config()
-
+def axes_from_config(config: dict) -> list[RiskAxis]:
+    """Risk axes defined by a loaded axes config"""
     if config.get("universal", False):
         axes_data = config.get("axes", [])
         return [RiskAxis(**ax) for ax in axes_data]
@@ -27,6 +48,111 @@ def get_universal_axes() -> list[RiskAxis]:
     return get_fallback_axes()
 
 
+class PromptParts(BaseModel):
+    """Static text of a scoring prompt before and after the paper content"""
+    model_config = ConfigDict(frozen=True)
+
+    prompt_prefix: str
+    prompt_suffix: str
+    # Budget tokens of the prompt without the paper, by (provider, model)
+    _fixed_tokens: dict[tuple[str, str], int] = PrivateAttr(default_factory=dict)
+
+    def build_prompt(self, title: str, abstract: str, snippet: str | None) -> str:
+        """Scoring prompt for one paper"""
+        return budgeted_prompt(
+            self.prompt_prefix, self.prompt_suffix, title, abstract, snippet, self._fixed_tokens
+        )
+
+
+class SectionPrompt(PromptParts):
+    """Scoring prompt parts for one section's axes (section fan-out mode)"""
+    section: str
+    axes: tuple[RiskAxis, ...]
+    json_schema: dict
+
+
+class AxesSnapshot(PromptParts):
+    """Immutable axes config with the static parts of the scoring prompt precomputed"""
+    axes: tuple[RiskAxis, ...]
+    version: str
+    stamp: tuple[int, int] | None  # (mtime_ns, size) of the file it was loaded from
+    json_schema: dict
+    sections: tuple[SectionPrompt, ...]
+
+    @classmethod
+    def build(cls, axes: list[RiskAxis], stamp: tuple[int, int] | None) -> "AxesSnapshot":
+        definition = json.dumps([a.model_dump() for a in axes], sort_keys=True)
+        prefix, suffix = scoring_prompt_parts(axes)
+
+        by_section: dict[str, list[RiskAxis]] = {}
+        for a in axes:
+            by_section.setdefault(a.section or "", []).append(a)
+        sections = []
+        for section, section_axes in by_section.items():
+            section_prefix, section_suffix = scoring_prompt_parts(section_axes, with_category=False)
+            sections.append(SectionPrompt(
+                section=section,
+                axes=tuple(section_axes),
+                prompt_prefix=section_prefix,
+                prompt_suffix=section_suffix,
+                json_schema=scores_schema(section_axes, with_category=False)
+            ))
+
+        return cls(
+            axes=tuple(axes),
+            version=hashlib.sha256(definition.encode("utf-8")).hexdigest()[:12],
+            stamp=stamp,
+            prompt_prefix=prefix,
+            prompt_suffix=suffix,
+            json_schema=scores_schema(axes),
+            sections=tuple(sections)
+        )
+
+
+_axes_snapshot: AxesSnapshot | None = None
+_axes_lock = threading.Lock()
+
+
+def _axes_file_stamp() -> tuple[int, int] | None:
+    try:
+        st = os.stat(settings.axes_file)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_axes_snapshot() -> AxesSnapshot:
+    """Current axes snapshot, reloaded when the axes file changes"""
+    global _axes_snapshot
+    stamp = _axes_file_stamp()
+    snapshot = _axes_snapshot
+    if snapshot is not None and snapshot.stamp == stamp:
+        return snapshot
+
+    with _axes_lock:
+        if _axes_snapshot is not None and _axes_snapshot.stamp == stamp:
+            return _axes_snapshot
+        try:
+            with open(settings.axes_file, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            axes = axes_from_config(config)
+        except Exception as e:
+            if _axes_snapshot is not None:
+                # Likely caught mid-edit; keep serving the last good config
+                logger.warning(f"Keeping axes version {_axes_snapshot.version}; could not reload axes: {e}")
+                _axes_snapshot = _axes_snapshot.model_copy(update={"stamp": stamp})
+                return _axes_snapshot
+            axes = axes_from_config({"universal": True, "axes": []})
+        _axes_snapshot = AxesSnapshot.build(axes, stamp)
+        logger.info(f"Loaded {len(axes)} risk axes (version {_axes_snapshot.version})")
+        return _axes_snapshot
+
+
+def get_universal_axes() -> list[RiskAxis]:
+    """Get universal risk axes (applies to all categories)"""
+    return list(get_axes_snapshot().axes)
+
+
 def get_fallback_axes() -> list[RiskAxis]:
     """Fallback axes if config is invalid"""
     return [
@@ -39,6 +165,48 @@ def get_fallback_axes() -> list[RiskAxis]:
 
 def build_scoring_prompt(title: str, abstract: str, snippet: str | None, axes: list[RiskAxis]) -> str:
     """Build the LLM prompt for risk scoring with category detection"""
+    prefix, suffix = scoring_prompt_parts(axes)
+    return budgeted_prompt(prefix, suffix, title, abstract, snippet)
+
+
+def budgeted_prompt(
+    prefix: str,
+    suffix: str,
+    title: str,
+    abstract: str,
+    snippet: str | None,
+    fixed_tokens: dict[tuple[str, str], int] | None = None
+) -> str:
+    """A scoring prompt with the paper cut to fit settings.scoring_prompt_max_tokens.
+
+    Tokens are estimated for the first provider in failover order. The cost of
+    the prompt without the paper is looked up in (and added to) `fixed_tokens`
+    when given, so static prompts are tokenized once per provider and model.
+    """
+    provider = settings.get_providers()[0]
+    key = (provider, settings.get_model(provider))
+    fixed = fixed_tokens.get(key) if fixed_tokens is not None else None
+    if fixed is None:
+        fixed = budget_tokens(prefix + suffix + paper_content("", "", " "), provider)
+        if fixed_tokens is not None:
+            fixed_tokens[key] = fixed
+    abstract, snippet = fit_paper(title, abstract, snippet, settings.scoring_prompt_max_tokens - fixed, provider)
+    return prefix + paper_content(title, abstract, snippet) + suffix
+
+
+def paper_content(title: str, abstract: str, snippet: str | None) -> str:
+    """The paper section of the scoring prompt"""
+    content_text = f"**Title:** {title}\n\n**Abstract:** {abstract}"
+    if snippet:
+        content_text += f"\n\n**Methods/Contributions Snippet:** {snippet}"
+    return content_text
+
+
+def scoring_prompt_parts(axes: list[RiskAxis], with_category: bool = True) -> tuple[str, str]:
+    """The scoring prompt before and after the paper content (depends only on the axes).
+
+    Without the category the prompt only asks for the axis scores (section fan-out).
+    """
 
     # Group axes by section for clearer presentation
     axes_text = ""
@@ -62,17 +230,18 @@ def build_scoring_prompt(title: str, abstract: str, snippet: str | None, axes: l
         reverse_note = " [NOTE: Higher score = BETTER safeguards = LOWER risk]" if getattr(a, 'reverse_scored', False) else ""
         axes_text += f"- **{a.id} - {a.name}**: {a.question}{reverse_note}\n"
 
-    content_text = f"**Title:** {title}\n\n**Abstract:** {abstract}"
-    if snippet:
-        content_text += f"\n\n**Methods/Contributions Snippet:** {snippet}"
-
     # Build axis IDs for JSON template
     axis_ids = [a.id for a in axes]
     json_template = ",\n    ".join([f'"{aid}": {{"score": <0-3>, "rationale": "<explanation>"}}' for aid in axis_ids])
 
-    prompt = f"""You are a dual-use risk assessor for research papers. Analyze the following research paper, identify its research category, and score it on each risk axis.
-
-## Research Categories (pick the most appropriate one):
+    if not with_category:
+        task = " and score it on each risk axis below"
+        categories_text = ""
+        instructions = "For each axis, provide a score from 0-3 and a brief rationale (1-2 sentences)"
+        category_field = ""
+    else:
+        task = ", identify its research category, and score it on each risk axis"
+        categories_text = """## Research Categories (pick the most appropriate one):
 - **biomedical** - Biomedical / Life Sciences (CRISPR, gene editing, drug discovery, pathogens, etc.)
 - **semiconductor** - Semiconductor / AI Hardware (chip design, EDA, accelerators, etc.)
 - **ai_ml** - AI / Machine Learning (LLMs, training methods, model architectures, etc.)
@@ -80,7 +249,15 @@ def build_scoring_prompt(title: str, abstract: str, snippet: str | None, axes: l
 - **chemistry** - Chemistry / Materials Science (synthesis, energetic materials, novel compounds, etc.)
 - **nuclear** - Nuclear / Radiological (reactors, fuel cycles, radiation, etc.)
 
-## Scoring Rubric (0-3 for each axis):
+"""
+        instructions = """1. First, identify the most appropriate research category from the list above
+2. For each axis, provide a score from 0-3 and a brief rationale (1-2 sentences)"""
+        category_field = """
+    "category": "<category_id>","""
+
+    prefix = f"""You are a dual-use risk assessor for research papers. Analyze the following research paper{task}.
+
+{categories_text}## Scoring Rubric (0-3 for each axis):
 - **0** - Not relevant / clearly benign / strong controls in place
 - **1** - Weak signal, indirect concern, or minor gap
 - **2** - Meaningful concern but mitigated by context or expertise requirements
@@ -92,102 +269,166 @@ def build_scoring_prompt(title: str, abstract: str, snippet: str | None, axes: l
 {axes_text}
 
 ## Research Paper Content:
-{content_text}
+"""
+    suffix = f"""
 
 ## Instructions:
-1. First, identify the most appropriate research category from the list above
-2. For each axis, provide a score from 0-3 and a brief rationale (1-2 sentences)
+{instructions}
 
 Respond ONLY with valid JSON in this exact format:
-{{
-    "category": "<category_id>",
+{{{category_field}
     {json_template}
 }}
 """
-    return prompt
+    return prefix, suffix
 
 
-def parse_llm_response(response_text: str, axes: list[RiskAxis]) -> tuple[RiskScores, str | None]:
-    """Parse JSON response from LLM into RiskScores and detected category"""
-    import re
+def scores_schema(axes: list[RiskAxis], with_category: bool = True) -> dict:
+    """JSON schema of a scoring response, for providers' structured output modes"""
+    properties = {}
+    if with_category:
+        properties["category"] = {"type": "string", "enum": [c.value for c in ResearchCategory]}
+    for a in axes:
+        properties[a.id] = {
+            "type": "object",
+            "description": f"{a.name}: {a.question}",
+            "properties": {
+                "score": {"type": "integer", "enum": [0, 1, 2, 3]},
+                "rationale": {"type": "string"}
+            },
+            "required": ["score", "rationale"],
+            "additionalProperties": False
+        }
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def parse_axis_scores(response_text: str, axes: list[RiskAxis]) -> tuple[dict[str, AxisScore], str | None]:
+    """Valid axis scores and the category from a scoring response.
+
+    Axes that are missing or malformed are left out, for the caller to re-ask.
+    A response that is not valid JSON as a whole (truncated, or broken in one
+    axis) still yields every axis object that is complete on its own.
+    """
+    start, end = response_text.find("{"), response_text.rfind("}")
+    data = None
+    if start != -1 and end > start:
+        try:
+            # strict=False accepts raw newlines and tabs inside strings
+            data = json.loads(response_text[start:end + 1], strict=False)
+        except ValueError:
+            pass
+
+    if not isinstance(data, dict):
+        parser = AxisStreamParser(axes)
+        found, category = {}, None
+        for kind, value in parser.feed(response_text[max(start, 0):]):
+            if kind == "category":
+                category = value
+            else:
+                found[value[0]] = value[1]
+        return found, category
 
-    logger.info(f"Raw LLM response (first 500 chars): {response_text[:500]}")
+    found = {}
+    for a in axes:
+        entry = data.get(a.id)
+        if not isinstance(entry, dict):
+            continue
+        try:
+            found[a.id] = AxisScore(
+                score=entry.get("score"),
+                rationale=entry.get("rationale") or "No rationale provided",
+                reverse_scored=a.reverse_scored
+            )
+        except ValueError:
+            continue
+    category = data.get("category")
+    return found, category if isinstance(category, str) else None
 
-    axis_ids = [a.id for a in axes]
-    axis_reverse_map = {a.id: getattr(a, 'reverse_scored', False) for a in axes}
 
-    # Handle potential markdown code blocks
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0]
-    elif "```" in response_text:
-        parts = response_text.split("```")
-        if len(parts) >= 2:
-            response_text = parts[1]
+def fill_missing_scores(axes: list[RiskAxis], found: dict[str, AxisScore], error_msg: str) -> RiskScores:
+    """RiskScores in axes order, with default scores for axes not in `found`"""
+    return RiskScores(scores={
+        a.id: found.get(a.id) or AxisScore(score=0, rationale=error_msg, reverse_scored=a.reverse_scored)
+        for a in axes
+    })
 
-    response_text = response_text.strip()
 
-    # First attempt: direct JSON parse
-    try:
-        scores_data = json.loads(response_text)
-        category = scores_data.pop("category", None)
-        logger.info(f"Parsed category from JSON: {category}")
-        return build_risk_scores(scores_data, axis_ids, axis_reverse_map), category
-    except (json.JSONDecodeError, KeyError) as e:
-        logger.warning(f"Direct JSON parse failed: {e}")
-
-    # Second attempt: find and clean JSON object
-    match = re.search(r'\{[\s\S]*\}', response_text)
-    # print(response_text)
-    if match:
-        json_str = match.group(0)
-        # Remove control characters
-        json_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', ' ', json_str)
-        # print(json_str)
+class AxisStreamParser:
+    """Picks complete top-level `"<axis>": {...}` objects out of a streamed JSON response.
 
-        try:
-            scores_data = json.loads(json_str)
-            category = scores_data.pop("category", None)
-            # print(category)
-            logger.info(f"Parsed category (2nd attempt): {category}")
-            return build_risk_scores(scores_data, axis_ids, axis_reverse_map), category
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Second JSON parse attempt failed: {e}")
-
-        # Third attempt: regex extraction
-        # Try to extract category with regex
-        cat_match = re.search(r'"category"\s*:\s*"([^"]+)"', json_str)
-        print(cat_match)
-        category = cat_match.group(1) if cat_match else None
-        print(category)
-        logger.info(f"Parsed category (regex): {category}")
-
-        scores_data = extract_scores_with_regex(json_str, axis_ids)
-        return build_risk_scores(scores_data, axis_ids, axis_reverse_map), category
-
-    # No JSON found at all - return defaults
-    return build_default_scores(axis_ids, axis_reverse_map, "No valid JSON found in LLM response"), None
-
-
-def build_risk_scores(scores_data: dict, axis_ids: list[str], axis_reverse_map: dict) -> RiskScores:
-    """Build RiskScores from parsed data with defaults for missing keys"""
-    scores_dict = {}
+    Text before the first "{" (e.g. a markdown fence) is skipped. The full
+    response is still parsed with parse_axis_scores once it is complete.
+    """
 
-    for axis_id in axis_ids:
-        if axis_id in scores_data:
-            data = scores_data[axis_id]
-            scores_dict[axis_id] = AxisScore(
-                score=data.get("score", 0),
-                rationale=data.get("rationale", "No rationale provided"),
-                reverse_scored=axis_reverse_map.get(axis_id, False)
-            )
-        else:
-            scores_dict[axis_id] = AxisScore(
-                score=0,
-                rationale=f"Missing {axis_id} from response",
-                reverse_scored=axis_reverse_map.get(axis_id, False)
+    def __init__(self, axes: list[RiskAxis]):
+        self.axis_reverse_map = {a.id: getattr(a, 'reverse_scored', False) for a in axes}
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.key: str | None = None
+        self.after_colon = False
+        self.object_start = 0
+        self.category_sent = False
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """Consume a chunk; returns ("category", str) and ("axis", (id, AxisScore)) events"""
+        self.buffer += text
+        events = []
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._top_level_string(self.buffer[self.string_start:self.pos + 1], events)
+            elif ch == '"':
+                self.in_string = True
+                self.string_start = self.pos
+            elif ch == ":" and self.depth == 1:
+                self.after_colon = True
+            elif ch == "," and self.depth == 1:
+                self.key, self.after_colon = None, False
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 2:
+                    self.object_start = self.pos
+            elif ch in "}]" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 1 and self.key in self.axis_reverse_map:
+                    self._axis(self.buffer[self.object_start:self.pos + 1], events)
+            self.pos += 1
+        return events
+
+    def _top_level_string(self, literal: str, events: list):
+        try:
+            value = json.loads(literal)
+        except json.JSONDecodeError:
+            return
+        if not self.after_colon:
+            self.key = value
+        elif self.key == "category" and not self.category_sent:
+            self.category_sent = True
+            events.append(("category", value))
+
+    def _axis(self, literal: str, events: list):
+        try:
+            data = json.loads(literal, strict=False)
+            score = AxisScore(
+                score=data.get("score"),
+                rationale=data.get("rationale") or "No rationale provided",
+                reverse_scored=self.axis_reverse_map[self.key]
             )
-
-    return RiskScores(scores=scores_dict)
+        except (AttributeError, ValueError):
+            # Malformed; left out (and re-asked) after the full parse
+            return
+        events.append(("axis", (self.key, score)))
 
 
 def build_default_scores(axis_ids: list[str], axis_reverse_map: dict, error_msg: str) -> RiskScores:
@@ -202,136 +443,341 @@ def build_default_scores(axis_ids: list[str], axis_reverse_map: dict, error_msg:
     return RiskScores(scores=scores_dict)
 
 
-def extract_scores_with_regex(json_str: str, axis_ids: list[str]) -> dict:
-    """Extract scores from malformed JSON using regex"""
-    import re
+# Anthropic structured output: the response is the input of a forced tool call
+SCORES_TOOL = "record_assessment"
 
-    scores_data = {}
 
-    for axis_id in axis_ids:
-        # Find the start of this axis block
-        axis_start = re.search(rf'"{axis_id}"\s*:\s*\{{', json_str)
-        if not axis_start:
-            scores_data[axis_id] = {"score": 0, "rationale": f"Could not find {axis_id} in response"}
-            continue
+def anthropic_structured_options(schema: dict | None) -> dict:
+    if schema is None:
+        return {}
+    return {
+        "tools": [{"name": SCORES_TOOL, "description": "Record the risk assessment", "input_schema": schema}],
+        "tool_choice": {"type": "tool", "name": SCORES_TOOL}
+    }
 
-        start_pos = axis_start.end()
 
-        # Extract score
-        score_match = re.search(r'"score"\s*:\s*(\d)', json_str[start_pos:start_pos+50])
-        score = int(score_match.group(1)) if score_match else 0
+def openai_structured_options(provider: str, schema: dict | None) -> dict:
+    """response_format for OpenAI-compatible providers (each accepts a different subset)"""
+    if schema is None:
+        return {}
+    if provider == "openai":
+        return {"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "risk_assessment", "schema": schema, "strict": True}
+        }}
+    elif provider == "together":
+        return {"response_format": {"type": "json_schema", "schema": schema}}
+    else:
+        # Groq only enforces schemas on some models; JSON mode works on all of them
+        return {"response_format": {"type": "json_object"}}
 
-        # Find rationale
-        rationale_start = json_str.find('"rationale"', start_pos)
-        if rationale_start == -1:
-            rationale = "Could not find rationale"
-        else:
-            quote_start = json_str.find('"', rationale_start + len('"rationale"') + 1)
-            if quote_start == -1:
-                rationale = "Could not parse rationale"
-            else:
-                pos = quote_start + 1
-                while pos < len(json_str):
-                    if json_str[pos] == '"' and json_str[pos-1] != '\\':
-                        break
-                    pos += 1
-                rationale = json_str[quote_start+1:pos]
-                rationale = rationale.replace('\\"', '"').replace('\\n', ' ').replace('\\t', ' ')
 
-        scores_data[axis_id] = {"score": score, "rationale": rationale}
+def google_structured_options(schema: dict | None) -> dict:
+    # Gemini's response_schema takes an OpenAPI subset without additionalProperties,
+    # so only JSON mode is requested; the prompt carries the format
+    if schema is None:
+        return {}
+    return {"generation_config": {"response_mime_type": "application/json"}}
 
-    return scores_data
 
+def openai_text(provider: str, prompt: str, response) -> str:
+    """Text of an OpenAI-compatible completion, recording its token usage"""
+    text = response.choices[0].message.content
+    usage = response.usage
+    record_usage(provider, prompt, usage and usage.prompt_tokens, text or "", usage and usage.completion_tokens)
+    return text
 
-async def call_anthropic(prompt: str) -> str:
-    """Call Anthropic Claude API"""
-    from anthropic import Anthropic
 
-    client = Anthropic(api_key=settings.get_api_key())
-    message = client.messages.create(
-        model=settings.llm_model,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}]
+def google_usage(response) -> tuple[int | None, int | None]:
+    metadata = getattr(response, "usage_metadata", None)
+    return getattr(metadata, "prompt_token_count", None), getattr(metadata, "candidates_token_count", None)
+
+
+async def call_anthropic(prompt: str, schema: dict | None = None) -> str:
+    """Call Anthropic Claude API"""
+    client = get_client("anthropic")
+    message = await client.messages.create(
+        model=settings.get_model("anthropic"),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        **anthropic_structured_options(schema)
     )
-    return message.content[0].text
+    if schema is not None:
+        text = next(json.dumps(block.input) for block in message.content if block.type == "tool_use")
+    else:
+        text = message.content[0].text
+    record_usage("anthropic", prompt, message.usage.input_tokens, text, message.usage.output_tokens)
+    return text
 
 
-async def call_openai(prompt: str) -> str:
+async def call_openai(prompt: str, schema: dict | None = None) -> str:
     """Call OpenAI API"""
-    from openai import OpenAI
-
-    client = OpenAI(api_key=settings.get_api_key())
-    response = client.chat.completions.create(
-        model=settings.llm_model,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}]
+    client = get_client("openai")
+    response = await client.chat.completions.create(
+        model=settings.get_model("openai"),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        **openai_structured_options("openai", schema)
     )
-    return response.choices[0].message.content
+    return openai_text("openai", prompt, response)
 
 
-async def call_google(prompt: str) -> str:
+async def call_google(prompt: str, schema: dict | None = None) -> str:
     """Call Google Gemini API"""
-    import google.generativeai as genai
-
-    genai.configure(api_key=settings.get_api_key())
-    model = genai.GenerativeModel(settings.llm_model)
-    response = model.generate_content(prompt)
+    genai = get_client("google")
+    model = genai.GenerativeModel(settings.get_model("google"))
+    response = await model.generate_content_async(prompt, **google_structured_options(schema))
+    prompt_tokens, completion_tokens = google_usage(response)
+    record_usage("google", prompt, prompt_tokens, response.text, completion_tokens)
     return response.text
 
 
-async def call_groq(prompt: str) -> str:
+async def call_groq(prompt: str, schema: dict | None = None) -> str:
     """Call Groq API (uses OpenAI-compatible interface)"""
-    from openai import OpenAI
-
-    client = OpenAI(
-        api_key=settings.get_api_key(),
-        base_url="https://api.groq.com/openai/v1"
+    client = get_client("groq")
+    response = await client.chat.completions.create(
+        model=settings.get_model("groq"),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        **openai_structured_options("groq", schema)
     )
-    response = client.chat.completions.create(
-        model=settings.llm_model,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response.choices[0].message.content
+    return openai_text("groq", prompt, response)
 
 
-async def call_together(prompt: str) -> str:
+async def call_together(prompt: str, schema: dict | None = None) -> str:
     """Call Together AI API (uses OpenAI-compatible interface)"""
-    from openai import OpenAI
-
-    client = OpenAI(
-        api_key=settings.get_api_key(),
-        base_url="https://api.together.xyz/v1"
-    )
-    response = client.chat.completions.create(
-        model=settings.llm_model,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}]
+    client = get_client("together")
+    response = await client.chat.completions.create(
+        model=settings.get_model("together"),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        **openai_structured_options("together", schema)
     )
-    return response.choices[0].message.content
+    return openai_text("together", prompt, response)
+
+
+async def call_mock(prompt: str, schema: dict | None = None) -> str:
+    """Call the offline mock provider (see mock_llm)"""
+    text = await get_client("mock").complete(prompt, schema)
+    record_usage("mock", prompt, None, text, None)
+    return text
+
+
+def response_cache_key(provider: str, prompt: str, schema: dict | None = None) -> str:
+    params = {"max_tokens": MAX_TOKENS}
+    if schema is not None:
+        params["schema"] = schema
+    return llm_cache.cache_key(provider, settings.get_model(provider), prompt, params)
+
+
+async def cached_response(
+    prompt: str,
+    validate: Callable[[str], bool] | None = None,
+    schema: dict | None = None
+) -> LLMResponse | None:
+    """A usable cached response from any pool provider, in failover order"""
+    if not settings.llm_cache_enabled:
+        return None
+    cache = llm_cache.get_cache()
+
+    def lookup() -> LLMResponse | None:
+        for provider in get_pool().providers():
+            text = cache.get(response_cache_key(provider, prompt, schema))
+            if text is not None and (validate is None or validate(text)):
+                return LLMResponse(text=text, provider=provider, model=settings.get_model(provider), cached=True)
+        return None
+
+    return await asyncio.to_thread(lookup)
+
+
+async def store_response(prompt: str, response: LLMResponse, schema: dict | None = None):
+    if settings.llm_cache_enabled:
+        key = response_cache_key(response.provider, prompt, schema)
+        await asyncio.to_thread(llm_cache.get_cache().put, key, response.text, response.provider, response.model)
+
+
+async def complete(
+    prompt: str,
+    validate: Callable[[str], bool] | None = None,
+    schema: dict | None = None
+) -> LLMResponse:
+    """Answer a prompt from the response cache or the provider pool.
+
+    `validate` rejects responses the caller cannot use, so the pool can try
+    another provider (see provider_pool). With a JSON `schema`, providers are
+    asked for structured output.
+    """
+    cached = await cached_response(prompt, validate, schema)
+    if cached is not None:
+        return cached
+
+    response = await get_pool().complete(lambda provider: call_provider_limited(provider, prompt, schema), validate)
+    await store_response(prompt, response, schema)
+    return response
 
 
 async def call_llm(prompt: str) -> str:
-    """Call the configured LLM provider"""
-    provider = settings.llm_provider
+    """Call the LLM providers, answering repeated prompts from the response cache"""
+    return (await complete(prompt)).text
+
+
+async def call_provider_limited(provider: str, prompt: str, schema: dict | None = None) -> str:
+    """Send a prompt through the provider's rate limiter (with retries)"""
+    limiter = get_limiter(provider)
+    return await limiter.run(lambda: call_provider_recorded(provider, prompt, schema), count_tokens(prompt, provider))
+
+
+async def call_provider_recorded(provider: str, prompt: str, schema: dict | None = None) -> str:
+    """Send a prompt to one provider, saving the response as a mock cassette when recording"""
+    if provider == "mock" or not settings.mock_record:
+        return await call_provider(provider, prompt, schema)
+    started = time.monotonic()
+    text = await call_provider(provider, prompt, schema)
+    await asyncio.to_thread(
+        mock_llm.record, prompt, provider, settings.get_model(provider), text, time.monotonic() - started
+    )
+    return text
 
-    if not settings.get_api_key():
-        raise ValueError(f"No API key configured for provider: {provider}")
 
+async def call_provider(provider: str, prompt: str, schema: dict | None = None) -> str:
+    """Send a prompt to one provider"""
     if provider == "anthropic":
-        return await call_anthropic(prompt)
+        return await call_anthropic(prompt, schema)
     elif provider == "openai":
-        return await call_openai(prompt)
+        return await call_openai(prompt, schema)
     elif provider == "google":
-        return await call_google(prompt)
+        return await call_google(prompt, schema)
     elif provider == "groq":
-        return await call_groq(prompt)
+        return await call_groq(prompt, schema)
     elif provider == "together":
-        return await call_together(prompt)
+        return await call_together(prompt, schema)
+    elif provider == "mock":
+        return await call_mock(prompt, schema)
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
 
+async def stream_anthropic(prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream text from Anthropic Claude (the tool input JSON in structured mode)"""
+    client = get_client("anthropic")
+    async with client.messages.stream(
+        model=settings.get_model("anthropic"),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        **anthropic_structured_options(schema)
+    ) as stream:
+        parts = []
+        if schema is None:
+            async for text in stream.text_stream:
+                parts.append(text)
+                yield text
+        else:
+            async for event in stream:
+                if event.type == "input_json" and event.partial_json:
+                    parts.append(event.partial_json)
+                    yield event.partial_json
+        usage = (await stream.get_final_message()).usage
+        record_usage("anthropic", prompt, usage.input_tokens, "".join(parts), usage.output_tokens)
+
+
+async def stream_openai_compatible(provider: str, prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream text from OpenAI or an OpenAI-compatible provider (Groq, Together)"""
+    client = get_client(provider)
+    stream = await client.chat.completions.create(
+        model=settings.get_model(provider),
+        max_tokens=MAX_TOKENS,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+        # Only OpenAI documents usage on streams; the others are estimated
+        **({"stream_options": {"include_usage": True}} if provider == "openai" else {}),
+        **openai_structured_options(provider, schema)
+    )
+    parts, usage = [], None
+    async for chunk in stream:
+        usage = getattr(chunk, "usage", None) or usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+    record_usage(provider, prompt, usage and usage.prompt_tokens, "".join(parts), usage and usage.completion_tokens)
+
+
+async def stream_google(prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream text from Google Gemini"""
+    genai = get_client("google")
+    model = genai.GenerativeModel(settings.get_model("google"))
+    response = await model.generate_content_async(prompt, stream=True, **google_structured_options(schema))
+    parts, usage = [], (None, None)
+    async for chunk in response:
+        parts.append(chunk.text)
+        usage = google_usage(chunk)
+        yield chunk.text
+    record_usage("google", prompt, usage[0], "".join(parts), usage[1])
+
+
+async def stream_mock(prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream text from the offline mock provider"""
+    parts = []
+    async for text in get_client("mock").stream(prompt, schema):
+        parts.append(text)
+        yield text
+    record_usage("mock", prompt, None, "".join(parts), None)
+
+
+def stream_provider(provider: str, prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream a response from one provider"""
+    if provider == "anthropic":
+        return stream_anthropic(prompt, schema)
+    elif provider in ("openai", "groq", "together"):
+        return stream_openai_compatible(provider, prompt, schema)
+    elif provider == "google":
+        return stream_google(prompt, schema)
+    elif provider == "mock":
+        return stream_mock(prompt, schema)
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def stream_provider_limited(provider: str, prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream a response through the provider's rate limiter"""
+    return get_limiter(provider).stream(
+        lambda: stream_provider_recorded(provider, prompt, schema), count_tokens(prompt, provider)
+    )
+
+
+async def stream_provider_recorded(provider: str, prompt: str, schema: dict | None = None) -> AsyncIterator[str]:
+    """Stream from one provider, saving the full response as a mock cassette when recording"""
+    if provider == "mock" or not settings.mock_record:
+        async for text in stream_provider(provider, prompt, schema):
+            yield text
+        return
+    started = time.monotonic()
+    parts = []
+    async for text in stream_provider(provider, prompt, schema):
+        parts.append(text)
+        yield text
+    await asyncio.to_thread(
+        mock_llm.record, prompt, provider, settings.get_model(provider), "".join(parts), time.monotonic() - started
+    )
+
+
+async def stream_llm(prompt: str, schema: dict | None = None) -> AsyncIterator[LLMResponse]:
+    """Stream a response from the provider pool; a cached response arrives as one chunk"""
+    cached = await cached_response(prompt, schema=schema)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    last = None
+    async for chunk in get_pool().stream(lambda provider: stream_provider_limited(provider, prompt, schema)):
+        parts.append(chunk.text)
+        last = chunk
+        yield chunk
+
+    if last is not None:
+        await store_response(prompt, last.model_copy(update={"text": "".join(parts)}), schema)
+
+
 async def detect_category(title: str, abstract: str) -> str | None:
     """Detect research category using a simple LLM call"""
     prompt = f"""Classify this research paper into ONE of these categories. Respond with ONLY the category ID, nothing else.
@@ -345,7 +791,7 @@ Categories:
 - nuclear (Nuclear / Radiological: reactors, fuel cycles, radiation)
 
 Paper Title: {title}
-Paper Abstract: {abstract[:1000]}
+Paper Abstract: {truncate_to_tokens(abstract, CATEGORY_ABSTRACT_TOKENS, settings.get_providers()[0])}
 
 Category ID:"""
 
@@ -368,33 +814,312 @@ Category ID:"""
         return None
 
 
+async def resolve_category(title: str, abstract: str, detected: str | None = None) -> str | None:
+    """Category from the scoring response if valid, else the local classifier, else an LLM call"""
+    category = normalize_category(detected)
+    if category is not None:
+        return category
+    if settings.category_classifier:
+        category, confidence = predict_category(title, abstract)
+        if confidence >= settings.category_min_confidence:
+            logger.info(f"Predicted category locally: {category} ({confidence:.2f})")
+            return category
+        logger.info(f"Local category prediction {category} not confident ({confidence:.2f}), asking the LLM")
+    return await detect_category(title, abstract)
+
+
+def scores_complete(response_text: str, axes: list[RiskAxis]) -> bool:
+    """Whether a scoring response has a valid score for every axis (response validator)"""
+    return len(parse_axis_scores(response_text, axes)[0]) == len(axes)
+
+
+def describe_sources(responses: list[LLMResponse | None]) -> tuple[str | None, str | None]:
+    """(provider, model) for the assessment; several sources are comma-joined"""
+    sources = [r for r in responses if r is not None]
+    providers = list(dict.fromkeys(r.provider for r in sources))
+    models = list(dict.fromkeys(r.model for r in sources))
+    return ", ".join(providers) or None, ", ".join(models) or None
+
+
+def response_schema(schema: dict) -> dict | None:
+    """The schema to send with a scoring prompt, if structured output is on"""
+    return schema if settings.llm_structured_output else None
+
+
+async def repair_axes(
+    title: str,
+    abstract: str,
+    snippet: str | None,
+    missing: list[RiskAxis]
+) -> tuple[dict[str, AxisScore], LLMResponse | None]:
+    """Re-ask for just the axes a response left out or got wrong"""
+    logger.warning(f"Re-asking for axes missing from the response: {', '.join(a.id for a in missing)}")
+    prefix, suffix = scoring_prompt_parts(missing, with_category=False)
+    prompt = budgeted_prompt(prefix, suffix, title, abstract, snippet)
+    try:
+        response = await complete(
+            prompt, lambda text: scores_complete(text, missing),
+            response_schema(scores_schema(missing, with_category=False))
+        )
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        logger.warning(f"Axis repair failed: {e}")
+        return {}, None
+    return parse_axis_scores(response.text, missing)[0], response
+
+
+async def scores_from_response(
+    response_text: str,
+    axes: list[RiskAxis],
+    title: str,
+    abstract: str,
+    snippet: str | None
+) -> tuple[RiskScores, str | None, LLMResponse | None]:
+    """Scores and category from a full scoring response, with one repair re-ask for unusable axes"""
+    found, category = parse_axis_scores(response_text, axes)
+    repair = None
+    missing = [a for a in axes if a.id not in found]
+    if missing:
+        repaired, repair = await repair_axes(title, abstract, snippet, missing)
+        found.update(repaired)
+    return fill_missing_scores(axes, found, "No valid score in LLM response"), category, repair
+
+
+async def score_section(
+    section: SectionPrompt,
+    title: str,
+    abstract: str,
+    snippet: str | None
+) -> tuple[RiskScores, list[LLMResponse]]:
+    """Score one section's axes, re-asking only for the axes its response left out or got wrong"""
+    axes = list(section.axes)
+    found: dict[str, AxisScore] = {}
+    sources: list[LLMResponse] = []
+    error_msg = "No valid score in LLM response"
+
+    try:
+        response = await complete(
+            section.build_prompt(title, abstract, snippet),
+            lambda text: scores_complete(text, axes),
+            response_schema(section.json_schema)
+        )
+        found = parse_axis_scores(response.text, axes)[0]
+        sources.append(response)
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        logger.warning(f"Section {section.section} scoring failed: {e}")
+        error_msg = f"LLM call failed: {e}"
+
+    for _ in range(settings.section_max_retries):
+        missing = [a for a in axes if a.id not in found]
+        if not missing:
+            break
+        repaired, repair = await repair_axes(title, abstract, snippet, missing)
+        found.update(repaired)
+        if repair is not None:
+            sources.append(repair)
+
+    return fill_missing_scores(axes, found, error_msg), sources
+
+
+async def score_sections(
+    snapshot: AxesSnapshot,
+    title: str,
+    abstract: str,
+    snippet: str | None
+) -> AsyncIterator[tuple[str, Any]]:
+    """Score every section and detect the category concurrently.
+
+    Yields ("category", str | None) and ("section", (RiskScores,
+    list[LLMResponse])) in completion order.
+    """
+    async def tagged(kind: str, work):
+        return kind, await work
+
+    tasks = [asyncio.ensure_future(tagged("category", resolve_category(title, abstract)))]
+    tasks += [
+        asyncio.ensure_future(tagged("section", score_section(section, title, abstract, snippet)))
+        for section in snapshot.sections
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def merge_section_scores(axes: list[RiskAxis], parts: list[RiskScores]) -> RiskScores:
+    """Combine section results into one RiskScores in axes order"""
+    combined = {}
+    for part in parts:
+        combined.update(part.scores)
+    return RiskScores(scores={a.id: combined[a.id] for a in axes if a.id in combined})
+
+
+def default_result(snapshot: AxesSnapshot, error: Exception) -> ScoringResult:
+    """Placeholder scores when the LLM call fails"""
+    axes = list(snapshot.axes)
+    axis_ids = [a.id for a in axes]
+    axis_reverse_map = {a.id: getattr(a, 'reverse_scored', False) for a in axes}
+    scores = build_default_scores(axis_ids, axis_reverse_map, f"LLM call failed: {str(error)}")
+    return ScoringResult(scores=scores, axes_used=axes, axes_version=snapshot.version)
+
+
 async def score_research(
     title: str,
     abstract: str,
     snippet: str | None = None
-) -> tuple[RiskScores, list[RiskAxis], str | None]:
+) -> ScoringResult:
     """Score research paper using configured LLM
 
-    Returns tuple of (scores, axes_used, detected_category)
     Category is auto-detected by LLM from paper content
+    Identical concurrent requests share one scoring run.
     """
-    axes = get_universal_axes()
-    prompt = build_scoring_prompt(title, abstract, snippet, axes)
+    snapshot = get_axes_snapshot()
+    key = flight_key(
+        normalize_text(title), normalize_text(abstract), normalize_text(snippet),
+        [(p, settings.get_model(p)) for p in settings.get_providers()],
+        snapshot.version, llm_cache.bypassed()
+    )
+    return await scoring_flights.do(key, lambda: _score_research(title, abstract, snippet, snapshot))
+
+
+async def _score_research(
+    title: str,
+    abstract: str,
+    snippet: str | None,
+    snapshot: AxesSnapshot
+) -> ScoringResult:
+    axes = list(snapshot.axes)
 
     try:
-        response_text = await call_llm(prompt)
-        scores, detected_category = parse_llm_response(response_text, axes)
+        if settings.scoring_mode == "sections":
+            parts, sources, detected_category = [], [], None
+            async for kind, value in score_sections(snapshot, title, abstract, snippet):
+                if kind == "category":
+                    detected_category = value
+                else:
+                    parts.append(value[0])
+                    sources.extend(value[1])
+            logger.info(f"Final detected category: {detected_category}")
+            provider, model = describe_sources(sources)
+            return ScoringResult(
+                scores=merge_section_scores(axes, parts), axes_used=axes, category=detected_category,
+                axes_version=snapshot.version, provider=provider, model=model
+            )
+
+        prompt = snapshot.build_prompt(title, abstract, snippet)
+        response = await complete(
+            prompt, lambda text: scores_complete(text, axes), response_schema(snapshot.json_schema)
+        )
+        scores, detected_category, repair = await scores_from_response(response.text, axes, title, abstract, snippet)
         logger.info(f"Detected category from main response: {detected_category}")
 
-        # If category wasn't detected in main response, try a separate call
-        if not detected_category:
+        # If the main response has no valid category, classify locally or ask separately
+        if normalize_category(detected_category) is None:
             logger.info("Category not found in main response, trying separate detection...")
-            detected_category = await detect_category(title, abstract)
+        detected_category = await resolve_category(title, abstract, detected_category)
 
         logger.info(f"Final detected category: {detected_category}")
-        return scores, axes, detected_category
+        provider, model = describe_sources([response, repair])
+        return ScoringResult(
+            scores=scores, axes_used=axes, category=detected_category,
+            axes_version=snapshot.version, provider=provider, model=model
+        )
+    except LLMUnavailableError:
+        # Better to fail the assessment than to store placeholder scores
+        raise
+    except Exception as e:
+        return default_result(snapshot, e)
+
+
+async def score_research_stream(
+    title: str,
+    abstract: str,
+    snippet: str | None = None
+) -> AsyncIterator[tuple[str, Any]]:
+    """Score a paper while the response streams in.
+
+    Yields ("axes", axes_used) first, then ("category", str) and ("axis",
+    (axis_id, AxisScore)) as soon as they are complete in the response, and
+    finally ("result", ScoringResult) as score_research would return it. If
+    scoring fails part way, the result keeps the scores already sent and
+    gives only the remaining axes placeholder scores.
+    """
+    snapshot = get_axes_snapshot()
+    axes = list(snapshot.axes)
+    yield "axes", axes
+
+    # Scores and category already sent; a failure later keeps them in the result
+    sent: dict[str, AxisScore] = {}
+    sent_category = None
+    try:
+        if settings.scoring_mode == "sections":
+            parts, sources, detected_category = [], [], None
+            async for kind, value in score_sections(snapshot, title, abstract, snippet):
+                if kind == "category":
+                    detected_category = value
+                    if value:
+                        sent_category = value
+                        yield "category", value
+                else:
+                    parts.append(value[0])
+                    sources.extend(value[1])
+                    for axis_id, score in value[0].scores.items():
+                        sent[axis_id] = score
+                        yield "axis", (axis_id, score)
+            provider, model = describe_sources(sources)
+            result = ScoringResult(
+                scores=merge_section_scores(axes, parts), axes_used=axes, category=detected_category,
+                axes_version=snapshot.version, provider=provider, model=model
+            )
+        else:
+            prompt = snapshot.build_prompt(title, abstract, snippet)
+            parser = AxisStreamParser(axes)
+            parts, source = [], None
+            async for chunk in stream_llm(prompt, response_schema(snapshot.json_schema)):
+                parts.append(chunk.text)
+                source = chunk
+                for kind, value in parser.feed(chunk.text):
+                    if kind == "category":
+                        # Only a recognized id is sent now; otherwise it is resolved below
+                        value = normalize_category(value)
+                        if value is None:
+                            continue
+                        sent_category = value
+                    else:
+                        sent[value[0]] = value[1]
+                    yield kind, value
+            scores, detected_category, repair = await scores_from_response(
+                "".join(parts), axes, title, abstract, snippet
+            )
+            for axis_id, score in scores.scores.items():
+                if axis_id not in sent:
+                    sent[axis_id] = score
+                    yield "axis", (axis_id, score)
+
+            category = normalize_category(detected_category)
+            if category is None:
+                logger.info("Category not found in main response, trying separate detection...")
+                category = await resolve_category(title, abstract)
+            if category and category != sent_category:
+                sent_category = category
+                yield "category", category
+            provider, model = describe_sources([source, repair])
+            result = ScoringResult(
+                scores=scores, axes_used=axes, category=category,
+                axes_version=snapshot.version, provider=provider, model=model
+            )
+    except LLMUnavailableError:
+        raise
     except Exception as e:
-        axis_ids = [a.id for a in axes]
-        axis_reverse_map = {a.id: getattr(a, 'reverse_scored', False) for a in axes}
-        scores = build_default_scores(axis_ids, axis_reverse_map, f"LLM call failed: {str(e)}")
-        return scores, axes, None
+        result = ScoringResult(
+            scores=fill_missing_scores(axes, sent, f"LLM call failed: {str(e)}"), axes_used=axes,
+            category=sent_category, axes_version=snapshot.version
+        )
+
+    yield "result", result
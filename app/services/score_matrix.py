@@ -0,0 +1,378 @@
+"""Columnar, NumPy-backed view of stored assessments for dashboard analytics.
+
+Every assessment becomes one row: its axis scores in an int8 matrix (axes in
+data/axes.json order, -1 where an axis is missing), a per-cell reverse-scoring
+mask, and integer-coded columns for tier, category, dissemination, audience
+and day. Dashboard filters are boolean masks over these columns and all
+statistics are array reductions, so no per-request model dumping is needed.
+
+The matrix is built once from the storage cache and extended in place when
+new assessments are written through this process.
+"""
+import threading
+from datetime import date, datetime, timedelta
+import numpy as np
+from app.models import Assessment, AssessmentFilters, Audience, Dissemination, Tier
+from app.services import storage
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+TIERS = [t.value for t in Tier]
+HIGH_TIER_CODES = [TIERS.index(Tier.HIGH.value), TIERS.index(Tier.CRITICAL.value)]
+DISSEMINATIONS = [d.value for d in Dissemination]
+AUDIENCES = [a.value for a in Audience]
+
+# Capability/Impact and Safeguard/Governance index axes
+CAPABILITY_AXES = ["A1", "A2", "D1", "D2"]
+SAFEGUARD_AXES = ["C1", "C2", "F1", "F2"]
+
+SECTIONS = {
+    "A": ["A1", "A2"],
+    "B": ["B1", "B2"],
+    "C": ["C1", "C2"],
+    "D": ["D1", "D2"],
+    "E": ["E1", "E2"],
+    "F": ["F1", "F2"]
+}
+
+
+def configured_axis_ids() -> list[str]:
+    """Axis ids in data/axes.json order"""
+    from app.services.risk_scorer import get_universal_axes
+    return [a.id for a in get_universal_axes()]
+
+
+class _Column:
+    """Growable array with amortized O(1) row appends"""
+
+    def __init__(self, dtype, width: int | None = None):
+        shape = (16,) if width is None else (16, width)
+        self.data = np.zeros(shape, dtype=dtype)
+        self.size = 0
+
+    def append(self, values: np.ndarray):
+        needed = self.size + len(values)
+        if needed > len(self.data):
+            capacity = max(needed, 2 * len(self.data))
+            grown = np.zeros((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = values
+        self.size = needed
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class ScoreMatrix:
+    """Column store of assessment scores and dashboard dimensions"""
+
+    def __init__(self, axis_ids: list[str]):
+        self.axis_ids = list(axis_ids)
+        self._axis_index = {axis_id: i for i, axis_id in enumerate(self.axis_ids)}
+        self.categories: list[str | None] = []
+        self._category_codes: dict[str | None, int] = {}
+        self.assessments: list[Assessment] = []
+
+        width = len(self.axis_ids)
+        self._scores = _Column(np.int8, width)
+        self._reverse = _Column(np.bool_, width)
+        # Reverse scoring applied, 0 where the axis is missing
+        self._effective = _Column(np.int8, width)
+        self._present = _Column(np.bool_, width)
+        self._tier = _Column(np.int8)
+        self._category = _Column(np.int16)
+        self._dissemination = _Column(np.int8)
+        self._audience = _Column(np.int8)
+        self._ts = _Column(np.int64)
+        self._day = _Column(np.int32)
+
+    @classmethod
+    def from_assessments(cls, assessments: list[Assessment], axis_ids: list[str]) -> "ScoreMatrix":
+        matrix = cls(axis_ids)
+        matrix.append(assessments)
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.assessments)
+
+    def _category_code(self, category: str | None) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self._category_codes[category] = code
+        return code
+
+    def _grow_axes(self, assessments: list[Assessment]):
+        """Add columns for axes not in the config (older records)"""
+        extra = []
+        for a in assessments:
+            for axis_id in a.scores.scores:
+                if axis_id not in self._axis_index and axis_id not in extra:
+                    extra.append(axis_id)
+        if not extra:
+            return
+        for axis_id in extra:
+            self._axis_index[axis_id] = len(self.axis_ids)
+            self.axis_ids.append(axis_id)
+        widen = ((self._scores, -1), (self._reverse, False), (self._effective, 0), (self._present, False))
+        for column, fill in widen:
+            widened = np.full((len(column.data), len(self.axis_ids)), fill, dtype=column.data.dtype)
+            widened[:, :column.data.shape[1]] = column.data
+            column.data = widened
+
+    def append(self, assessments: list[Assessment]):
+        """Add rows for the given assessments"""
+        if not assessments:
+            return
+        self._grow_axes(assessments)
+
+        n = len(assessments)
+        width = len(self.axis_ids)
+        scores = np.full((n, width), -1, dtype=np.int8)
+        reverse = np.zeros((n, width), dtype=np.bool_)
+        tiers = np.empty(n, dtype=np.int8)
+        categories = np.empty(n, dtype=np.int16)
+        disseminations = np.empty(n, dtype=np.int8)
+        audiences = np.empty(n, dtype=np.int8)
+        timestamps = np.empty(n, dtype=np.int64)
+
+        for row, a in enumerate(assessments):
+            for axis_id, axis_score in a.scores.scores.items():
+                col = self._axis_index[axis_id]
+                scores[row, col] = axis_score.score
+                reverse[row, col] = axis_score.reverse_scored
+            tiers[row] = TIERS.index(a.tier.value)
+            categories[row] = self._category_code(a.input.category.value if a.input.category else None)
+            disseminations[row] = DISSEMINATIONS.index(a.input.dissemination.value)
+            audiences[row] = AUDIENCES.index(a.input.audience.value)
+            timestamps[row] = (a.naive_timestamp() - EPOCH) // ONE_MICROSECOND
+
+        present = scores >= 0
+        self._scores.append(scores)
+        self._reverse.append(reverse)
+        self._effective.append(np.where(present, np.where(reverse, 3 - scores, scores), 0))
+        self._present.append(present)
+        self._tier.append(tiers)
+        self._category.append(categories)
+        self._dissemination.append(disseminations)
+        self._audience.append(audiences)
+        self._ts.append(timestamps)
+        self._day.append((timestamps // 86_400_000_000).astype(np.int32))
+        self.assessments.extend(assessments)
+
+    def mask(self, filters: AssessmentFilters) -> np.ndarray:
+        """Boolean row mask for the given filters"""
+        keep = np.ones(len(self), dtype=np.bool_)
+        ts = self._ts.view()
+        if filters.date_from:
+            keep &= ts >= (filters.date_from - EPOCH) // ONE_MICROSECOND
+        if filters.date_to:
+            keep &= ts < (filters.date_to - EPOCH) // ONE_MICROSECOND
+
+        coded = (
+            (filters.category, self._category.view(), self._category_codes),
+            (filters.tier, self._tier.view(), {v: i for i, v in enumerate(TIERS)}),
+            (filters.dissemination, self._dissemination.view(), {v: i for i, v in enumerate(DISSEMINATIONS)}),
+            (filters.audience, self._audience.view(), {v: i for i, v in enumerate(AUDIENCES)}),
+        )
+        for value, column, codes in coded:
+            if value:
+                code = codes.get(value)
+                if code is None:
+                    return np.zeros(len(self), dtype=np.bool_)
+                keep &= column == code
+        return keep
+
+    def stats(self, filters: AssessmentFilters) -> dict:
+        """Dashboard statistics for the rows matching the filters"""
+        keep = self.mask(filters)
+        unfiltered = bool(keep.all())
+
+        def column(col: _Column) -> np.ndarray:
+            return col.view() if unfiltered else col.view()[keep]
+
+        tiers = column(self._tier)
+        categories = column(self._category)
+        ts = column(self._ts)
+        days = column(self._day)
+        high = (tiers == HIGH_TIER_CODES[0]) | (tiers == HIGH_TIER_CODES[1])
+        total = len(tiers)
+
+        risk_counts = dict(zip(TIERS, np.bincount(tiers, minlength=len(TIERS)).tolist()))
+
+        # Category counts, ordered by most recent assessment like a newest-first scan
+        n_categories = len(self.categories)
+        category_counts = np.bincount(categories, minlength=n_categories)
+        high_by_category = np.bincount(categories[high], minlength=n_categories)
+        latest = np.full(n_categories, -1, dtype=np.int64)
+        latest_high = np.full(n_categories, -1, dtype=np.int64)
+        for code in range(n_categories):
+            in_category = categories == code
+            if category_counts[code]:
+                latest[code] = ts[in_category].max()
+            if high_by_category[code]:
+                latest_high[code] = ts[in_category & high].max()
+
+        category_distribution = {
+            (self.categories[c] or "unknown"): int(category_counts[c])
+            for c in np.argsort(-latest, kind="stable") if category_counts[c]
+        }
+        # An uncategorized paper counts as "unknown" above but None here
+        high_risk_by_category = {
+            self.categories[c]: int(high_by_category[c])
+            for c in np.argsort(-latest_high, kind="stable") if high_by_category[c]
+        }
+
+        # Axis sums/counts with reverse scoring applied
+        axis_sums = column(self._effective).sum(axis=0, dtype=np.int64)
+        axis_counts = column(self._present).sum(axis=0, dtype=np.int64)
+
+        # Most recent high-risk paper
+        recent_high_risk = None
+        if high.any():
+            rows = np.arange(len(self)) if unfiltered else np.flatnonzero(keep)
+            p = self.assessments[rows[high][np.argmax(ts[high])]]
+            recent_high_risk = {
+                "id": p.id,
+                "title": p.input.title or "Untitled",
+                "tier": p.tier.value,
+                "category": p.input.category.value if p.input.category else None,
+                "timestamp": p.model_dump(mode="json")["timestamp"]
+            }
+
+        # Trend data (assessments per day, last 30 days with data)
+        trend = {}
+        if total:
+            first_day = int(days.min())
+            day_totals = np.bincount(days - first_day)
+            day_high = np.bincount(days[high] - first_day, minlength=len(day_totals))
+            for offset in np.flatnonzero(day_totals)[-30:]:
+                day = date(1970, 1, 1) + timedelta(days=first_day + int(offset))
+                trend[day.isoformat()] = {"total": int(day_totals[offset]), "high_critical": int(day_high[offset])}
+
+        return summarize_stats(
+            total=total,
+            risk_counts=risk_counts,
+            category_counts=category_distribution,
+            high_risk_by_category=high_risk_by_category,
+            axis_ids=self.axis_ids,
+            axis_sums=axis_sums,
+            axis_counts=axis_counts,
+            recent_high_risk=recent_high_risk,
+            trend=trend
+        )
+
+
+def summarize_stats(
+    total: int,
+    risk_counts: dict[str, int],
+    category_counts: dict[str, int],
+    high_risk_by_category: dict[str | None, int],
+    axis_ids: list[str],
+    axis_sums: np.ndarray,
+    axis_counts: np.ndarray,
+    recent_high_risk: dict | None,
+    trend: dict[str, dict]
+) -> dict:
+    """Build the /api/dashboard/stats payload from reduced counts"""
+    high_critical = risk_counts["High"] + risk_counts["Critical"]
+    high_critical_pct = round((high_critical / total * 100), 1) if total > 0 else 0
+
+    # dict order is first-seen order, and sorted()/max() keep the first of equals
+    top_categories = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+    top_high_risk_category = (
+        max(high_risk_by_category.items(), key=lambda x: x[1])[0] if high_risk_by_category else None
+    )
+
+    # Averages per axis
+    axis_counts = np.asarray(axis_counts)
+    scored = np.flatnonzero(axis_counts > 0)
+    averages = np.asarray(axis_sums, dtype=np.float64)[scored] / axis_counts[scored]
+    axis_averages = {axis_ids[i]: round(float(avg), 2) for i, avg in zip(scored, averages)}
+
+    most_stressed_axis = max(axis_averages.items(), key=lambda x: x[1]) if axis_averages else (None, 0)
+
+    def index_of(axes: list[str]) -> float:
+        values = np.array([axis_averages[a] for a in axes if a in axis_averages])
+        return round(float(values.mean()), 2) if values.size else 0
+
+    capability_index = index_of(CAPABILITY_AXES)
+    safeguard_index = index_of(SAFEGUARD_AXES)
+    governance_gap = round(capability_index - safeguard_index, 2)
+    section_averages = {section: index_of(axes) for section, axes in SECTIONS.items()}
+
+    trend_sorted = sorted(trend.items(), key=lambda x: x[0])[-30:]
+
+    return {
+        "total_assessed": total,
+        "risk_distribution": risk_counts,
+        "high_critical_count": high_critical,
+        "high_critical_percentage": high_critical_pct,
+        "category_distribution": dict(category_counts),
+        "top_categories": top_categories,
+        "top_high_risk_category": top_high_risk_category,
+        "axis_averages": axis_averages,
+        "section_averages": section_averages,
+        "most_stressed_axis": {
+            "axis": most_stressed_axis[0],
+            "average": most_stressed_axis[1]
+        },
+        "capability_index": capability_index,
+        "safeguard_index": safeguard_index,
+        "governance_gap": governance_gap,
+        "recent_high_risk": recent_high_risk,
+        "trend_data": [{"date": d, **v} for d, v in trend_sorted],
+        "filtered_count": total
+    }
+
+
+_lock = threading.Lock()
+_matrix: ScoreMatrix | None = None
+_matrix_generation = -1
+
+
+def get_score_matrix() -> ScoreMatrix:
+    """Score matrix for the current store, rebuilt only when the store changed"""
+    global _matrix, _matrix_generation
+    generation = storage.cache_generation()
+    if storage.cache_is_warm():
+        # Up to date with the cache, and the cache with the store: no need to read it
+        with _lock:
+            if _matrix is not None and _matrix_generation == generation:
+                return _matrix
+    assessments = storage.get_all_assessments()
+    generation = storage.cache_generation()
+    with _lock:
+        if _matrix is None or _matrix_generation != generation:
+            _matrix = ScoreMatrix.from_assessments(list(reversed(assessments)), configured_axis_ids())
+            _matrix_generation = generation
+        return _matrix
+
+
+def _on_assessments_added(
+    assessments: list[Assessment],
+    generation_before: int | None,
+    generation_after: int,
+    marker_before: list
+):
+    """Extend the matrix in place when it was current before the write"""
+    global _matrix_generation
+    with _lock:
+        if _matrix is not None and _matrix_generation == generation_before:
+            _matrix.append(assessments)
+            _matrix_generation = generation_after
+
+
+storage.add_write_listener(_on_assessments_added)
+
+
+def dashboard_stats(filters: AssessmentFilters) -> dict:
+    """Dashboard statistics for the given filters"""
+    if (filters.date_from or filters.date_to) and not storage.cache_is_warm():
+        # Cold start: build a throwaway matrix from the partitions in range only
+        _, assessments = storage.query_assessments(filters)
+        return ScoreMatrix.from_assessments(assessments[::-1], configured_axis_ids()).stats(filters)
+    return get_score_matrix().stats(filters)
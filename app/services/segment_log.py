@@ -0,0 +1,417 @@
+"""Append-only, time-partitioned log of assessment records.
+
+Records are grouped into partitions by timestamp (monthly by default) and each
+partition is a series of segments holding one serialized Assessment per
+record, oldest first. Segments are JSON Lines by default; the record encoding
+and block compression are configurable (see app.services.codecs). A segment
+rotates once it grows past the configured size. A small manifest keeps the
+min/max timestamp, record count and byte size of every segment so date-bounded
+reads only open the segments that overlap the requested range. Appends update
+the manifest held in memory and stat only the segment they write to.
+
+Old partitions can be compacted into a single compressed archive per
+partition; archives stay readable through the same read path.
+"""
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
+from pydantic import BaseModel
+from app.models import Assessment
+from app.services.codecs import (
+    CodecName, CompressionName, RecordCodec, BlockCompression,
+    get_codec, get_compression, segment_format, read_payloads
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+PartitionGranularity = Literal["year", "month", "day"]
+
+PARTITION_FORMATS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+    "day": "%Y-%m-%d",
+}
+
+
+class SegmentInfo(BaseModel):
+    """Manifest entry for one segment file"""
+    min_ts: datetime
+    max_ts: datetime
+    count: int
+    size: int
+    # Set when a scan finds a torn tail (a crash mid-append); sealed segments
+    # are still read but never appended to again
+    sealed: bool = False
+
+
+class SegmentManifest(BaseModel):
+    """Per-segment time ranges, keyed by file name"""
+    segments: dict[str, SegmentInfo] = {}
+
+
+def is_archive(segment: Path) -> bool:
+    """Archives are compressed and named after their partition alone"""
+    fmt = segment_format(segment.name)
+    return fmt is not None and "_" not in fmt[0] and fmt[2].suffix != ""
+
+
+def segment_partition(segment: Path) -> str | None:
+    """Partition key encoded in a segment name (None for unpartitioned segments)"""
+    fmt = segment_format(segment.name)
+    if fmt is None:
+        return None
+    if is_archive(segment):
+        return fmt[0]
+    partition, sep, _ = fmt[0].rpartition("_")
+    return partition if sep else None
+
+
+class SegmentLog:
+    """Directory of time-partitioned, rotating segments"""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int,
+        granularity: PartitionGranularity = "month",
+        codec: CodecName = "json",
+        compression: CompressionName = "none",
+        archive_compression: CompressionName = "gzip"
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.granularity = granularity
+        self.codec: RecordCodec = get_codec(codec)
+        self.compression: BlockCompression = get_compression(compression)
+        self.archive_compression: BlockCompression = get_compression(archive_compression)
+        # Manifest as last loaded or written by this instance; appends update it
+        # in place rather than rescanning the directory
+        self._manifest: SegmentManifest | None = None
+
+    @property
+    def suffix(self) -> str:
+        """File suffix of newly written segments"""
+        return self.codec.suffix + self.compression.suffix
+
+    # -- layout ---------------------------------------------------------
+
+    def partition_of(self, ts: datetime) -> str:
+        return ts.strftime(PARTITION_FORMATS[self.granularity])
+
+    def _files(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(
+            p for p in self.directory.iterdir()
+            if segment_format(p.name) is not None
+        )
+
+    def has_segments(self) -> bool:
+        return bool(self._files())
+
+    def segments(self) -> list[Path]:
+        """All segment and archive files, oldest data first"""
+        manifest = self.manifest()
+
+        def newest(p: Path):
+            info = manifest.segments.get(p.name)
+            return (info.max_ts if info else datetime.min, p.name)
+        return sorted(self._files(), key=newest)
+
+    def fingerprint(self) -> tuple:
+        """Cheap change marker: name, size and mtime of every segment"""
+        marks = []
+        for segment in self._files():
+            st = segment.stat()
+            marks.append((segment.name, st.st_size, st.st_mtime_ns))
+        return tuple(marks)
+
+    def marker(self) -> list:
+        """JSON-serializable fingerprint that stays comparable across restarts"""
+        return [list(m) for m in self.fingerprint()]
+
+    # -- manifest -------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def manifest(self) -> SegmentManifest:
+        """Load the manifest, rescanning any segment it does not describe"""
+        manifest = SegmentManifest()
+        if self.manifest_path.exists():
+            try:
+                manifest = SegmentManifest.model_validate_json(self.manifest_path.read_bytes())
+            except ValueError as e:
+                logger.warning(f"Rebuilding unreadable segment manifest: {e}")
+
+        files = {p.name: p for p in self._files()}
+        changed = False
+        for name in list(manifest.segments):
+            if name not in files:
+                del manifest.segments[name]
+                changed = True
+        for name, path in files.items():
+            info = manifest.segments.get(name)
+            if info is None or info.size != path.stat().st_size:
+                scanned = self._scan(path)
+                if scanned:
+                    manifest.segments[name] = scanned
+                else:
+                    manifest.segments.pop(name, None)
+                changed = True
+        if changed:
+            self._save_manifest(manifest)
+        self._manifest = manifest
+        return manifest
+
+    def _scan(self, segment: Path) -> SegmentInfo | None:
+        codec, payloads, intact = self._payloads(segment)
+        timestamps = [a.naive_timestamp() for a in self._decode(segment, codec, payloads)]
+        if not timestamps:
+            return None
+        if not intact:
+            logger.warning(f"Sealing segment {segment.name} after a torn write")
+        return SegmentInfo(
+            min_ts=min(timestamps),
+            max_ts=max(timestamps),
+            count=len(timestamps),
+            size=segment.stat().st_size,
+            sealed=not intact
+        )
+
+    def _save_manifest(self, manifest: SegmentManifest):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp.write_text(manifest.model_dump_json(), encoding="utf-8")
+        tmp.replace(self.manifest_path)
+
+    # -- writes ---------------------------------------------------------
+
+    def _open_segment(self, partition: str, manifest: SegmentManifest) -> Path:
+        """Latest writable (non-archived) segment of a partition.
+
+        If the latest segment is sealed or was written in another format, a
+        new one is started.
+        """
+        latest_seq = 0
+        latest = None
+        for name in manifest.segments:
+            if not name.startswith(f"{partition}_"):
+                continue
+            fmt = segment_format(name)
+            seq = fmt[0].rpartition("_")[2] if fmt else ""
+            if seq.isdigit() and int(seq) >= latest_seq:
+                latest_seq, latest = int(seq), name
+        if latest is not None and not manifest.segments[latest].sealed \
+                and latest == f"{partition}_{latest_seq:04d}{self.suffix}":
+            return self.directory / latest
+        return self.directory / f"{partition}_{latest_seq + 1:04d}{self.suffix}"
+
+    def _next_segment(self, current: Path) -> Path:
+        partition, _, seq = segment_format(current.name)[0].rpartition("_")
+        return current.with_name(f"{partition}_{int(seq) + 1:04d}{self.suffix}")
+
+    def append(self, assessment: Assessment):
+        """Append a single assessment"""
+        self.append_many([assessment])
+
+    def append_many(self, assessments: Iterable[Assessment]):
+        """Append assessments (oldest first) and fsync once per touched segment"""
+        by_partition: dict[str, list[tuple[datetime, bytes]]] = {}
+        for a in assessments:
+            ts = a.naive_timestamp()
+            by_partition.setdefault(self.partition_of(ts), []).append((ts, self.codec.encode(a)))
+        if not by_partition:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self._manifest if self._manifest is not None else self.manifest()
+        for partition, records in by_partition.items():
+            segment = self._open_segment(partition, manifest)
+            size = segment.stat().st_size if segment.exists() else 0
+            info = manifest.segments.get(segment.name)
+            if size != (info.size if info else 0):
+                # Changed outside this instance (another process or a crash): rescan once
+                manifest = self.manifest()
+                segment = self._open_segment(partition, manifest)
+                size = segment.stat().st_size if segment.exists() else 0
+
+            pending: list[tuple[datetime, bytes]] = []
+            for ts, payload in records:
+                if (pending or size) and size + len(payload) > self.max_segment_bytes:
+                    self._write(segment, pending, manifest)
+                    segment = self._next_segment(segment)
+                    size = 0
+                    pending = []
+                pending.append((ts, payload))
+                size += len(payload)
+            self._write(segment, pending, manifest)
+        self._save_manifest(manifest)
+
+    def _write(self, segment: Path, records: list[tuple[datetime, bytes]], manifest: SegmentManifest):
+        if not records:
+            return
+        block = self.compression.compress(self.codec.frame([payload for _, payload in records]))
+        with open(segment, "ab") as f:
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+
+        timestamps = [ts for ts, _ in records]
+        info = manifest.segments.get(segment.name)
+        if info is None:
+            info = SegmentInfo(min_ts=min(timestamps), max_ts=max(timestamps), count=0, size=0)
+        info.min_ts = min(info.min_ts, *timestamps)
+        info.max_ts = max(info.max_ts, *timestamps)
+        info.count += len(records)
+        info.size = segment.stat().st_size
+        manifest.segments[segment.name] = info
+
+    # -- reads ----------------------------------------------------------
+
+    def _payloads(self, segment: Path) -> tuple[RecordCodec, list[bytes], bool]:
+        """Codec, encoded records (oldest first) and tail integrity of one segment"""
+        _, codec, compression = segment_format(segment.name, self.codec)
+        return codec, *read_payloads(segment, codec, compression)
+
+    def _read(self, segment: Path) -> Iterator[Assessment]:
+        """Records of one segment, oldest first, skipping unreadable ones"""
+        codec, payloads, _ = self._payloads(segment)
+        return self._decode(segment, codec, payloads)
+
+    @staticmethod
+    def _decode(segment: Path, codec: RecordCodec, payloads: list[bytes]) -> Iterator[Assessment]:
+        for payload in payloads:
+            try:
+                yield codec.decode(payload)
+            except ValueError as e:
+                logger.warning(f"Skipping unreadable record in {segment.name}: {e}")
+
+    def segments_in_range(self, date_from: datetime | None = None, date_to: datetime | None = None) -> list[Path]:
+        """Segments whose [min_ts, max_ts] overlaps [date_from, date_to), oldest first"""
+        manifest = self.manifest()
+        selected = []
+        for segment in self.segments():
+            info = manifest.segments.get(segment.name)
+            if info is None:
+                continue
+            if date_from and info.max_ts < date_from:
+                continue
+            if date_to and info.min_ts >= date_to:
+                continue
+            selected.append(segment)
+        return selected
+
+    def iter_newest_first(
+        self,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None
+    ) -> Iterator[Assessment]:
+        """Yield assessments newest first, opening only segments in the date range"""
+        for segment in reversed(self.segments_in_range(date_from, date_to)):
+            for a in reversed(list(self._read(segment))):
+                ts = a.naive_timestamp()
+                if date_from and ts < date_from:
+                    continue
+                if date_to and ts >= date_to:
+                    continue
+                yield a
+
+    def iter_raw_newest_first(
+        self,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None
+    ) -> Iterator[bytes]:
+        """Serialized records newest first, one segment in memory at a time.
+
+        Only segments straddling a range boundary are parsed; JSON segments
+        inside the range are passed through as stored.
+        """
+        manifest = self.manifest()
+        for segment in reversed(self.segments_in_range(date_from, date_to)):
+            info = manifest.segments[segment.name]
+            straddles = (date_from and info.min_ts < date_from) or (date_to and info.max_ts >= date_to)
+            if not straddles:
+                codec, payloads, _ = self._payloads(segment)
+                for payload in reversed(payloads):
+                    yield codec.to_json(payload)
+                continue
+            for a in reversed(list(self._read(segment))):
+                ts = a.naive_timestamp()
+                if (date_from and ts < date_from) or (date_to and ts >= date_to):
+                    continue
+                yield a.model_dump_json().encode("utf-8")
+
+    # -- maintenance ----------------------------------------------------
+
+    def compact(self, before_partition: str) -> list[str]:
+        """Merge each partition older than `before_partition` into one compressed archive.
+
+        Records are re-sorted by timestamp. Returns the compacted partitions.
+        """
+        manifest = self.manifest()
+        groups: dict[str, list[Path]] = {}
+        for segment in self.segments():
+            partition = segment_partition(segment)
+            if partition is None:
+                # Unpartitioned segments (older log layout) go by their newest record
+                partition = self.partition_of(manifest.segments[segment.name].max_ts)
+            if partition < before_partition:
+                groups.setdefault(partition, []).append(segment)
+
+        compacted = []
+        for partition, members in sorted(groups.items()):
+            archive = self.directory / f"{partition}{self.codec.suffix}{self.archive_compression.suffix}"
+            if members == [archive]:
+                continue
+            records = []
+            for segment in members:
+                records.extend(self._read(segment))
+            records.sort(key=lambda a: a.naive_timestamp())
+            payload = self.codec.frame([self.codec.encode(a) for a in records])
+
+            tmp = archive.with_name(archive.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(self.archive_compression.compress(payload))
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(archive)
+            for segment in members:
+                if segment != archive:
+                    segment.unlink()
+            compacted.append(partition)
+            logger.info(f"Compacted {len(members)} segment(s) of {partition} into {archive.name}")
+
+        if compacted:
+            self.manifest()
+        return compacted
+
+    def rewrite(self, assessments_newest_first: list[Assessment]):
+        """Replace the whole log with the given records"""
+        staging = self.directory.with_name(self.directory.name + ".tmp")
+        if staging.exists():
+            _remove_tree(staging)
+        SegmentLog(
+            staging, self.max_segment_bytes, self.granularity,
+            self.codec.name, self.compression.name, self.archive_compression.name
+        ).append_many(reversed(assessments_newest_first))
+        staging.mkdir(parents=True, exist_ok=True)
+
+        old = self.directory.with_name(self.directory.name + ".old")
+        if self.directory.exists():
+            self.directory.rename(old)
+        staging.rename(self.directory)
+        self._manifest = None
+        if old.exists():
+            _remove_tree(old)
+
+
+def _remove_tree(path: Path):
+    for child in path.iterdir():
+        child.unlink()
+    path.rmdir()
@@ -0,0 +1,77 @@
+"""Coalescing of identical concurrent calls.
+
+While a call for a key is in flight, later callers with the same key wait
+for its result instead of starting their own, so a burst of submissions of
+the same paper costs one set of LLM calls. The shared work runs as its own
+task: a caller that is cancelled stops waiting without cancelling it for the
+others, and the work is only cancelled when every caller has gone. Errors are
+raised to every caller. Nothing is kept once the call finishes; the response
+cache handles repeats that are not concurrent.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def normalize_text(text: str | None) -> str:
+    """Collapse whitespace so trivially different submissions share a key"""
+    return " ".join(text.split()) if text else ""
+
+
+def flight_key(*parts: Any) -> str:
+    material = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[str, _Flight] = {}
+        self.counters = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            self.counters["calls"] += 1
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.counters["coalesced"] += 1
+            logger.info(f"Joining in-flight {self.name} call ({flight.waiters} already waiting)")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Last caller gone; later callers must not join the cancelled work
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieve the exception so an abandoned failed call is not logged as unhandled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
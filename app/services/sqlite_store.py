@@ -0,0 +1,225 @@
+"""SQLite storage backend for assessments.
+
+Each assessment is stored as its JSON document plus the columns the dashboard
+filters on (timestamp, tier, category, dissemination, audience), each indexed
+together with the timestamp so filtered, newest-first pages are index scans.
+Per-axis scores live in a child table for axis-level queries.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+from app.models import Assessment, AssessmentFilters
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    category TEXT,
+    dissemination TEXT NOT NULL,
+    audience TEXT NOT NULL,
+    title TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_timestamp ON assessments(timestamp);
+CREATE INDEX IF NOT EXISTS idx_assessments_tier ON assessments(tier, timestamp);
+CREATE INDEX IF NOT EXISTS idx_assessments_category ON assessments(category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_assessments_dissemination ON assessments(dissemination, timestamp);
+CREATE INDEX IF NOT EXISTS idx_assessments_audience ON assessments(audience, timestamp);
+
+CREATE TABLE IF NOT EXISTS axis_scores (
+    assessment_id TEXT NOT NULL REFERENCES assessments(id) ON DELETE CASCADE,
+    axis_id TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    reverse_scored INTEGER NOT NULL,
+    effective_score INTEGER NOT NULL,
+    PRIMARY KEY (assessment_id, axis_id)
+);
+CREATE INDEX IF NOT EXISTS idx_axis_scores_axis ON axis_scores(axis_id, effective_score);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Bumped in the same transaction as every write, so it never repeats (unlike rowids after replace_all)
+BUMP_VERSION = (
+    "INSERT INTO meta (key, value) VALUES ('version', 1) "
+    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+)
+
+
+def _ts(value) -> str:
+    """Fixed-width ISO timestamp so text order matches time order"""
+    return value.isoformat(timespec="microseconds")
+
+
+class SqliteStore:
+    """Assessment store backed by a single SQLite database in WAL mode"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL syncs the WAL on each commit; with group commit that is one fsync per batch
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._local_writes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def fingerprint(self) -> tuple:
+        """Changes on every commit, from this connection or any other"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._local_writes
+
+    def marker(self) -> list:
+        """Restart-stable change marker: the write counter kept in the database"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return [row[0] if row else 0]
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM assessments LIMIT 1").fetchone() is None
+
+    def append_many(self, assessments: Iterable[Assessment]):
+        """Insert (or replace) assessments in one transaction"""
+        rows, axis_rows = self._rows(assessments)
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._insert(rows, axis_rows)
+            self._local_writes += 1
+
+    def replace_all(self, assessments: Iterable[Assessment]):
+        """Drop every stored assessment and insert the given ones, in one transaction"""
+        rows, axis_rows = self._rows(assessments)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM axis_scores")
+            self._conn.execute("DELETE FROM assessments")
+            self._insert(rows, axis_rows)
+            self._local_writes += 1
+
+    @staticmethod
+    def _rows(assessments: Iterable[Assessment]) -> tuple[list[tuple], list[tuple]]:
+        """Assessment and axis score rows for the given assessments"""
+        rows = []
+        axis_rows = []
+        for a in assessments:
+            rows.append((
+                a.id,
+                _ts(a.naive_timestamp()),
+                a.tier.value,
+                a.input.category.value if a.input.category else None,
+                a.input.dissemination.value,
+                a.input.audience.value,
+                a.input.title,
+                a.model_dump_json(),
+            ))
+            for axis_id, axis_score in a.scores.scores.items():
+                effective = 3 - axis_score.score if axis_score.reverse_scored else axis_score.score
+                axis_rows.append((a.id, axis_id, axis_score.score, int(axis_score.reverse_scored), effective))
+        return rows, axis_rows
+
+    def _insert(self, rows: list[tuple], axis_rows: list[tuple]):
+        """Write rows and bump the version; the caller holds the lock and the transaction"""
+        self._conn.executemany("DELETE FROM axis_scores WHERE assessment_id = ?", [(r[0],) for r in rows])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO assessments "
+            "(id, timestamp, tier, category, dissemination, audience, title, doc) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._conn.executemany(
+            "INSERT INTO axis_scores (assessment_id, axis_id, score, reverse_scored, effective_score) "
+            "VALUES (?, ?, ?, ?, ?)",
+            axis_rows
+        )
+        self._conn.execute(BUMP_VERSION)
+
+    def get(self, assessment_id: str) -> Assessment | None:
+        with self._lock:
+            row = self._conn.execute("SELECT doc FROM assessments WHERE id = ?", (assessment_id,)).fetchone()
+        return Assessment.model_validate_json(row[0]) if row else None
+
+    def iter_newest_first(self) -> list[Assessment]:
+        with self._lock:
+            rows = self._conn.execute("SELECT doc FROM assessments ORDER BY timestamp DESC, id DESC").fetchall()
+        return [Assessment.model_validate_json(r[0]) for r in rows]
+
+    def _where(self, filters: AssessmentFilters) -> tuple[str, list]:
+        clauses = []
+        params: list = []
+        if filters.date_from:
+            clauses.append("timestamp >= ?")
+            params.append(_ts(filters.date_from))
+        if filters.date_to:
+            clauses.append("timestamp < ?")
+            params.append(_ts(filters.date_to))
+        for column in ("category", "tier", "dissemination", "audience"):
+            value = getattr(filters, column)
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        filters: AssessmentFilters,
+        limit: int | None = None,
+        offset: int = 0
+    ) -> tuple[int, list[Assessment]]:
+        """Filtered assessments, newest first, with the total match count"""
+        where, params = self._where(filters)
+        sql = f"SELECT doc FROM assessments{where} ORDER BY timestamp DESC, id DESC"
+        page_params = list(params)
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            page_params += [limit, offset]
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM assessments{where}", params).fetchone()[0]
+            rows = self._conn.execute(sql, page_params).fetchall()
+        return total, [Assessment.model_validate_json(r[0]) for r in rows]
+
+    def page(
+        self,
+        filters: AssessmentFilters,
+        limit: int,
+        before: tuple[datetime, str] | None = None
+    ) -> list[Assessment]:
+        """Up to `limit` assessments older than the (timestamp, id) key `before`, newest first"""
+        where, params = self._where(filters)
+        if before is not None:
+            where += " AND " if where else " WHERE "
+            where += "(timestamp, id) < (?, ?)"
+            params += [_ts(before[0]), before[1]]
+        sql = f"SELECT doc FROM assessments{where} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [Assessment.model_validate_json(r[0]) for r in rows]
+
+    def iter_docs(self, filters: AssessmentFilters, batch_size: int = 500) -> Iterator[str]:
+        """Stored JSON documents newest first, fetched in small batches.
+
+        Uses its own connection so a slow consumer never holds the shared one.
+        """
+        conn = sqlite3.connect(str(self.path))
+        try:
+            where, params = self._where(filters)
+            cursor = conn.execute(f"SELECT doc FROM assessments{where} ORDER BY timestamp DESC, id DESC", params)
+            while rows := cursor.fetchmany(batch_size):
+                for (doc,) in rows:
+                    yield doc
+        finally:
+            conn.close()
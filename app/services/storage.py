@@ -1,7 +1,36 @@
+import asyncio
 import json
-from pathlib import Path
-from app.models import Assessment, AssessmentsStore
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Iterator, Sequence
+from app.models import Assessment, AssessmentsStore, AssessmentFilters
 from app.config import settings
+from app.services.segment_log import SegmentLog
+from app.services.sqlite_store import SqliteStore
+from app.services.record_index import RecordIndex
+from app.services.assessment_cache import AssessmentCache
+from app.services.write_queue import GroupCommitWriter
+
+logger = logging.getLogger(__name__)
+
+# Parsed assessments shared by every request in this process
+_cache = AssessmentCache()
+
+# Open segment logs by directory and format (each keeps its manifest in memory)
+_logs: dict[tuple, SegmentLog] = {}
+
+# Open SQLite stores by path (connections are reused across requests)
+_sqlite_stores: dict[str, SqliteStore] = {}
+
+# Offset indexes over the JSON log, by log directory
+_record_indexes: dict[str, RecordIndex] = {}
+
+# Called as listener(assessments, generation_before, generation_after, marker_before) after each write
+_write_listeners: list[Callable[[list[Assessment], int | None, int, list], None]] = []
+
+# Serializes writes to the backend (the group-commit writer or direct callers)
+_write_lock = threading.Lock()
 
 
 def ensure_data_dir():
@@ -9,42 +38,254 @@ def ensure_data_dir():
     settings.data_dir.mkdir(parents=True, exist_ok=True)
 
 
-def load_assessments() -> AssessmentsStore:
-    """Load all assessments from JSON file"""
-    ensure_data_dir()
-    if not settings.assessments_file.exists():
-        return AssessmentsStore(assessments=[])
+def get_log() -> SegmentLog:
+    """Get the assessment log, importing the legacy JSON store on first use"""
+    key = (
+        str(settings.assessments_log_dir),
+        settings.segment_max_bytes,
+        settings.partition_granularity,
+        settings.storage_codec,
+        settings.storage_compression,
+        settings.archive_compression
+    )
+    log = _logs.get(key)
+    if log is None:
+        ensure_data_dir()
+        log = SegmentLog(settings.assessments_log_dir, *key[1:])
+        migrate_legacy_store(log)
+        _logs[key] = log
+    return log
+
+
+def get_sqlite_store() -> SqliteStore:
+    """Get the SQLite store, importing the JSON log into it if it is empty"""
+    key = str(settings.sqlite_file)
+    store = _sqlite_stores.get(key)
+    if store is None:
+        ensure_data_dir()
+        store = SqliteStore(settings.sqlite_file)
+        if store.is_empty():
+            log = get_log()
+            if log.has_segments():
+                records = list(log.iter_newest_first())
+                store.append_many(reversed(records))
+                logger.info(f"Imported {len(records)} assessments from the JSON log into SQLite")
+        _sqlite_stores[key] = store
+    return store
+
+
+def get_record_index() -> RecordIndex:
+    """Offset index over the JSON log, for reads that bypass a cold cache"""
+    key = str(settings.assessments_log_dir)
+    index = _record_indexes.get(key)
+    if index is None:
+        index = _record_indexes[key] = RecordIndex(get_log())
+    return index
+
+
+def warm_record_index():
+    """Load the JSON log's offset index (indexing any new segments) ahead of the first read"""
+    if settings.storage_backend == "json":
+        count = get_record_index().refresh()
+        logger.info(f"Offset index covers {count} assessments")
 
-    with open(settings.assessments_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return AssessmentsStore.model_validate(data)
+
+def close_record_indexes():
+    """Release memory-mapped segments before the log is rewritten or compacted"""
+    for index in _record_indexes.values():
+        index.close()
+
+
+def get_backend() -> SegmentLog | SqliteStore:
+    """Storage backend selected by settings.storage_backend"""
+    if settings.storage_backend == "sqlite":
+        return get_sqlite_store()
+    return get_log()
+
+
+def migrate_legacy_store(log: SegmentLog) -> int:
+    """One-time import of the legacy assessments.json document into the log.
+
+    Only runs while the log is still empty. The legacy file is renamed to
+    assessments.json.migrated afterwards so it is never imported twice.
+    Returns the number of migrated assessments.
+    """
+    legacy_file = settings.assessments_file
+    if not legacy_file.exists() or log.has_segments():
+        return 0
+
+    with open(legacy_file, "r", encoding="utf-8") as f:
+        store = AssessmentsStore.model_validate(json.load(f))
+
+    # The legacy document is newest first; the log is appended oldest first
+    log.append_many(reversed(store.assessments))
+    legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+    logger.info(f"Migrated {len(store.assessments)} assessments from {legacy_file.name}")
+    return len(store.assessments)
+
+
+def load_assessments() -> AssessmentsStore:
+    """Load all assessments (most recent first)"""
+    return AssessmentsStore(assessments=list(get_all_assessments()))
 
 
 def save_assessments(store: AssessmentsStore):
-    """Save assessments to JSON file"""
-    ensure_data_dir()
-    with open(settings.assessments_file, "w", encoding="utf-8") as f:
-        json.dump(store.model_dump(mode="json"), f, indent=2, default=str)
+    """Replace the stored assessments with the given store (most recent first)"""
+    with _write_lock:
+        backend = get_backend()
+        if isinstance(backend, SqliteStore):
+            backend.replace_all(store.assessments)
+        else:
+            close_record_indexes()
+            backend.rewrite(store.assessments)
+        _cache.invalidate()
+
+
+def persist_assessments(assessments: list[Assessment]):
+    """Durably write assessments (oldest first) and add them to the cache"""
+    with _write_lock:
+        backend = get_backend()
+        before = backend.fingerprint()
+        marker_before = backend.marker()
+        generation_before = _cache.generation
+        backend.append_many(assessments)
+        if not _cache.add(assessments, before, backend.fingerprint()):
+            # The store changed behind the cache's back: views built from it must rebuild
+            generation_before = None
+        for listener in _write_listeners:
+            listener(assessments, generation_before, _cache.generation, marker_before)
 
 
-def add_assessment(assessment: Assessment) -> Assessment:
-    """Add a new assessment and save"""
-    store = load_assessments()
-    store.assessments.insert(0, assessment)  # Most recent first
-    save_assessments(store)
+def add_write_listener(listener: Callable[[list[Assessment], int | None, int, list], None]):
+    """Register a callback for newly persisted assessments (oldest first).
+
+    Listeners run under the write lock with the cache generation from before
+    and after the write (None before when the store had changed behind the
+    cache) and the store marker from before it, so derived views can tell
+    whether they can be patched in place or must be rebuilt.
+    """
+    _write_listeners.append(listener)
+
+
+_writer = GroupCommitWriter(
+    persist_assessments,
+    max_batch_size=settings.write_batch_max_size,
+    max_delay_seconds=settings.write_batch_max_delay_ms / 1000
+)
+
+
+def start_writer():
+    """Start the group-commit writer (called on app startup)"""
+    _writer.start()
+
+
+async def stop_writer():
+    """Flush pending writes and stop the writer (called on app shutdown)"""
+    await _writer.stop()
+
+
+async def add_assessment(assessment: Assessment) -> Assessment:
+    """Persist a new assessment, returning once it is durably stored"""
+    await add_assessments([assessment])
     return assessment
 
 
+async def add_assessments(assessments: list[Assessment]):
+    """Persist new assessments (oldest first) in one write"""
+    if _writer.running:
+        await _writer.submit(assessments)
+    else:
+        await asyncio.to_thread(persist_assessments, assessments)
+
+
 def get_assessment(assessment_id: str) -> Assessment | None:
     """Get a single assessment by ID"""
-    store = load_assessments()
-    for a in store.assessments:
-        if a.id == assessment_id:
-            return a
-    return None
+    backend = get_backend()
+    if isinstance(backend, SqliteStore):
+        return backend.get(assessment_id)
+    fingerprint = backend.fingerprint()
+    if not _cache.is_current(fingerprint):
+        # Cold cache: decode just this record instead of the whole history
+        return get_record_index().get(assessment_id)
+    return _cache.get(assessment_id, fingerprint, backend.iter_newest_first)
+
+
+def get_all_assessments() -> Sequence[Assessment]:
+    """Get all assessments (most recent first) as a read-only view of the cache"""
+    backend = get_backend()
+    return _cache.all(backend.fingerprint(), backend.iter_newest_first)
+
+
+def query_assessments(
+    filters: AssessmentFilters,
+    limit: int | None = None,
+    offset: int = 0
+) -> tuple[int, list[Assessment]]:
+    """Filtered assessments (most recent first) and the total number of matches"""
+    backend = get_backend()
+    if isinstance(backend, SqliteStore):
+        return backend.query(filters, limit, offset)
+
+    if (filters.date_from or filters.date_to) and not _cache.is_current(backend.fingerprint()):
+        # Cold cache: read only the partitions overlapping the date range
+        candidates = backend.iter_newest_first(filters.date_from, filters.date_to)
+    else:
+        candidates = get_all_assessments()
+    filtered = [a for a in candidates if filters.matches(a)]
+    end = None if limit is None else offset + limit
+    return len(filtered), filtered[offset:end]
+
+
+def page_assessments(
+    limit: int,
+    before: tuple[datetime, str] | None = None,
+    filters: AssessmentFilters | None = None
+) -> list[Assessment]:
+    """One page of assessments (most recent first) older than the (timestamp, id) key `before`"""
+    filters = filters or AssessmentFilters()
+    backend = get_backend()
+    if isinstance(backend, SqliteStore):
+        return backend.page(filters, limit, before)
+    fingerprint = backend.fingerprint()
+    if not _cache.is_current(fingerprint):
+        return get_record_index().page(limit, before, filters)
+    return _cache.page(fingerprint, backend.iter_newest_first, limit, before, filters)
+
+
+def iter_serialized_assessments(filters: AssessmentFilters | None = None) -> Iterator[bytes]:
+    """Serialized assessments (most recent first), streamed straight from storage.
+
+    Only date filters are supported; records are yielded one at a time.
+    """
+    filters = filters or AssessmentFilters()
+    backend = get_backend()
+    if isinstance(backend, SqliteStore):
+        date_filters = AssessmentFilters(date_from=filters.date_from, date_to=filters.date_to)
+        for doc in backend.iter_docs(date_filters):
+            yield doc.encode("utf-8")
+    else:
+        yield from backend.iter_raw_newest_first(filters.date_from, filters.date_to)
+
+
+def cache_is_warm() -> bool:
+    """True when reads can be served from the cache without touching storage"""
+    return _cache.is_current(get_backend().fingerprint())
+
+
+def compact_log(before_partition: str | None = None) -> list[str]:
+    """Archive JSON log partitions older than `before_partition` (default: the current one)"""
+    with _write_lock:
+        log = get_log()
+        before = before_partition or log.partition_of(datetime.utcnow())
+        close_record_indexes()
+        return log.compact(before)
+
+
+def store_marker() -> list:
+    """Restart-stable marker of the stored data, for persisted derived views"""
+    return get_backend().marker()
 
 
-def get_all_assessments() -> list[Assessment]:
-    """Get all assessments"""
-    store = load_assessments()
-    return store.assessments
+def cache_generation() -> int:
+    """Changes whenever the cached view of the store changes"""
+    return _cache.generation
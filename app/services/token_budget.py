@@ -0,0 +1,200 @@
+"""Token estimates, prompt budgets and token usage accounting.
+
+Token counts come from tiktoken for OpenAI models when it is installed.
+Otherwise they are estimated from characters per token for each provider.
+That ratio starts at a typical value and is recalibrated from the prompt
+token counts providers report, so rate limits are charged accurately.
+Prompts are cut to a token budget with the fixed typical ratio instead
+(`budget_tokens`): the same paper must always produce the same prompt, or
+the response cache and request coalescing would stop matching it.
+
+Every provider call reports its usage here. The totals are kept per
+provider, and also on the usage meter of the current assessment
+(`metered()`), which is recorded on the Assessment. Cache hits and calls
+coalesced into another request's call cost nothing and count nothing.
+"""
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from app.config import settings
+
+# Typical characters per token for English prose, before calibration
+DEFAULT_CHARS_PER_TOKEN = {"anthropic": 3.5, "openai": 4.0, "google": 4.0, "groq": 3.8, "together": 3.8}
+FALLBACK_CHARS_PER_TOKEN = 3.8
+# Weight of each reported prompt in the calibrated ratio
+CALIBRATION_WEIGHT = 0.1
+# Snippets cut below this many tokens are dropped rather than kept as a fragment
+MIN_SECTION_TOKENS = 48
+TRUNCATION_MARK = " [...]"
+
+_lock = threading.Lock()
+_chars_per_token: dict[str, float] = {}
+_usage: dict[str, dict[str, int]] = {}
+_encodings: dict[str, object] = {}
+
+
+class TokenUsage:
+    """Tokens spent by the LLM calls of one assessment"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+
+_meter: ContextVar[TokenUsage | None] = ContextVar("token_usage", default=None)
+
+
+@contextmanager
+def metered() -> Iterator[TokenUsage]:
+    """Count the tokens of LLM calls made inside this block (including tasks it starts)"""
+    usage = TokenUsage()
+    token = _meter.set(usage)
+    try:
+        yield usage
+    finally:
+        _meter.reset(token)
+
+
+def _tiktoken_encoding(model: str):
+    """tiktoken encoding for an OpenAI model, or None when tiktoken is not installed"""
+    if model in _encodings:
+        return _encodings[model]
+    try:
+        import tiktoken
+    except ImportError:
+        encoding = None
+    else:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    _encodings[model] = encoding
+    return encoding
+
+
+def chars_per_token(provider: str | None) -> float:
+    return _chars_per_token.get(provider) or DEFAULT_CHARS_PER_TOKEN.get(provider, FALLBACK_CHARS_PER_TOKEN)
+
+
+def fixed_chars_per_token(provider: str | None) -> float:
+    return DEFAULT_CHARS_PER_TOKEN.get(provider, FALLBACK_CHARS_PER_TOKEN)
+
+
+def _tiktoken_count(text: str, provider: str | None) -> int | None:
+    if provider != "openai":
+        return None
+    encoding = _tiktoken_encoding(settings.get_model("openai"))
+    return len(encoding.encode(text, disallowed_special=())) if encoding is not None else None
+
+
+def count_tokens(text: str, provider: str | None = None) -> int:
+    """Token count of `text` for a provider (exact for OpenAI with tiktoken, else estimated)"""
+    if not text:
+        return 0
+    exact = _tiktoken_count(text, provider)
+    if exact is not None:
+        return exact
+    return max(1, round(len(text) / chars_per_token(provider)))
+
+
+def budget_tokens(text: str, provider: str | None = None) -> int:
+    """Token count for prompt budgets: like count_tokens, but never calibrated, so it is stable"""
+    if not text:
+        return 0
+    exact = _tiktoken_count(text, provider)
+    if exact is not None:
+        return exact
+    return max(1, round(len(text) / fixed_chars_per_token(provider)))
+
+
+def record_usage(provider: str, prompt: str, prompt_tokens: int | None, completion: str, completion_tokens: int | None):
+    """Account one provider call; counts the provider did not report are estimated"""
+    if prompt_tokens:
+        with _lock:
+            # Prompts shorter than this are mostly chat-template overhead
+            if len(prompt) >= 200:
+                ratio = len(prompt) / prompt_tokens
+                current = chars_per_token(provider)
+                _chars_per_token[provider] = current + CALIBRATION_WEIGHT * (ratio - current)
+    else:
+        prompt_tokens = count_tokens(prompt, provider)
+    if completion_tokens is None:
+        completion_tokens = count_tokens(completion, provider)
+
+    with _lock:
+        totals = _usage.setdefault(provider, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+    usage = _meter.get()
+    if usage is not None:
+        usage.add(prompt_tokens, completion_tokens)
+
+
+def provider_usage(provider: str) -> dict:
+    """Token totals and the current characters-per-token estimate for a provider"""
+    with _lock:
+        totals = dict(_usage.get(provider, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}))
+    totals["chars_per_token"] = round(chars_per_token(provider), 2)
+    return totals
+
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: str | None = None) -> str:
+    """`text` cut at a word boundary to at most `max_tokens` tokens, marked when cut"""
+    if budget_tokens(text, provider) <= max_tokens:
+        return text
+    mark_tokens = budget_tokens(TRUNCATION_MARK, provider)
+    if max_tokens <= mark_tokens:
+        return ""
+    # Start from the character estimate, then shrink until the count fits
+    end = int((max_tokens - mark_tokens) * fixed_chars_per_token(provider))
+    while end > 0:
+        cut = text[:end]
+        space = cut.rfind(" ")
+        if space > end * 0.8:
+            cut = cut[:space]
+        cut = cut.rstrip(" ,;:")
+        if budget_tokens(cut, provider) + mark_tokens <= max_tokens:
+            return cut + TRUNCATION_MARK
+        end = int(end * 0.9)
+    return ""
+
+
+def squeeze_whitespace(text: str) -> str:
+    """Collapse the line breaks, hyphenation and runs of spaces of text pasted from a PDF"""
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def fit_paper(
+    title: str,
+    abstract: str,
+    snippet: str | None,
+    max_tokens: int,
+    provider: str | None = None
+) -> tuple[str, str | None]:
+    """Abstract and snippet cut so that the paper fits in `max_tokens`.
+
+    Unchanged when they already fit. Otherwise whitespace is squeezed first,
+    then the snippet (the least valuable part) is cut or dropped, and the
+    abstract is cut only if it does not fit on its own.
+    """
+    title_tokens = budget_tokens(title, provider)
+    if title_tokens + budget_tokens(abstract, provider) + budget_tokens(snippet or "", provider) <= max_tokens:
+        return abstract, snippet
+
+    abstract = squeeze_whitespace(abstract)
+    snippet = squeeze_whitespace(snippet) if snippet else snippet
+    abstract_tokens = budget_tokens(abstract, provider)
+    room = max_tokens - title_tokens - abstract_tokens
+    if snippet and budget_tokens(snippet, provider) > room:
+        snippet = truncate_to_tokens(snippet, room, provider) if room >= MIN_SECTION_TOKENS else None
+    if room < 0:
+        abstract = truncate_to_tokens(abstract, max(0, max_tokens - title_tokens), provider)
+    return abstract, snippet
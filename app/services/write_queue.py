@@ -0,0 +1,107 @@
+"""Group-commit writer for new assessments.
+
+Requests hand their Assessment to a single background task through a queue.
+The task collects whatever arrives within a short window (or until the batch
+is full), persists the batch with one durable write, then resolves every
+waiting request. Concurrent submissions therefore never race on the store,
+and a burst of N assessments costs one fsync instead of N.
+"""
+import asyncio
+import logging
+from typing import Callable
+from app.models import Assessment
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    """Single background task that flushes queued assessments in batches"""
+
+    def __init__(
+        self,
+        flush: Callable[[list[Assessment]], None],
+        max_batch_size: int,
+        max_delay_seconds: float
+    ):
+        self._flush = flush
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay_seconds = max(0.0, max_delay_seconds)
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # Set once stop() has queued the shutdown sentinel; nothing queued after it is read
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="assessment-writer")
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer task"""
+        if not self.running:
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, assessments: list[Assessment]):
+        """Queue assessments and wait until they have been durably written.
+
+        Once the writer is stopping or stopped they are written directly instead.
+        """
+        if self._stopping or not self.running:
+            await asyncio.to_thread(self._flush, assessments)
+            return
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((assessments, future))
+        await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            size = len(item[0])
+            deadline = loop.time() + self.max_delay_seconds
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            await self._commit(batch)
+
+    async def _commit(self, batch: list[tuple[list[Assessment], asyncio.Future]]):
+        records = [a for assessments, _ in batch for a in assessments]
+        try:
+            await asyncio.to_thread(self._flush, records)
+        except Exception as e:
+            logger.error(f"Failed to write batch of {len(records)} assessments: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
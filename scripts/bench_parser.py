@@ -0,0 +1,92 @@
+"""
+Benchmark the scoring response parser on well-formed and malformed responses.
+
+The corpus holds, for each failure mode seen from providers (prose around
+the JSON, markdown fences, raw newlines, trailing commas, truncation, an
+unescaped quote, an out-of-range score, a missing axis), a set of responses
+derived from valid ones. Recorded responses from a mock cassette directory
+(see MOCK_CASSETTE_DIR) can be added with --cassettes. For each case it
+reports parse time, the share of axes recovered, and how many responses
+would need a repair re-ask, next to what a plain json.loads recovers.
+
+Usage:
+    python -m scripts.bench_parser [--responses 200] [--cassettes DIR]
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from app.services import mock_llm
+from app.services.risk_scorer import get_axes_snapshot, parse_axis_scores
+
+
+def malformed_variants(text: str, rng: random.Random) -> dict[str, str]:
+    """One response per failure mode, derived from a valid bare-JSON response"""
+    cut = rng.randint(len(text) // 3, len(text) - 2)
+    rationale_at = text.index('"rationale": "') + len('"rationale": "')
+    return {
+        "valid": text,
+        "fenced": "```json\n" + text + "\n```",
+        "prose": "Here is my assessment of the paper:\n\n" + text + "\n\nLet me know if you need more detail.",
+        "raw newlines": text.replace(": signal", ":\n\tsignal", 3),
+        "trailing comma": text[:text.rindex("}")].rstrip() + ",\n}",
+        "truncated": text[:cut],
+        "unescaped quote": text[:rationale_at] + 'the "dual use" issue ' + text[rationale_at:],
+        "out of range": text.replace('"score": 1', '"score": 4', 1),
+        "missing axis": text.replace('"score": ', '"scor": ', 1),
+    }
+
+
+def build_corpus(count: int, cassettes: Path | None) -> dict[str, list[str]]:
+    snapshot = get_axes_snapshot()
+    rng = random.Random(0)
+    corpus: dict[str, list[str]] = {}
+    for i in range(count):
+        prompt = snapshot.build_prompt(f"Synthetic paper {i}", f"Abstract {rng.random()}", None)
+        text = mock_llm.synthesize(prompt).removeprefix("```json\n").removesuffix("\n```")
+        for case, variant in malformed_variants(text, rng).items():
+            corpus.setdefault(case, []).append(variant)
+    if cassettes is not None:
+        for path in sorted(cassettes.glob("*/*.json")):
+            text = json.loads(path.read_text(encoding="utf-8"))["text"]
+            if '"score"' in text:
+                corpus.setdefault("recorded", []).append(text)
+    return corpus
+
+
+def json_only(text: str, axis_ids: list[str]) -> int:
+    """Axes a single json.loads of the outermost object recovers"""
+    try:
+        data = json.loads(text[text.find("{"):text.rfind("}") + 1])
+    except ValueError:
+        return 0
+    return sum(1 for aid in axis_ids if isinstance(data.get(aid), dict) and data[aid].get("score") in (0, 1, 2, 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--responses", type=int, default=200, help="responses per failure mode")
+    parser.add_argument("--cassettes", type=Path, help="also parse recorded scoring responses from this directory")
+    args = parser.parse_args()
+
+    axes = list(get_axes_snapshot().axes)
+    axis_ids = [a.id for a in axes]
+    corpus = build_corpus(args.responses, args.cassettes)
+
+    print(f"{'case':<16} {'responses':>9} {'us/parse':>9} {'recovered':>10} {'re-asks':>8} {'json.loads':>11}")
+    for case, texts in corpus.items():
+        started = time.perf_counter()
+        results = [parse_axis_scores(text, axes)[0] for text in texts]
+        elapsed = time.perf_counter() - started
+
+        total = len(texts) * len(axis_ids)
+        recovered = sum(len(found) for found in results)
+        reasks = sum(1 for found in results if len(found) < len(axis_ids))
+        baseline = sum(json_only(text, axis_ids) for text in texts)
+        print(f"{case:<16} {len(texts):>9} {elapsed / len(texts) * 1e6:>9.1f} {recovered / total:>10.1%} "
+              f"{reasks:>8} {baseline / total:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
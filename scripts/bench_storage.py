@@ -0,0 +1,133 @@
+"""
+Benchmark assessment storage formats on a synthetic dataset.
+
+Compares the legacy pretty-printed assessments.json document with the segment
+log in every available encoding / compression: time to save all records,
+time to load them back, and size on disk. Formats whose optional package is
+not installed are skipped.
+
+Usage:
+    python -m scripts.bench_storage [--records 100000]
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from app.models import (
+    Assessment, AssessmentsStore, AxisScore, Audience, Dissemination,
+    ResearchCategory, ResearchInput, RiskScores, Tier
+)
+from app.services.segment_log import SegmentLog
+
+FORMATS = [
+    ("json", "none"),
+    ("orjson", "none"),
+    ("msgpack", "none"),
+    ("json", "gzip"),
+    ("json", "zstd"),
+    ("msgpack", "zstd"),
+]
+
+AXES = [f"{section}{n}" for section in "ABCDEF" for n in range(1, 5)]
+
+
+def synthetic_assessments(count: int) -> list[Assessment]:
+    """Deterministic assessments, oldest first"""
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    words = "model data risk safety dual use pathogen synthesis protocol evaluation release".split()
+    assessments = []
+    for i in range(count):
+        abstract = " ".join(rng.choice(words) for _ in range(120))
+        assessments.append(Assessment(
+            id=f"{i:08x}",
+            timestamp=start + timedelta(minutes=5 * i),
+            input=ResearchInput(
+                title=f"Synthetic paper {i}",
+                abstract=abstract,
+                dissemination=rng.choice(list(Dissemination)),
+                audience=rng.choice(list(Audience)),
+                category=rng.choice(list(ResearchCategory))
+            ),
+            scores=RiskScores(scores={
+                axis: AxisScore(
+                    score=rng.randint(0, 3),
+                    rationale=" ".join(rng.choice(words) for _ in range(12)),
+                    reverse_scored=axis.startswith("F")
+                )
+                for axis in AXES
+            }),
+            tier=rng.choice(list(Tier)),
+            recommendations=["Review before release", "Limit access to methods"]
+        ))
+    return assessments
+
+
+def dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.iterdir())
+
+
+def bench_legacy(assessments: list[Assessment], workdir: Path) -> tuple[float, float, int]:
+    path = workdir / "assessments.json"
+    store = AssessmentsStore(assessments=list(reversed(assessments)))
+
+    t = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store.model_dump(mode="json"), f, indent=2, default=str)
+    save = time.perf_counter() - t
+
+    t = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        loaded = AssessmentsStore.model_validate(json.load(f))
+    load = time.perf_counter() - t
+
+    assert len(loaded.assessments) == len(assessments)
+    return save, load, path.stat().st_size
+
+
+def bench_log(assessments: list[Assessment], workdir: Path, codec: str, compression: str) -> tuple[float, float, int]:
+    directory = workdir / f"log-{codec}-{compression}"
+    log = SegmentLog(directory, 8 * 1024 * 1024, "month", codec, compression)
+
+    t = time.perf_counter()
+    log.append_many(assessments)
+    save = time.perf_counter() - t
+
+    t = time.perf_counter()
+    loaded = list(log.iter_newest_first())
+    load = time.perf_counter() - t
+
+    assert len(loaded) == len(assessments)
+    return save, load, dir_size(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.records} synthetic assessments...")
+    assessments = synthetic_assessments(args.records)
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_storage_"))
+    try:
+        results = [("legacy assessments.json", *bench_legacy(assessments, workdir))]
+        for codec, compression in FORMATS:
+            try:
+                results.append((f"log {codec} + {compression}", *bench_log(assessments, workdir, codec, compression)))
+            except ImportError as e:
+                print(f"Skipping {codec} + {compression}: {e}")
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"\n{'format':<26}{'save (s)':>10}{'load (s)':>10}{'size (MB)':>11}")
+    for name, save, load, size in results:
+        print(f"{name:<26}{save:>10.2f}{load:>10.2f}{size / 1_000_000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
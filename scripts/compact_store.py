@@ -0,0 +1,30 @@
+"""
+Compact old partitions of the assessment log into compressed archives.
+
+Every partition older than --before (default: the current month) is merged
+into a single <partition>.jsonl.gz file (encoding and compression follow
+STORAGE_CODEC and ARCHIVE_COMPRESSION). Archives remain readable by the app.
+
+Usage:
+    python -m scripts.compact_store [--before 2026-01]
+"""
+import argparse
+import logging
+from app.services import storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", help="Compact partitions older than this partition key (e.g. 2026-01)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    compacted = storage.compact_log(args.before)
+    if compacted:
+        print(f"Compacted {len(compacted)} partition(s): {', '.join(compacted)}")
+    else:
+        print("Nothing to compact")
+
+
+if __name__ == "__main__":
+    main()
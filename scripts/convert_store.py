@@ -0,0 +1,90 @@
+"""
+Convert assessments between the legacy assessments.json document and the
+segment log, in any supported encoding.
+
+    import   Load a legacy assessments.json into the log
+    export   Write the log back out as a legacy assessments.json document
+    recode   Rewrite the log with another encoding / compression
+
+--codec and --compression default to STORAGE_CODEC / STORAGE_COMPRESSION.
+Stop the app before converting.
+
+Usage:
+    python -m scripts.convert_store import [--source data/assessments.json] [--replace]
+    python -m scripts.convert_store export [--dest data/assessments.export.json]
+    python -m scripts.convert_store recode --codec msgpack --compression zstd
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from app.config import settings
+from app.models import AssessmentsStore
+from app.services.segment_log import SegmentLog
+
+
+def open_log(args) -> SegmentLog:
+    return SegmentLog(
+        Path(args.log_dir),
+        settings.segment_max_bytes,
+        settings.partition_granularity,
+        args.codec,
+        args.compression,
+        settings.archive_compression
+    )
+
+
+def import_store(args):
+    log = open_log(args)
+    with open(args.source, "r", encoding="utf-8") as f:
+        store = AssessmentsStore.model_validate(json.load(f))
+
+    if log.has_segments():
+        if not args.replace:
+            sys.exit(f"{log.directory} already holds assessments; pass --replace to overwrite them")
+        log.rewrite(store.assessments)
+    else:
+        # The legacy document is newest first; the log is appended oldest first
+        log.append_many(reversed(store.assessments))
+    print(f"Imported {len(store.assessments)} assessments into {log.directory} ({log.suffix})")
+
+
+def export_store(args):
+    log = open_log(args)
+    store = AssessmentsStore(assessments=list(log.iter_newest_first()))
+    with open(args.dest, "w", encoding="utf-8") as f:
+        json.dump(store.model_dump(mode="json"), f, indent=2, default=str)
+    print(f"Exported {len(store.assessments)} assessments to {args.dest}")
+
+
+def recode_store(args):
+    log = open_log(args)
+    records = list(log.iter_newest_first())
+    log.rewrite(records)
+    print(f"Rewrote {len(records)} assessments in {log.directory} as {log.suffix}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import", "export", "recode"])
+    parser.add_argument("--log-dir", default=str(settings.assessments_log_dir), help="Segment log directory")
+    parser.add_argument("--codec", default=settings.storage_codec, choices=["json", "orjson", "msgpack"])
+    parser.add_argument("--compression", default=settings.storage_compression, choices=["none", "gzip", "zstd"])
+    parser.add_argument("--source", default=str(settings.assessments_file), help="Legacy JSON file to import")
+    parser.add_argument("--dest", default=str(settings.data_dir / "assessments.export.json"),
+                        help="Legacy JSON file to export to")
+    parser.add_argument("--replace", action="store_true", help="Overwrite a non-empty log on import")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "import":
+        import_store(args)
+    elif args.command == "export":
+        export_store(args)
+    elif args.command == "recode":
+        recode_store(args)
+
+
+if __name__ == "__main__":
+    main()
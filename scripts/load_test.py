@@ -0,0 +1,109 @@
+"""
+Load-test the assessment pipeline offline against the mock LLM provider.
+
+Runs scoring, tiering and recommendations for synthetic papers in-process,
+with a fixed number of assessments in flight, and reports throughput and
+latency percentiles. Nothing is stored and no real provider is called; the
+response cache is off unless --cache is given. Mock latency, error and
+malformed-JSON rates default to the MOCK_* settings. With --cassettes,
+recorded responses are replayed (record them by running the app with
+MOCK_RECORD=true and MOCK_CASSETTE_DIR set).
+
+Usage:
+    python -m scripts.load_test [--requests 500] [--concurrency 32] [--cassettes DIR]
+"""
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from app.config import settings
+from app.models import AssessRequest, Audience, Dissemination
+from app.services.pipeline import build_assessment
+from app.services.rate_limiter import LLMUnavailableError
+
+
+def synthetic_requests(count: int, distinct: int) -> list[AssessRequest]:
+    """Deterministic requests cycling through `distinct` papers"""
+    rng = random.Random(0)
+    words = "model data risk safety dual use pathogen synthesis protocol evaluation release".split()
+    papers = [
+        (f"Synthetic paper {i}", " ".join(rng.choice(words) for _ in range(150)))
+        for i in range(distinct)
+    ]
+    return [
+        AssessRequest(
+            title=papers[i % distinct][0],
+            abstract=papers[i % distinct][1],
+            dissemination=rng.choice(list(Dissemination)),
+            audience=rng.choice(list(Audience))
+        )
+        for i in range(count)
+    ]
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+async def run(requests: list[AssessRequest], concurrency: int) -> tuple[list[float], dict[str, int]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outcomes = {"ok": 0, "unavailable": 0, "failed": 0}
+
+    async def one(request: AssessRequest):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await build_assessment(request)
+            except LLMUnavailableError:
+                outcomes["unavailable"] += 1
+                return
+            except Exception:
+                outcomes["failed"] += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            outcomes["ok"] += 1
+
+    await asyncio.gather(*(one(r) for r in requests))
+    return latencies, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=0, help="distinct papers (default: all different)")
+    parser.add_argument("--cassettes", type=Path, help="replay recorded responses from this directory")
+    parser.add_argument("--latency-ms", type=float, default=settings.mock_latency_ms)
+    parser.add_argument("--error-rate", type=float, default=settings.mock_error_rate)
+    parser.add_argument("--malformed-rate", type=float, default=settings.mock_malformed_rate)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache on")
+    args = parser.parse_args()
+
+    settings.llm_provider = "mock"
+    settings.llm_providers = []
+    settings.llm_cache_enabled = args.cache
+    settings.duplicate_detection = False
+    settings.mock_cassette_dir = args.cassettes
+    settings.mock_record = False
+    settings.mock_latency_ms = args.latency_ms
+    settings.mock_error_rate = args.error_rate
+    settings.mock_malformed_rate = args.malformed_rate
+
+    requests = synthetic_requests(args.requests, args.distinct or args.requests)
+    started = time.perf_counter()
+    latencies, outcomes = asyncio.run(run(requests, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    print(f"{args.requests} assessments, {args.concurrency} in flight, "
+          f"mock latency {args.latency_ms:.0f} ms ({settings.mock_latency_distribution})")
+    print(f"  completed {outcomes['ok']}, unavailable {outcomes['unavailable']}, failed {outcomes['failed']}")
+    print(f"  {elapsed:.2f} s total, {outcomes['ok'] / elapsed:.1f} assessments/s")
+    print(f"  latency p50 {percentile(ordered, 0.5):.3f} s, p95 {percentile(ordered, 0.95):.3f} s, "
+          f"p99 {percentile(ordered, 0.99):.3f} s, max {percentile(ordered, 1.0):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Train the local research category classifier from stored assessments.
+
+Fits a softmax linear model over TF-IDF weighted words and word pairs of
+each paper's title and abstract to the category recorded on its assessment,
+reports accuracy on a held-out share, and how many papers the classifier
+would settle on its own at CATEGORY_MIN_CONFIDENCE (and how accurately),
+then refits on everything and writes the model to CATEGORY_MODEL_FILE. The
+running app picks up the new model without a restart. Assessments without
+a category, and near-duplicates that reused another assessment, are skipped.
+
+Usage:
+    python -m scripts.train_category_classifier [--source data/assessments.json] [--output FILE]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from app.config import settings
+from app.models import Assessment, AssessmentsStore
+from app.services import storage
+from app.services.category_classifier import CATEGORY_IDS, CategoryModel, features
+
+
+def load_examples(source: Path | None) -> list[tuple[Counter, str]]:
+    """(features, category) of every usable stored assessment"""
+    if source is not None:
+        with open(source, "r", encoding="utf-8") as f:
+            assessments: list[Assessment] = AssessmentsStore.model_validate(json.load(f)).assessments
+    else:
+        assessments = storage.get_all_assessments()
+    return [
+        (features(a.input.title, a.input.abstract), a.input.category.value)
+        for a in assessments
+        if a.input.category is not None and a.duplicate_of is None
+    ]
+
+
+def build_vocabulary(examples: list[tuple[Counter, str]], min_df: int, max_features: int) -> tuple[dict[str, int], np.ndarray]:
+    """Terms in at least `min_df` papers (the `max_features` most common) and their idf"""
+    df = Counter()
+    for counts, _ in examples:
+        df.update(counts.keys())
+    terms = [t for t, n in df.most_common(max_features) if n >= min_df]
+    idf = np.array([math.log((1 + len(examples)) / (1 + df[t])) + 1.0 for t in terms])
+    return {t: i for i, t in enumerate(terms)}, idf
+
+
+def sparse_rows(model: CategoryModel, examples: list[tuple[Counter, str]]):
+    """CSR-style (indptr, indices, values) of the examples' feature vectors"""
+    indptr, indices, values = [0], [], []
+    for counts, _ in examples:
+        index, vector = model.vectorize(counts)
+        indices.extend(index)
+        values.extend(vector.tolist())
+        indptr.append(len(indices))
+    return np.array(indptr), np.array(indices, dtype=np.int64), np.array(values)
+
+
+def fit(examples: list[tuple[Counter, str]], min_df: int, max_features: int, epochs: int, l2: float) -> CategoryModel:
+    """Softmax regression by full-batch Adam on the TF-IDF vectors"""
+    vocabulary, idf = build_vocabulary(examples, min_df, max_features)
+    classes = CATEGORY_IDS
+    n_features, n_classes = len(vocabulary), len(classes)
+    model = CategoryModel(classes, vocabulary, idf, np.zeros((n_features, n_classes)), np.zeros(n_classes),
+                          trained_on=len(examples))
+
+    indptr, indices, values = sparse_rows(model, examples)
+    row_of = np.repeat(np.arange(len(examples)), np.diff(indptr))
+    targets = np.zeros((len(examples), n_classes))
+    targets[np.arange(len(examples)), [classes.index(c) for c in (label for _, label in examples)]] = 1.0
+
+    params = [model.weights, model.bias]
+    moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    rate, beta1, beta2 = 0.05, 0.9, 0.999
+    for step in range(1, epochs + 1):
+        logits = np.zeros((len(examples), n_classes)) + model.bias
+        np.add.at(logits, row_of, values[:, None] * model.weights[indices])
+        logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+        error = logits / logits.sum(axis=1, keepdims=True) - targets
+
+        grad_weights = np.stack([
+            np.bincount(indices, weights=values * error[row_of, c], minlength=n_features)
+            for c in range(n_classes)
+        ], axis=1) / len(examples) + l2 * model.weights
+        grad_bias = error.mean(axis=0)
+        for param, grad, (m, v) in zip(params, [grad_weights, grad_bias], moments):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + 1e-8)
+    return model
+
+
+def evaluate(model: CategoryModel, examples: list[tuple[Counter, str]], min_confidence: float) -> dict:
+    """Held-out accuracy, share predicted at `min_confidence` and its accuracy, and speed"""
+    correct = confident = confident_correct = 0
+    started = time.perf_counter()
+    for counts, label in examples:
+        probabilities = model.probabilities(counts)
+        best = int(np.argmax(probabilities))
+        hit = model.classes[best] == label
+        correct += hit
+        if probabilities[best] >= min_confidence:
+            confident += 1
+            confident_correct += hit
+    elapsed = time.perf_counter() - started
+    return {
+        "accuracy": correct / len(examples),
+        "coverage": confident / len(examples),
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+        "us_per_paper": elapsed / len(examples) * 1e6,  # excluding tokenization
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--source", type=Path, help="legacy assessments.json to train from (default: the configured store)")
+    parser.add_argument("--output", type=Path, default=settings.category_model_file)
+    parser.add_argument("--min-df", type=int, default=2, help="papers a term must appear in")
+    parser.add_argument("--max-features", type=int, default=20000)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of papers held out for evaluation")
+    args = parser.parse_args()
+
+    examples = load_examples(args.source)
+    labels = Counter(label for _, label in examples)
+    if len(labels) < 2:
+        sys.exit(f"Need assessments in at least two categories to train; found {dict(labels)}")
+    print(f"{len(examples)} assessments: " + ", ".join(f"{c} {n}" for c, n in labels.most_common()))
+
+    random.Random(0).shuffle(examples)
+    held_out = int(len(examples) * args.holdout)
+    if held_out:
+        model = fit(examples[held_out:], args.min_df, args.max_features, args.epochs, args.l2)
+        seed = evaluate(CategoryModel.seed(), examples[:held_out], settings.category_min_confidence)
+        trained = evaluate(model, examples[:held_out], settings.category_min_confidence)
+        print(f"held out {held_out} papers, confidence threshold {settings.category_min_confidence:g}:")
+        for name, result in (("keyword model", seed), ("trained model", trained)):
+            print(f"  {name:<14} accuracy {result['accuracy']:.1%}, settled locally {result['coverage']:.1%} "
+                  f"at {result['confident_accuracy']:.1%} accuracy, {result['us_per_paper']:.0f} us/paper")
+
+    model = fit(examples, args.min_df, args.max_features, args.epochs, args.l2)
+    model.save(args.output)
+    print(f"Wrote model with {len(model.vocabulary)} terms to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Shared fixtures: every test runs against its own data directory and the mock LLM provider."""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.models import (
+    Assessment, AxisScore, Audience, Dissemination, ResearchCategory, ResearchInput, RiskScores, Tier
+)
+from app.services import (
+    aggregates, category_classifier, duplicate_index, llm_cache, llm_clients, provider_pool, rate_limiter,
+    score_matrix, storage, token_budget
+)
+from app.services.assessment_cache import AssessmentCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Point every data path at tmp_path and reset process-wide service state"""
+    data = tmp_path / "data"
+    overrides = {
+        "data_dir": data,
+        "assessments_file": data / "assessments.json",
+        "assessments_log_dir": data / "assessments",
+        "sqlite_file": data / "assessments.db",
+        "aggregates_file": data / "dashboard_aggregates.json",
+        "llm_cache_dir": data / "llm_cache",
+        "jobs_file": data / "jobs.db",
+        "category_model_file": data / "category_model.json",
+        "storage_backend": "json",
+        "storage_codec": "json",
+        "storage_compression": "none",
+        "llm_provider": "mock",
+        "llm_providers": [],
+        "llm_cache_enabled": False,
+        "llm_structured_output": False,
+        "scoring_mode": "single",
+        "mock_latency_ms": 0,
+        "mock_error_rate": 0.0,
+        "mock_malformed_rate": 0.0,
+        "mock_cassette_dir": None,
+        "mock_record": False,
+        "llm_retry_base_delay": 0.01,
+        "llm_retry_max_delay": 0.05,
+        "duplicate_detection": False,
+    }
+    for name, value in overrides.items():
+        monkeypatch.setattr(settings, name, value)
+
+    monkeypatch.setattr(storage, "_cache", AssessmentCache())
+    monkeypatch.setattr(storage, "_logs", {})
+    monkeypatch.setattr(storage, "_sqlite_stores", {})
+    monkeypatch.setattr(storage, "_record_indexes", {})
+    monkeypatch.setattr(aggregates, "_aggregates", None)
+    monkeypatch.setattr(aggregates, "_dirty", False)
+    monkeypatch.setattr(aggregates, "_saved_at", 0.0)
+    monkeypatch.setattr(score_matrix, "_matrix", None)
+    monkeypatch.setattr(score_matrix, "_matrix_generation", -1)
+    monkeypatch.setattr(duplicate_index, "_index", None)
+    monkeypatch.setattr(duplicate_index, "_index_marker", None)
+    monkeypatch.setattr(category_classifier, "_model", None)
+    monkeypatch.setattr(category_classifier, "_model_stamp", None)
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_clients, "_clients", {})
+    monkeypatch.setattr(provider_pool, "_pool", None)
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setattr(token_budget, "_chars_per_token", {})
+    monkeypatch.setattr(token_budget, "_usage", {})
+    yield data
+    for store in storage._sqlite_stores.values():
+        store.close()
+    for index in storage._record_indexes.values():
+        index.close()
+
+
+@pytest.fixture
+def make_assessment():
+    """Factory for assessments with controllable timestamp, tier, category and scores"""
+    base = datetime(2024, 3, 15, 12, 0, 0)
+
+    def make(
+        n: int = 0,
+        timestamp: datetime | None = None,
+        tier: Tier = Tier.LOW,
+        category: ResearchCategory | None = ResearchCategory.AI_ML,
+        scores: dict[str, int] | None = None,
+        title: str | None = None,
+        abstract: str = "An abstract.",
+        **fields
+    ) -> Assessment:
+        scores = scores if scores is not None else {"A1": 1, "B1": 2}
+        return Assessment(
+            id=f"a{n:07d}",
+            timestamp=timestamp or base + timedelta(minutes=n),
+            input=ResearchInput(
+                title=title or f"Paper {n}",
+                abstract=abstract,
+                dissemination=Dissemination.PREPRINT,
+                audience=Audience.EXPERTS,
+                category=category
+            ),
+            scores=RiskScores(scores={
+                axis_id: AxisScore(score=score, rationale=f"{axis_id} rationale") for axis_id, score in scores.items()
+            }),
+            tier=tier,
+            recommendations=["Review before release"],
+            **fields
+        )
+
+    return make
+
+
+@pytest.fixture
+def client():
+    """Test client for the API (the lifespan handler is not run)"""
+    from app.main import app
+    return TestClient(app)
@@ -0,0 +1,87 @@
+import json
+from app.config import settings
+from app.models import AssessmentFilters, AssessmentsStore, ResearchCategory, Tier
+from app.services import aggregates, storage
+from app.services.score_matrix import ScoreMatrix, configured_axis_ids
+
+
+def sample(make_assessment):
+    return [
+        make_assessment(0, tier=Tier.HIGH, scores={"A1": 3, "C1": 0}),
+        make_assessment(1, category=ResearchCategory.NUCLEAR, scores={"A1": 1, "D1": 2}),
+        make_assessment(2, tier=Tier.CRITICAL, category=None, scores={"B1": 2}),
+    ]
+
+
+def test_totals_match_a_full_scan(make_assessment):
+    records = sample(make_assessment)
+    totals = aggregates.DashboardAggregates()
+    for a in records:
+        totals.apply(a)
+
+    expected = ScoreMatrix.from_assessments(records, configured_axis_ids()).stats(AssessmentFilters())
+    assert totals.stats() == expected
+
+
+def test_local_writes_are_folded_in(make_assessment, monkeypatch):
+    monkeypatch.setattr(settings, "aggregates_save_interval_seconds", 3600)
+    storage.persist_assessments([make_assessment(0)])
+    totals = aggregates.get_aggregates()
+    saved = json.loads(settings.aggregates_file.read_text())
+
+    storage.persist_assessments([make_assessment(1, tier=Tier.HIGH)])
+    assert aggregates.get_aggregates() is totals
+    assert totals.record_count == 2
+    assert totals.marker == storage.store_marker()
+    # Debounced: the file still holds the earlier totals until the next save
+    assert json.loads(settings.aggregates_file.read_text())["record_count"] == saved["record_count"] == 1
+
+    aggregates.save_aggregates()
+    assert json.loads(settings.aggregates_file.read_text())["record_count"] == 2
+
+
+def test_saves_once_the_interval_has_elapsed(make_assessment, monkeypatch):
+    monkeypatch.setattr(settings, "aggregates_save_interval_seconds", 0)
+    aggregates.get_aggregates()
+
+    storage.persist_assessments([make_assessment(0)])
+    assert json.loads(settings.aggregates_file.read_text())["record_count"] == 1
+
+
+def test_external_writes_trigger_one_rebuild(make_assessment):
+    storage.persist_assessments([make_assessment(0)])
+    aggregates.get_aggregates()
+
+    # Written by another process: the next local write must not be folded into stale totals
+    storage.get_log().append(make_assessment(1))
+    storage.persist_assessments([make_assessment(2)])
+    totals = aggregates.get_aggregates()
+
+    assert totals.record_count == 3
+    assert json.loads(settings.aggregates_file.read_text())["record_count"] == 3
+
+
+def test_saved_totals_are_reused_only_when_the_marker_matches(make_assessment, monkeypatch):
+    storage.persist_assessments(sample(make_assessment))
+    aggregates.get_aggregates()
+
+    monkeypatch.setattr(aggregates, "_aggregates", None)
+    calls = []
+    monkeypatch.setattr(aggregates, "rebuild_aggregates", lambda: calls.append(1))
+    assert aggregates.get_aggregates().record_count == 3
+    assert calls == []
+
+    storage.get_log().append(make_assessment(3))
+    monkeypatch.setattr(aggregates, "_aggregates", None)
+    aggregates.get_aggregates()
+    assert calls == [1]
+
+
+def test_sqlite_rewrites_are_not_mistaken_for_the_saved_totals(make_assessment, monkeypatch):
+    monkeypatch.setattr(settings, "storage_backend", "sqlite")
+    storage.persist_assessments([make_assessment(0), make_assessment(1)])
+    assert aggregates.get_aggregates().stats()["high_critical_count"] == 0
+
+    # Same row count and newest timestamp, so the rowids and timestamps repeat
+    storage.save_assessments(AssessmentsStore(assessments=[make_assessment(1, tier=Tier.HIGH), make_assessment(0)]))
+    assert aggregates.get_aggregates().stats()["high_critical_count"] == 1
@@ -0,0 +1,102 @@
+from app.models import AssessmentFilters, Tier
+from app.services import storage
+from app.services.assessment_cache import AssessmentCache
+
+
+class CountingLoader:
+    def __init__(self, items):
+        self.items = items
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.items)
+
+
+def test_loads_once_per_fingerprint(make_assessment):
+    cache = AssessmentCache()
+    loader = CountingLoader([make_assessment(0), make_assessment(1)])
+
+    assert [a.id for a in cache.all("fp1", loader)] == ["a0000001", "a0000000"]
+    assert cache.get("a0000000", "fp1", loader).id == "a0000000"
+    assert cache.get("missing", "fp1", loader) is None
+    assert loader.calls == 1
+
+    cache.all("fp2", loader)
+    assert loader.calls == 2
+
+
+def test_add_patches_in_place_when_fingerprint_matches(make_assessment):
+    cache = AssessmentCache()
+    loader = CountingLoader([make_assessment(0), make_assessment(2)])
+    cache.all("fp1", loader)
+    generation = cache.generation
+
+    assert cache.add([make_assessment(1)], "fp1", "fp2")
+    assert cache.generation == generation + 1
+    assert [a.id for a in cache.all("fp2", loader)] == ["a0000002", "a0000001", "a0000000"]
+    assert loader.calls == 1
+
+
+def test_add_invalidates_when_store_changed_behind_it(make_assessment):
+    cache = AssessmentCache()
+    loader = CountingLoader([make_assessment(0)])
+    cache.all("fp1", loader)
+
+    assert not cache.add([make_assessment(1)], "other", "fp3")
+    assert not cache.is_current("fp3")
+    cache.all("fp3", loader)
+    assert loader.calls == 2
+
+
+def test_page_uses_cursor_key_and_filters(make_assessment):
+    cache = AssessmentCache()
+    items = [make_assessment(i, tier=Tier.HIGH if i % 2 else Tier.LOW) for i in range(6)]
+    loader = CountingLoader(items)
+
+    first = cache.page("fp", loader, 2)
+    assert [a.id for a in first] == ["a0000005", "a0000004"]
+    last = first[-1]
+    second = cache.page("fp", loader, 2, before=(last.naive_timestamp(), last.id))
+    assert [a.id for a in second] == ["a0000003", "a0000002"]
+
+    high = cache.page("fp", loader, 10, filters=AssessmentFilters(tier="High"))
+    assert [a.id for a in high] == ["a0000005", "a0000003", "a0000001"]
+
+
+def test_storage_picks_up_writes_from_another_process(make_assessment):
+    storage.persist_assessments([make_assessment(0)])
+    assert len(storage.get_all_assessments()) == 1
+    assert storage.cache_is_warm()
+
+    # Another process appends straight to the log
+    storage.get_log().append(make_assessment(1))
+    assert not storage.cache_is_warm()
+    assert [a.id for a in storage.get_all_assessments()] == ["a0000001", "a0000000"]
+
+
+def test_local_writes_keep_the_cache_warm(make_assessment):
+    storage.persist_assessments([make_assessment(0)])
+    storage.get_all_assessments()
+    generation = storage.cache_generation()
+
+    storage.persist_assessments([make_assessment(1)])
+    assert storage.cache_is_warm()
+    assert storage.cache_generation() == generation + 1
+    assert storage.get_assessment("a0000001").id == "a0000001"
+
+
+def test_all_is_a_stable_newest_first_view(make_assessment):
+    cache = AssessmentCache()
+    loader = CountingLoader([make_assessment(0), make_assessment(2)])
+    view = cache.all("fp1", loader)
+
+    assert cache.all("fp1", loader)._ascending is view._ascending
+    assert (len(view), view[0].id, view[-1].id) == (2, "a0000002", "a0000000")
+    assert [a.id for a in view[:1]] == ["a0000002"]
+    assert [a.id for a in reversed(view)] == ["a0000000", "a0000002"]
+
+    # A write replaces the list, so views already handed out do not change
+    cache.add([make_assessment(1)], "fp1", "fp2")
+    assert [a.id for a in view] == ["a0000002", "a0000000"]
+    assert [a.id for a in cache.all("fp2", loader)] == ["a0000002", "a0000001", "a0000000"]
@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import pydantic
+import pytest
+from app.config import settings
+from app.services import risk_scorer
+from app.services.risk_scorer import get_axes_snapshot
+
+
+@pytest.fixture
+def axes_file(tmp_path, monkeypatch):
+    path = tmp_path / "axes.json"
+    shutil.copy(settings.axes_file, path)
+    monkeypatch.setattr(settings, "axes_file", path)
+    monkeypatch.setattr(risk_scorer, "_axes_snapshot", None)
+    return path
+
+
+def rewrite(path, text: str):
+    stat = path.stat()
+    path.write_text(text, encoding="utf-8")
+    # Make sure the stamp changes even on coarse mtime clocks
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_is_shared_and_immutable(axes_file):
+    snapshot = get_axes_snapshot()
+    assert get_axes_snapshot() is snapshot
+    assert [a.id for a in snapshot.axes][:2] == ["A1", "A2"]
+    with pytest.raises(pydantic.ValidationError):
+        snapshot.version = "changed"
+
+
+def test_prompt_parts_are_precomputed(axes_file):
+    snapshot = get_axes_snapshot()
+    prompt = snapshot.build_prompt("A title", "An abstract", None)
+
+    assert prompt.startswith(snapshot.prompt_prefix)
+    assert prompt.endswith(snapshot.prompt_suffix)
+    assert "A title" in prompt and "An abstract" in prompt
+    assert set(snapshot.json_schema["properties"]) >= {a.id for a in snapshot.axes}
+    assert sum(len(s.axes) for s in snapshot.sections) == len(snapshot.axes)
+
+
+def test_edits_are_picked_up_without_a_restart(axes_file):
+    before = get_axes_snapshot()
+    config = json.loads(axes_file.read_text())
+    config["axes"] = config["axes"][:3]
+    rewrite(axes_file, json.dumps(config))
+
+    after = get_axes_snapshot()
+    assert after.version != before.version
+    assert len(after.axes) == 3
+
+
+def test_a_broken_file_keeps_the_last_good_config(axes_file):
+    before = get_axes_snapshot()
+    rewrite(axes_file, '{"axes": [')
+
+    after = get_axes_snapshot()
+    assert after.version == before.version
+    assert after.axes == before.axes
+    assert get_axes_snapshot() is after
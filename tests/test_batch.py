@@ -0,0 +1,66 @@
+import asyncio
+from app.config import settings
+from app.routes import assess
+from app.services import storage
+
+
+def paper(i, abstract="We study dual-use risks of a new method."):
+    return {
+        "title": f"Paper {i}",
+        "abstract": abstract,
+        "dissemination": "Preprint / arXiv only",
+        "audience": "Domain experts only",
+    }
+
+
+def test_batch_assesses_and_stores_every_item(client):
+    response = client.post("/api/assess/batch", json={"items": [paper(i) for i in range(3)]})
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (3, 0)
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+    stored = {a.id for a in storage.get_all_assessments()}
+    assert stored == {r["assessment"]["id"] for r in body["results"]}
+
+
+def test_failures_are_reported_per_item(client, monkeypatch, make_assessment):
+    async def build(request):
+        if request.title == "Paper 1":
+            raise RuntimeError("provider exploded")
+        return make_assessment(int(request.title.split()[1]))
+
+    monkeypatch.setattr(assess, "build_assessment", build)
+    items = [paper(0), paper(1), paper(2, abstract="  ")]
+    body = client.post("/api/assess/batch", json={"items": items}).json()
+
+    assert (body["succeeded"], body["failed"]) == (1, 2)
+    assert body["results"][1]["error"] == "provider exploded"
+    assert body["results"][2]["error"] == "Abstract is required"
+    assert [a.id for a in storage.get_all_assessments()] == ["a0000000"]
+
+
+def test_concurrency_is_capped(client, monkeypatch, make_assessment):
+    monkeypatch.setattr(settings, "batch_concurrency", 3)
+    running = peak = 0
+
+    async def build(request):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return make_assessment(int(request.title.split()[1]))
+
+    monkeypatch.setattr(assess, "build_assessment", build)
+    client.post("/api/assess/batch", json={"items": [paper(i) for i in range(10)], "concurrency": 50})
+    assert peak == 3
+
+    peak = 0
+    client.post("/api/assess/batch", json={"items": [paper(i) for i in range(10, 20)], "concurrency": 2})
+    assert peak == 2
+
+
+def test_oversized_batches_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_items", 2)
+
+    assert client.post("/api/assess/batch", json={"items": [paper(i) for i in range(3)]}).status_code == 400
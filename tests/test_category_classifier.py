@@ -0,0 +1,129 @@
+import os
+from collections import Counter
+import pytest
+from app.config import settings
+from app.services import category_classifier, risk_scorer, storage
+from app.services.category_classifier import CategoryModel, features, normalize_category, predict_category
+from scripts import train_category_classifier as train
+
+CONFIDENT = {
+    "cybersecurity": ("Fuzzing network services", "We find exploitable vulnerabilities with fuzzing and release exploits "
+                      "for each malware-style attack."),
+    "nuclear": ("Reactor fuel cycle analysis", "Uranium enrichment, neutron flux and fission isotopes in a reactor."),
+    "biomedical": ("CRISPR screens", "Gene editing of pathogen genome targets in bacterial cells with CRISPR."),
+}
+VAGUE = ("A study of systems", "We describe an approach and report results on several tasks.")
+
+
+def test_normalize_category_accepts_ids_and_aliases():
+    assert normalize_category("nuclear") == "nuclear"
+    assert normalize_category(" Machine_Learning ") == "ai_ml"
+    assert normalize_category("life_sciences") == "biomedical"
+    assert normalize_category("astronomy") is None
+    assert normalize_category(None) is None
+
+
+def test_keyword_model_is_confident_only_when_keywords_agree():
+    model = CategoryModel.seed()
+    for category, (title, abstract) in CONFIDENT.items():
+        predicted, confidence = model.predict(title, abstract)
+        assert predicted == category
+        assert confidence >= settings.category_min_confidence
+
+    assert model.predict(*VAGUE)[1] < settings.category_min_confidence
+
+
+@pytest.fixture
+def detect_calls(monkeypatch):
+    calls = []
+
+    async def detect(title, abstract):
+        calls.append(title)
+        return "chemistry"
+
+    monkeypatch.setattr(risk_scorer, "detect_category", detect)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_resolve_category_prefers_the_response_then_the_classifier(detect_calls):
+    title, abstract = CONFIDENT["nuclear"]
+
+    assert await risk_scorer.resolve_category(title, abstract, detected="radiological") == "nuclear"
+    assert await risk_scorer.resolve_category(title, abstract, detected="astronomy") == "nuclear"
+    assert detect_calls == []
+
+    assert await risk_scorer.resolve_category(*VAGUE) == "chemistry"
+    assert detect_calls == [VAGUE[0]]
+
+
+@pytest.mark.asyncio
+async def test_resolve_category_asks_the_llm_when_the_classifier_is_off(monkeypatch, detect_calls):
+    monkeypatch.setattr(settings, "category_classifier", False)
+
+    assert await risk_scorer.resolve_category(*CONFIDENT["nuclear"]) == "chemistry"
+    assert detect_calls == [CONFIDENT["nuclear"][0]]
+
+
+def trained_model(epochs=200) -> CategoryModel:
+    examples = [
+        (features(title, f"{abstract} Variant {i}."), category)
+        for category, (title, abstract) in CONFIDENT.items()
+        for i in range(4)
+    ]
+    return train.fit(examples, min_df=1, max_features=1000, epochs=epochs, l2=1e-4)
+
+
+def test_fit_separates_categories():
+    model = trained_model()
+    examples = [(features(title, abstract), category) for category, (title, abstract) in CONFIDENT.items()]
+
+    result = train.evaluate(model, examples, 0.5)
+    assert result["accuracy"] == 1.0
+    assert result["coverage"] == 1.0
+    assert model.trained_on == 12
+
+
+def test_load_examples_skips_uncategorized_and_reused_assessments(make_assessment):
+    storage.persist_assessments([
+        make_assessment(0),
+        make_assessment(1, category=None),
+        make_assessment(2, duplicate_of="a0000000"),
+    ])
+
+    examples = train.load_examples(None)
+    assert [label for _, label in examples] == ["ai_ml"]
+    assert isinstance(examples[0][0], Counter)
+
+
+def test_saved_models_round_trip_and_reload_on_change():
+    model = trained_model()
+    model.save(settings.category_model_file)
+    loaded = CategoryModel.load(settings.category_model_file)
+    title, abstract = CONFIDENT["cybersecurity"]
+
+    assert loaded.predict(title, abstract)[0] == "cybersecurity"
+    assert loaded.predict(title, abstract)[1] == pytest.approx(model.predict(title, abstract)[1], abs=1e-3)
+    current = category_classifier.get_model()
+    assert current.trained_on == 12
+
+    trained_model(epochs=5).save(settings.category_model_file)
+    stat = os.stat(settings.category_model_file)
+    os.utime(settings.category_model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = category_classifier.get_model()
+    assert reloaded is not current
+    assert predict_category(title, abstract)[1] < model.predict(title, abstract)[1]
+
+
+def test_unreadable_model_file_keeps_the_last_good_model():
+    assert category_classifier.get_model().trained_on == 0  # keyword model before any training
+
+    trained_model().save(settings.category_model_file)
+    good = category_classifier.get_model()
+    assert good.trained_on == 12
+
+    settings.category_model_file.write_text('{"classes": ')
+    assert category_classifier.get_model() is good
+
+    settings.category_model_file.unlink()
+    assert category_classifier.get_model().trained_on == 0
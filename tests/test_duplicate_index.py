@@ -0,0 +1,123 @@
+import pytest
+from app.config import settings
+from app.models import AssessRequest, Audience, Dissemination
+from app.services import duplicate_index, llm_cache, mock_llm, storage
+from app.services.duplicate_index import DuplicateIndex, minhash, normalize_paper_text
+from app.services.governance import compute_tier
+from app.services.pipeline import build_assessment
+from app.services.risk_scorer import get_axes_snapshot
+
+ABSTRACT = (
+    "We present a method for automatically discovering exploitable memory corruption vulnerabilities in "
+    "widely deployed network services. Our system combines coverage guided fuzzing with a language model "
+    "that proposes inputs, and it found forty previously unknown bugs across twelve open source projects. "
+    "We discuss responsible disclosure and release a benchmark of the discovered crashes."
+)
+TITLE = "Language model guided fuzzing of network services"
+
+
+def similarity(a: str, b: str) -> float:
+    return float((minhash(TITLE, a) == minhash(TITLE, b)).mean())
+
+
+def test_normalization_ignores_case_punctuation_and_hyphenation():
+    assert normalize_paper_text("A Title", "Memory cor-\nruption, FOUND!") == [
+        "a", "title", "memory", "corruption", "found"
+    ]
+    assert similarity(ABSTRACT, ABSTRACT.upper().replace(",", "")) == 1.0
+    assert minhash("", "  ") is None
+
+
+def test_similarity_tracks_the_share_of_shared_text():
+    words = ABSTRACT.split()
+    light_edit = " ".join(words[:-3] + ["we", "release", "code."])
+    rewrite = " ".join(words[: len(words) // 2]) + " an entirely different second half about protein folding"
+
+    assert similarity(ABSTRACT, light_edit) >= 0.8
+    assert similarity(ABSTRACT, rewrite) < 0.8
+
+
+def test_index_matches_above_threshold_and_same_axes_version(make_assessment):
+    index = DuplicateIndex.from_assessments([
+        make_assessment(0, title=TITLE, abstract=ABSTRACT, axes_version="v1"),
+        make_assessment(1, title="Unrelated", abstract="Protein folding with diffusion models.", axes_version="v1"),
+    ])
+
+    assert index.find(TITLE, ABSTRACT, "v1", 0.8) == ("a0000000", 1.0)
+    assert index.find(TITLE, ABSTRACT, "v2", 0.8) is None
+    assert index.find("Something else", "Reactor neutronics benchmark.", "v1", 0.8) is None
+
+
+def test_exact_resubmissions_match_the_latest_assessment(make_assessment):
+    index = DuplicateIndex.from_assessments([
+        make_assessment(i, title=TITLE, abstract=ABSTRACT, axes_version="v1") for i in range(3)
+    ])
+    assert index.find(TITLE, ABSTRACT, "v1", 0.8)[0] == "a0000002"
+
+
+def test_index_follows_local_and_external_writes(make_assessment):
+    version = get_axes_snapshot().version
+    storage.persist_assessments([make_assessment(0, title="Other", abstract="Other text here.", axes_version=version)])
+    index = duplicate_index.get_duplicate_index()
+
+    storage.persist_assessments([make_assessment(1, title=TITLE, abstract=ABSTRACT, axes_version=version)])
+    assert duplicate_index.get_duplicate_index() is index
+    assert len(index) == 2
+
+    storage.get_log().append(make_assessment(2, title="Third", abstract="Third paper text.", axes_version=version))
+    rebuilt = duplicate_index.get_duplicate_index()
+    assert rebuilt is not index and len(rebuilt) == 3
+
+
+def request(abstract=ABSTRACT, dissemination=Dissemination.PREPRINT):
+    return AssessRequest(title=TITLE, abstract=abstract, dissemination=dissemination, audience=Audience.EXPERTS)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+    original = mock_llm.complete
+
+    async def counted(prompt, schema=None):
+        calls.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", counted)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_near_duplicates_reuse_scores_with_their_own_tier(monkeypatch, llm_calls):
+    monkeypatch.setattr(settings, "duplicate_detection", True)
+    original = await build_assessment(request())
+    storage.persist_assessments([original])
+    llm_calls.clear()
+
+    reused = await build_assessment(request(
+        abstract=ABSTRACT.replace("forty", "40"), dissemination=Dissemination.OPEN_SOURCE
+    ))
+
+    assert llm_calls == []
+    assert reused.duplicate_of == original.id and reused.id != original.id
+    assert reused.duplicate_similarity >= settings.duplicate_threshold
+    assert reused.scores == original.scores
+    assert reused.tier == compute_tier(original.scores, Dissemination.OPEN_SOURCE, Audience.EXPERTS)
+    assert (reused.prompt_tokens, reused.completion_tokens) == (0, 0)
+
+    # Chains point at the assessment that was actually scored
+    storage.persist_assessments([reused])
+    again = await build_assessment(request())
+    assert again.duplicate_of == original.id
+
+
+@pytest.mark.asyncio
+async def test_reuse_is_off_by_default_and_skipped_for_no_cache(monkeypatch, llm_calls):
+    storage.persist_assessments([await build_assessment(request())])
+    llm_calls.clear()
+
+    assert (await build_assessment(request())).duplicate_of is None
+    assert llm_calls
+
+    monkeypatch.setattr(settings, "duplicate_detection", True)
+    with llm_cache.bypass():
+        assert (await build_assessment(request())).duplicate_of is None
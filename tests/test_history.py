@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from app.services import storage
+from app.models import Assessment
+
+
+def seed(make_assessment, count=5, same_timestamp=False):
+    ts = datetime(2024, 4, 1, 8)
+    records = [
+        make_assessment(i, timestamp=ts if same_timestamp else ts + timedelta(hours=i)) for i in range(count)
+    ]
+    storage.persist_assessments(records)
+    return records
+
+
+def walk_pages(client, limit, **params):
+    ids, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/history", params=query).json()
+        ids.extend(a["id"] for a in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_cover_every_record_once(client, make_assessment):
+    seed(make_assessment)
+
+    assert walk_pages(client, 2) == [f"a{i:07d}" for i in reversed(range(5))]
+    first = client.get("/api/history", params={"limit": 5}).json()
+    assert first["next_cursor"] is None
+
+
+def test_cursor_breaks_timestamp_ties_by_id(client, make_assessment):
+    seed(make_assessment, same_timestamp=True)
+
+    assert walk_pages(client, 2) == [f"a{i:07d}" for i in reversed(range(5))]
+
+
+def test_pages_do_not_shift_when_new_records_arrive(client, make_assessment):
+    seed(make_assessment)
+    first = client.get("/api/history", params={"limit": 2}).json()
+    storage.persist_assessments([make_assessment(9, timestamp=datetime(2024, 5, 1))])
+
+    second = client.get("/api/history", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [a["id"] for a in second["items"]] == ["a0000002", "a0000001"]
+
+
+def test_cold_cache_pages_match_warm_ones(client, make_assessment):
+    storage.get_log().append_many([make_assessment(i, timestamp=datetime(2024, 4, 1, i)) for i in range(5)])
+
+    assert not storage.cache_is_warm()
+    assert walk_pages(client, 2) == [f"a{i:07d}" for i in reversed(range(5))]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/history", params={"cursor": "not a cursor"}).status_code == 400
+
+
+def test_date_filter_is_inclusive_of_date_to(client, make_assessment):
+    storage.persist_assessments([
+        make_assessment(0, timestamp=datetime(2024, 4, 1, 23)),
+        make_assessment(1, timestamp=datetime(2024, 4, 2, 9)),
+        make_assessment(2, timestamp=datetime(2024, 4, 3, 0)),
+    ])
+
+    page = client.get("/api/history", params={"date_from": "2024-04-01", "date_to": "2024-04-02"}).json()
+    assert [a["id"] for a in page["items"]] == ["a0000001", "a0000000"]
+
+
+def test_ndjson_streams_newest_first(client, make_assessment):
+    seed(make_assessment)
+
+    response = client.get("/api/history", params={"format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [f"a{i:07d}" for i in reversed(range(5))]
+    assert Assessment.model_validate_json(lines[0]).input.title == "Paper 4"
+
+
+def test_get_by_id(client, make_assessment):
+    seed(make_assessment, count=1)
+
+    assert client.get("/api/history/a0000000").json()["id"] == "a0000000"
+    assert client.get("/api/history/missing").status_code == 404
+
+
+def test_offsets_in_cursors_and_dates_are_read_as_utc(client, make_assessment):
+    seed(make_assessment)
+    raw = "2024-04-01T12:00:00+02:00|a0000009".encode("utf-8")
+    cursor = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    page = client.get("/api/history", params={"cursor": cursor})
+    assert page.status_code == 200
+    assert [a["id"] for a in page.json()["items"]] == ["a0000002", "a0000001", "a0000000"]
+
+    page = client.get("/api/history", params={"date_from": "2024-04-01T13:00:00+02:00"})
+    assert [a["id"] for a in page.json()["items"]] == ["a0000004", "a0000003"]
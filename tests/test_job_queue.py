@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.models import AssessJob, AssessRequest, Audience, Dissemination, JobStatus
+from app.routes import assess
+from app.services import job_queue, mock_llm, storage
+from app.services.job_queue import JobQueue, JobQueueFullError, JobQueueNotRunningError, JobStore
+from app.services.rate_limiter import LLMUnavailableError
+
+PAPER = {
+    "title": "Automated exploit generation with language models",
+    "abstract": "We fine-tune a language model to write working exploits for known vulnerabilities.",
+    "dissemination": "Preprint / arXiv only",
+    "audience": "Domain experts only",
+}
+
+
+def paper(title=PAPER["title"]) -> AssessRequest:
+    return AssessRequest(
+        title=title, abstract=PAPER["abstract"], dissemination=Dissemination.PREPRINT, audience=Audience.EXPERTS
+    )
+
+
+async def wait_finished(queue: JobQueue, job_id: str) -> AssessJob:
+    for _ in range(500):
+        job = await queue.get(job_id)
+        if job.status in (JobStatus.DONE, JobStatus.FAILED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_submitted_jobs_run_and_store_under_the_job_id():
+    queue = JobQueue()
+    await queue.start(2)
+    try:
+        submitted = await queue.submit(paper())
+        assert submitted.status == JobStatus.QUEUED
+        job = await wait_finished(queue, submitted.id)
+    finally:
+        await queue.stop()
+
+    assert job.status == JobStatus.DONE and job.attempts == 1
+    assert job.assessment.id == job.id
+    assert storage.get_assessment(job.id).input.title == PAPER["title"]
+
+
+@pytest.mark.asyncio
+async def test_guards_before_start_after_stop_and_when_full(monkeypatch):
+    queue = JobQueue()
+    with pytest.raises(JobQueueNotRunningError):
+        await queue.submit(paper())
+
+    monkeypatch.setattr(settings, "job_queue_max", 0)
+    await queue.start(1)
+    try:
+        with pytest.raises(JobQueueFullError):
+            await queue.submit(paper())
+    finally:
+        await queue.stop()
+
+    with pytest.raises(JobQueueNotRunningError):
+        await queue.get("anything")
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_resume_after_a_restart(monkeypatch, make_assessment):
+    store = JobStore(settings.jobs_file)
+    queued = AssessJob(request=paper("Queued"))
+    interrupted = AssessJob(request=paper("Interrupted"), status=JobStatus.RUNNING, attempts=1)
+    saved = AssessJob(request=paper("Saved before the crash"), status=JobStatus.RUNNING, attempts=1)
+    for job in (queued, interrupted, saved):
+        store.save(job)
+    store.close()
+    storage.persist_assessments([make_assessment(0).model_copy(update={"id": saved.id})])
+
+    calls = []
+    original = mock_llm.complete
+
+    async def counted(prompt, schema=None):
+        calls.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", counted)
+
+    queue = JobQueue()
+    await queue.start(1)
+    try:
+        jobs = {job.id: await wait_finished(queue, job.id) for job in (queued, interrupted, saved)}
+    finally:
+        await queue.stop()
+
+    assert all(job.status == JobStatus.DONE for job in jobs.values())
+    assert jobs[interrupted.id].attempts == 2
+    assert storage.get_assessment(interrupted.id).input.title == "Interrupted"
+    # Not re-run: its assessment was already stored under the job id
+    assert jobs[saved.id].attempts == 1
+    assert jobs[saved.id].assessment.id == saved.id
+    assert any("Interrupted" in prompt for prompt in calls)
+    assert not any("Saved before the crash" in prompt for prompt in calls)
+
+
+def test_prune_drops_only_old_finished_jobs():
+    store = JobStore(settings.jobs_file)
+    now = datetime.utcnow()
+    old = AssessJob(request=paper(), status=JobStatus.DONE, finished_at=now - timedelta(days=30))
+    recent = AssessJob(request=paper(), status=JobStatus.FAILED, finished_at=now)
+    waiting = AssessJob(request=paper(), created_at=now - timedelta(days=30))
+    for job in (old, recent, waiting):
+        store.save(job)
+
+    assert store.prune(now - timedelta(days=7)) == 1
+    assert store.get(old.id) is None
+    assert store.get(recent.id) is not None
+    assert [job.id for job in store.unfinished()] == [waiting.id]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_recorded_on_the_job(monkeypatch):
+    async def unavailable(request):
+        raise LLMUnavailableError("mock", RuntimeError("429"), retry_after=12.0)
+
+    async def broken(request):
+        raise ValueError
+
+    queue = JobQueue()
+    await queue.start(1)
+    try:
+        monkeypatch.setattr(job_queue, "build_assessment", unavailable)
+        limited = await wait_finished(queue, (await queue.submit(paper())).id)
+        monkeypatch.setattr(job_queue, "build_assessment", broken)
+        failed = await wait_finished(queue, (await queue.submit(paper())).id)
+    finally:
+        await queue.stop()
+
+    assert limited.status == JobStatus.FAILED
+    assert limited.retry_after == 12.0 and "unavailable" in limited.error
+    assert failed.status == JobStatus.FAILED
+    assert (failed.error, failed.retry_after) == ("ValueError", None)
+    assert storage.get_assessment(failed.id) is None
+
+
+def test_routes_report_a_stopped_queue_and_empty_abstracts(client):
+    assert client.post("/api/assess/jobs", json={**PAPER, "abstract": "  "}).status_code == 400
+    assert client.post("/api/assess/jobs", json=PAPER).status_code == 503
+    assert client.get("/api/assess/jobs/missing").status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_unknown_jobs_are_not_found():
+    await job_queue.start_workers()
+    try:
+        with pytest.raises(HTTPException) as e:
+            await assess.get_assessment_job("missing")
+    finally:
+        await job_queue.stop_workers()
+
+    assert e.value.status_code == 404
@@ -0,0 +1,96 @@
+import os
+import time
+import pytest
+from app.config import settings
+from app.services import llm_cache, mock_llm
+from app.services.llm_cache import LLMResponseCache, bypass, cache_key
+from app.services.risk_scorer import complete
+
+
+def new_cache(tmp_path, entries=2, max_bytes=1_000_000, ttl=3600):
+    return LLMResponseCache(tmp_path / "cache", entries, max_bytes, ttl)
+
+
+def test_keys_cover_every_input():
+    key = cache_key("openai", "gpt", "prompt", {"max_tokens": 10})
+    assert key == cache_key("openai", "gpt", "prompt", {"max_tokens": 10})
+    assert key != cache_key("groq", "gpt", "prompt", {"max_tokens": 10})
+    assert key != cache_key("openai", "gpt", "prompt", {"max_tokens": 11})
+
+
+def test_memory_tier_is_a_bounded_lru(tmp_path):
+    cache = new_cache(tmp_path)
+    for key in ("a", "b", "c"):
+        cache.put(key, f"text {key}")
+
+    assert cache.get("c") == "text c"
+    assert cache.stats()["memory_entries"] == 2
+    # "a" fell out of memory but is still on disk
+    assert cache.get("a") == "text a"
+    assert cache.counters["memory_hits"] == 1
+    assert cache.counters["disk_hits"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    new_cache(tmp_path).put("k", "stored")
+
+    cache = new_cache(tmp_path)
+    assert cache.get("k") == "stored"
+    assert cache.get("other") is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    cache = new_cache(tmp_path, ttl=60)
+    cache.put("k", "old")
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("k") is None
+    assert not any((tmp_path / "cache").glob("*/*.json"))
+
+
+def test_size_limit_evicts_least_recently_used_files(tmp_path):
+    cache = new_cache(tmp_path, max_bytes=400)
+    for i, key in enumerate(("aa", "bb", "cc")):
+        cache.put(key, "x" * 60)
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.put("dd", "x" * 60)
+
+    remaining = sorted(p.stem for p in (tmp_path / "cache").glob("*/*.json"))
+    assert "aa" not in remaining and "dd" in remaining
+    assert cache.counters["evictions"] >= 1
+
+
+def test_bypass_skips_lookups_only(tmp_path):
+    cache = new_cache(tmp_path)
+    cache.put("k", "cached")
+    with bypass():
+        assert llm_cache.bypassed()
+        assert cache.get("k") is None
+        cache.put("k", "fresh")
+    assert not llm_cache.bypassed()
+    assert cache.get("k") == "fresh"
+    assert cache.counters["bypassed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompts_are_answered_from_the_cache(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    calls = []
+    original = mock_llm.complete
+
+    async def counted(prompt, schema=None):
+        calls.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", counted)
+
+    first = await complete("Detect the category of this paper")
+    second = await complete("Detect the category of this paper")
+    assert (first.cached, second.cached) == (False, True)
+    assert second.text == first.text
+    with bypass():
+        assert not (await complete("Detect the category of this paper")).cached
+    assert len(calls) == 2
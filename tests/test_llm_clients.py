@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+import pytest
+from app.config import settings
+from app.services import llm_clients, mock_llm
+from app.services.risk_scorer import call_openai
+
+
+def test_clients_are_built_once_and_shared(monkeypatch):
+    built = []
+    monkeypatch.setattr(llm_clients, "build_client", lambda provider: built.append(provider) or object())
+
+    first = llm_clients.get_client("openai")
+    assert llm_clients.get_client("openai") is first
+    assert built == ["openai"]
+
+
+def test_sdk_clients_pool_connections_without_retries(monkeypatch):
+    monkeypatch.setattr(settings, "groq_api_key", "test-key")
+    monkeypatch.setattr(settings, "llm_max_connections", 7)
+
+    client = llm_clients.build_client("groq")
+    assert client.max_retries == 0
+    assert str(client.base_url).startswith("https://api.groq.com/openai/v1")
+    assert llm_clients._http_options()["limits"].max_connections == 7
+    assert llm_clients.build_client("mock") is mock_llm
+    with pytest.raises(ValueError):
+        llm_clients.build_client("nope")
+
+
+@pytest.mark.asyncio
+async def test_start_builds_configured_providers_with_keys_and_close_releases_them(monkeypatch):
+    monkeypatch.setattr(settings, "llm_providers", ["openai", "mock"])
+    monkeypatch.setattr(settings, "openai_api_key", "")
+    llm_clients.start_clients()
+    assert list(llm_clients._clients) == ["mock"]
+
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    llm_clients.start_clients()
+    openai_client = llm_clients._clients["openai"]
+    await llm_clients.close_clients()
+    assert llm_clients._clients == {}
+    assert openai_client.is_closed()
+
+
+@pytest.mark.asyncio
+async def test_provider_calls_go_through_the_shared_client(monkeypatch):
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        message = SimpleNamespace(content='{"ok": true}')
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=4)
+        )
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setitem(llm_clients._clients, "openai", fake)
+
+    assert await call_openai("Score this paper") == '{"ok": true}'
+    assert requests[0]["messages"] == [{"role": "user", "content": "Score this paper"}]
+    assert requests[0]["model"] == settings.get_model("openai")
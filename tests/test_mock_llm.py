@@ -0,0 +1,78 @@
+import json
+from types import SimpleNamespace
+import pytest
+from app.config import settings
+from app.services import llm_clients, mock_llm
+from app.services.risk_scorer import call_provider_recorded, get_axes_snapshot
+
+
+def scoring_prompt():
+    return get_axes_snapshot().build_prompt("Gene drive design", "We design a gene drive.", None)
+
+
+@pytest.mark.asyncio
+async def test_responses_are_deterministic_and_follow_the_prompt_format():
+    prompt = scoring_prompt()
+    first = await mock_llm.complete(prompt)
+    assert first == await mock_llm.complete(prompt)
+
+    scores = json.loads(first.removeprefix("```json\n").removesuffix("\n```"))
+    assert scores["category"] in mock_llm.CATEGORIES
+    assert set(scores) - {"category"} == {a.id for a in get_axes_snapshot().axes}
+    assert all(0 <= v["score"] <= 3 for k, v in scores.items() if k != "category")
+
+    structured = await mock_llm.complete(prompt, schema={"type": "object"})
+    assert json.loads(structured) == scores
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_join_to_the_completion():
+    prompt = scoring_prompt()
+    chunks = [c async for c in mock_llm.stream(prompt)]
+    assert len(chunks) > 1
+    assert "".join(chunks) == await mock_llm.complete(prompt)
+
+
+def test_latency_distributions(monkeypatch):
+    monkeypatch.setattr(settings, "mock_latency_ms", 100)
+    monkeypatch.setattr(settings, "mock_latency_distribution", "fixed")
+    assert mock_llm.latency() == 0.1
+    monkeypatch.setattr(settings, "mock_latency_distribution", "uniform")
+    monkeypatch.setattr(settings, "mock_latency_spread", 0.5)
+    assert all(0.05 <= mock_llm.latency() <= 0.15 for _ in range(50))
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_and_malformed_responses(monkeypatch):
+    monkeypatch.setattr(settings, "mock_error_rate", 1.0)
+    with pytest.raises(mock_llm.MockLLMError) as raised:
+        await mock_llm.complete(scoring_prompt())
+    assert raised.value.status_code == 503
+
+    monkeypatch.setattr(settings, "mock_error_rate", 0.0)
+    clean = await mock_llm.complete(scoring_prompt())
+    monkeypatch.setattr(settings, "mock_malformed_rate", 1.0)
+    assert all([await mock_llm.complete(scoring_prompt()) != clean for _ in range(10)])
+
+
+@pytest.mark.asyncio
+async def test_real_responses_are_recorded_and_replayed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "mock_cassette_dir", tmp_path / "cassettes")
+    monkeypatch.setattr(settings, "mock_record", True)
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+
+    async def create(**kwargs):
+        message = SimpleNamespace(content="recorded answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setitem(llm_clients._clients, "openai", fake)
+
+    assert await call_provider_recorded("openai", "Category ID: ?") == "recorded answer"
+    recording = mock_llm.load_recording("Category ID: ?")
+    assert (recording["provider"], recording["text"]) == ("openai", "recorded answer")
+
+    monkeypatch.setattr(settings, "mock_record", False)
+    assert await mock_llm.complete("Category ID: ?") == "recorded answer"
+    # Unknown prompts fall back to synthesized responses
+    assert await mock_llm.complete("Category ID: other") in mock_llm.CATEGORIES
@@ -0,0 +1,121 @@
+import json
+import pytest
+from app.config import settings
+from app.models import RiskAxis
+from app.services import mock_llm
+from app.services.risk_scorer import (
+    get_axes_snapshot, openai_structured_options, parse_axis_scores, scores_from_response, scores_schema,
+    score_research
+)
+
+AXES = [
+    RiskAxis(id="A1", name="Capability", question="?"),
+    RiskAxis(id="B1", name="Access", question="?"),
+    RiskAxis(id="C1", name="Safeguards", question="?", reverse_scored=True),
+]
+
+VALID = {
+    "category": "biomedical",
+    "A1": {"score": 2, "rationale": "Raises capability"},
+    "B1": {"score": 1, "rationale": "Limited access"},
+    "C1": {"score": 3, "rationale": "Strong safeguards"},
+}
+
+
+def test_fenced_json_with_surrounding_prose():
+    text = "Here is the assessment:\n```json\n" + json.dumps(VALID, indent=2) + "\n```\nLet me know."
+    found, category = parse_axis_scores(text, AXES)
+
+    assert category == "biomedical"
+    assert {k: v.score for k, v in found.items()} == {"A1": 2, "B1": 1, "C1": 3}
+    assert found["C1"].reverse_scored and not found["A1"].reverse_scored
+
+
+def test_raw_newlines_inside_strings_are_accepted():
+    text = '{"A1": {"score": 1, "rationale": "line one\nline two"}}'
+    found, _ = parse_axis_scores(text, AXES)
+    assert found["A1"].rationale == "line one\nline two"
+
+
+@pytest.mark.parametrize("broken_entry", [
+    '"B1": {"score": 7, "rationale": "out of range"}',
+    '"B1": {"score": "high", "rationale": "not a number"}',
+    '"B1": "just a string"',
+    '"B1": {"rationale": "no score"}',
+])
+def test_invalid_axes_are_left_out(broken_entry):
+    text = '{"A1": {"score": 2, "rationale": "ok"}, ' + broken_entry + ', "C1": {"score": 0, "rationale": "ok"}}'
+    found, _ = parse_axis_scores(text, AXES)
+    assert set(found) == {"A1", "C1"}
+
+
+def test_truncated_response_keeps_complete_axes():
+    text = json.dumps(VALID)
+    found, category = parse_axis_scores(text[:text.index('"C1"') + 12], AXES)
+
+    assert category == "biomedical"
+    assert set(found) == {"A1", "B1"}
+
+
+def test_response_broken_inside_one_axis_keeps_the_others():
+    text = ('{"category": "nuclear", "A1": {"score": 2, "rationale": "ok"}, '
+            '"B1": {"score": 1 "rationale": "missing comma"}, "C1": {"score": 1, "rationale": "ok"}}')
+    found, category = parse_axis_scores(text, AXES)
+
+    assert category == "nuclear"
+    assert set(found) == {"A1", "C1"}
+
+
+@pytest.mark.parametrize("text", ["", "I cannot help with that.", "[]", "{", '{"category": 5}'])
+def test_unusable_responses_yield_nothing(text):
+    found, category = parse_axis_scores(text, AXES)
+    assert found == {} and category is None
+
+
+@pytest.mark.asyncio
+async def test_only_unusable_axes_are_re_asked(monkeypatch):
+    prompts = []
+    original = mock_llm.complete
+
+    async def recorded(prompt, schema=None):
+        prompts.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", recorded)
+    text = '{"category": "ai_ml", "A1": {"score": 2, "rationale": "ok"}, "B1": {"score": 9, "rationale": "bad"}}'
+    scores, category, repair = await scores_from_response(text, AXES, "Title", "Abstract", None)
+
+    assert len(prompts) == 1
+    assert '"B1": {"score": <0-3>' in prompts[0] and '"C1": {"score": <0-3>' in prompts[0]
+    assert '"A1": {"score": <0-3>' not in prompts[0]
+    assert scores.scores["A1"].rationale == "ok"
+    assert not scores.scores["B1"].rationale.startswith("No valid score")
+    assert repair.provider == "mock"
+
+
+def test_schema_and_structured_options():
+    schema = scores_schema(AXES)
+    assert schema["required"] == ["category", "A1", "B1", "C1"]
+    assert schema["properties"]["A1"]["properties"]["score"]["enum"] == [0, 1, 2, 3]
+    assert "category" not in scores_schema(AXES, with_category=False)["properties"]
+
+    assert openai_structured_options("openai", schema)["response_format"]["json_schema"]["strict"]
+    assert openai_structured_options("groq", schema) == {"response_format": {"type": "json_object"}}
+    assert openai_structured_options("openai", None) == {}
+
+
+@pytest.mark.asyncio
+async def test_structured_output_is_requested_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "llm_structured_output", True)
+    schemas = []
+    original = mock_llm.complete
+
+    async def recorded(prompt, schema=None):
+        schemas.append(schema)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", recorded)
+    result = await score_research("Paper", "Abstract.")
+
+    assert schemas[0] == get_axes_snapshot().json_schema
+    assert len(result.scores.scores) == len(get_axes_snapshot().axes)
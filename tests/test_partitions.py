@@ -0,0 +1,75 @@
+from datetime import datetime
+from app.models import AssessmentFilters
+from app.services import storage
+from app.services.segment_log import SegmentLog, is_archive, segment_partition
+
+MONTHS = [datetime(2024, m, 10) for m in (1, 2, 3)]
+
+
+def monthly_log(directory, make_assessment, granularity="month"):
+    log = SegmentLog(directory, 1024 * 1024, granularity)
+    log.append_many([make_assessment(i, timestamp=ts) for i, ts in enumerate(MONTHS)])
+    return log
+
+
+def test_records_are_partitioned_by_month(tmp_path, make_assessment):
+    log = monthly_log(tmp_path / "log", make_assessment)
+
+    assert [segment_partition(s) for s in log.segments()] == ["2024-01", "2024-02", "2024-03"]
+    assert log.partition_of(datetime(2024, 2, 29)) == "2024-02"
+    assert SegmentLog(tmp_path / "d", 1024, "day").partition_of(MONTHS[0]) == "2024-01-10"
+
+
+def test_date_range_reads_only_overlapping_segments(tmp_path, make_assessment, monkeypatch):
+    log = monthly_log(tmp_path / "log", make_assessment)
+    opened = []
+    read = log._read
+
+    def spy(segment):
+        opened.append(segment_partition(segment))
+        return read(segment)
+
+    monkeypatch.setattr(log, "_read", spy)
+
+    records = list(log.iter_newest_first(datetime(2024, 2, 1), datetime(2024, 3, 1)))
+    assert [a.id for a in records] == ["a0000001"]
+    assert opened == ["2024-02"]
+
+    assert [segment_partition(s) for s in log.segments_in_range(date_from=datetime(2024, 2, 15))] == ["2024-03"]
+
+
+def test_range_boundaries_are_inclusive_then_exclusive(tmp_path, make_assessment):
+    log = monthly_log(tmp_path / "log", make_assessment)
+
+    assert [a.id for a in log.iter_newest_first(MONTHS[1], MONTHS[2])] == ["a0000001"]
+    raw = list(log.iter_raw_newest_first(MONTHS[1], MONTHS[2]))
+    assert len(raw) == 1 and b'"a0000001"' in raw[0]
+
+
+def test_compaction_archives_old_partitions(tmp_path, make_assessment):
+    log = monthly_log(tmp_path / "log", make_assessment)
+
+    assert log.compact("2024-03") == ["2024-01", "2024-02"]
+    archives = [s for s in log.segments() if is_archive(s)]
+    assert [segment_partition(s) for s in archives] == ["2024-01", "2024-02"]
+    assert [a.id for a in log.iter_newest_first()] == ["a0000002", "a0000001", "a0000000"]
+    assert [a.id for a in log.iter_newest_first(date_to=MONTHS[1])] == ["a0000000"]
+    assert log.compact("2024-03") == []
+
+
+def test_rewrite_replaces_the_log(tmp_path, make_assessment):
+    log = monthly_log(tmp_path / "log", make_assessment)
+    log.rewrite([make_assessment(9, timestamp=datetime(2023, 12, 1))])
+
+    assert [a.id for a in log.iter_newest_first()] == ["a0000009"]
+    assert [segment_partition(s) for s in log.segments()] == ["2023-12"]
+
+
+def test_cold_date_query_uses_partitions(make_assessment):
+    storage.get_log().append_many([make_assessment(i, timestamp=ts) for i, ts in enumerate(MONTHS)])
+
+    assert not storage.cache_is_warm()
+    total, items = storage.query_assessments(AssessmentFilters(date_from=MONTHS[1]))
+    assert total == 2
+    assert [a.id for a in items] == ["a0000002", "a0000001"]
+    assert not storage.cache_is_warm()
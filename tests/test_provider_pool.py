@@ -0,0 +1,152 @@
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.services.provider_pool import ProviderHealth, ProviderPool
+from app.services.rate_limiter import LLMUnavailableError
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def two_providers(monkeypatch):
+    monkeypatch.setattr(settings, "llm_providers", ["openai", "groq"])
+    monkeypatch.setattr(settings, "openai_api_key", "key-1")
+    monkeypatch.setattr(settings, "groq_api_key", "key-2")
+    monkeypatch.setattr(settings, "llm_circuit_failures", 2)
+    monkeypatch.setattr(settings, "llm_circuit_cooldown", 0.05)
+    monkeypatch.setattr(settings, "llm_hedge", False)
+
+
+def scripted(**behaviour):
+    """Provider call that returns, raises or sleeps per provider"""
+    calls = []
+
+    async def call(provider):
+        calls.append(provider)
+        action = behaviour[provider]
+        if isinstance(action, Exception):
+            raise action
+        if isinstance(action, tuple):
+            await asyncio.sleep(action[0])
+            action = action[1]
+        return action
+
+    call.calls = calls
+    return call
+
+
+def test_breaker_opens_half_opens_and_closes():
+    health = ProviderHealth("openai")
+    health.record_failure(ProviderError(503))
+    assert health.state == "closed"
+    health.record_failure(ProviderError(503))
+    assert health.state == "open" and not health.available()
+
+    time.sleep(0.06)
+    assert health.state == "half-open" and health.available()
+    health.begin()
+    assert not health.available()  # one trial request at a time
+
+    health.record_success(0.1)
+    assert health.state == "closed" and health.consecutive_failures == 0
+
+
+def test_failed_trial_reopens_the_circuit():
+    health = ProviderHealth("openai")
+    for _ in range(2):
+        health.record_failure(ProviderError(500))
+    time.sleep(0.06)
+    health.begin()
+    health.record_failure(ProviderError(500))
+    assert health.state == "open"
+
+
+def test_prompt_errors_do_not_trip_the_breaker():
+    health = ProviderHealth("openai")
+    for _ in range(5):
+        health.record_failure(ProviderError(400))
+    assert health.state == "closed"
+    assert health.failures == 5
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_the_next_provider():
+    pool = ProviderPool()
+    call = scripted(openai=ProviderError(503), groq="from groq")
+
+    response = await pool.complete(call)
+    assert (response.text, response.provider) == ("from groq", "groq")
+    assert call.calls == ["openai", "groq"]
+
+
+@pytest.mark.asyncio
+async def test_unusable_responses_fail_over_but_are_kept_as_a_fallback():
+    pool = ProviderPool()
+    call = scripted(openai="bad one", groq="bad two")
+
+    response = await pool.complete(call, validate=lambda text: text.startswith("good"))
+    assert (response.text, response.provider) == ("bad one", "openai")
+    assert call.calls == ["openai", "groq"]
+
+
+@pytest.mark.asyncio
+async def test_open_circuits_are_skipped_and_all_open_raises():
+    pool = ProviderPool()
+    call = scripted(openai=ProviderError(503), groq="ok")
+    for _ in range(2):
+        await pool.complete(call)
+    assert pool.health["openai"].state == "open"
+
+    call.calls.clear()
+    await pool.complete(call)
+    assert call.calls == ["groq"]
+
+    for _ in range(2):
+        pool.health["groq"].record_failure(ProviderError(503))
+    with pytest.raises(LLMUnavailableError) as raised:
+        await pool.complete(call)
+    assert 0 < raised.value.retry_after <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge", True)
+    monkeypatch.setattr(settings, "llm_hedge_delay", 0.02)
+    pool = ProviderPool()
+    call = scripted(openai=(1.0, "slow"), groq=(0.0, "fast"))
+
+    started = time.monotonic()
+    response = await pool.complete(call)
+    assert response.provider == "groq"
+    assert time.monotonic() - started < 0.5
+    # The losing request was cancelled without counting against its provider
+    await asyncio.sleep(0)
+    assert pool.health["openai"].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_streams_fail_over_before_the_first_chunk():
+    pool = ProviderPool()
+
+    def open_stream(provider):
+        async def chunks():
+            if provider == "openai":
+                raise ProviderError(502)
+            yield "a"
+            yield "b"
+        return chunks()
+
+    received = [r async for r in pool.stream(open_stream)]
+    assert [(r.text, r.provider) for r in received] == [("a", "groq"), ("b", "groq")]
+    assert pool.health["openai"].failures == 1
+
+
+def test_providers_without_keys_are_skipped(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "")
+    assert ProviderPool().providers() == ["groq"]
+    assert set(ProviderPool().stats()) == {"openai", "groq"}
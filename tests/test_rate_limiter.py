@@ -0,0 +1,163 @@
+import asyncio
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+import pytest
+from app.config import settings
+from app.routes import assess
+from app.services.rate_limiter import (
+    AdaptiveConcurrency, LLMUnavailableError, ProviderLimiter, TokenBucket, is_overload, is_retryable,
+    retry_after_seconds
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_error_classification():
+    assert is_retryable(ProviderError(429)) and is_overload(ProviderError(429))
+    assert is_retryable(ProviderError(503)) and is_overload(ProviderError(503))
+    assert is_retryable(ProviderError(408)) and not is_overload(ProviderError(408))
+    assert not is_retryable(ProviderError(400))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad prompt"))
+
+
+def test_retry_after_formats():
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(ProviderError(429, {"retry-after-ms": "250"})) == 0.25
+    http_date = retry_after_seconds(ProviderError(429, {"retry-after": formatdate(time.time() + 30, usegmt=True)}))
+    assert 25 < http_date <= 30
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+@pytest.mark.asyncio
+async def test_aimd_halves_on_overload_and_grows_additively():
+    concurrency = AdaptiveConcurrency("test", 1, 8)
+    await concurrency.acquire()
+    await concurrency.release(overloaded=True)
+    assert concurrency.limit == 4
+    for _ in range(3):
+        await concurrency.acquire()
+        await concurrency.release(overloaded=True)
+    assert concurrency.limit == 1
+
+    for _ in range(3):
+        await concurrency.acquire()
+        await concurrency.release()
+    # 1 -> 2 -> 2.5 -> 2.9
+    assert int(concurrency.limit) == 2
+    assert concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_blocks_extra_calls():
+    concurrency = AdaptiveConcurrency("test", 1, 2)
+    await concurrency.acquire()
+    await concurrency.acquire()
+    waiter = asyncio.create_task(concurrency.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await concurrency.release()
+    await asyncio.wait_for(waiter, 1)
+    assert concurrency.in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(6000)
+    await bucket.acquire(6000)
+    started = time.monotonic()
+    await bucket.acquire(10)
+    assert time.monotonic() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 3)
+    limiter = ProviderLimiter("mock")
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError(503)
+        return "ok"
+
+    assert await limiter.run(call, 10) == "ok"
+    assert len(attempts) == 3
+    assert limiter.concurrency.limit < settings.llm_max_concurrency
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured_and_exhaustion_raises(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 1)
+    limiter = ProviderLimiter("mock")
+    calls = []
+
+    async def call():
+        calls.append(time.monotonic())
+        raise ProviderError(429, {"retry-after-ms": "60"})
+
+    with pytest.raises(LLMUnavailableError) as raised:
+        await limiter.run(call, 10)
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.055
+    assert raised.value.retry_after == 0.06
+
+
+@pytest.mark.asyncio
+async def test_final_errors_are_not_retried():
+    limiter = ProviderLimiter("mock")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        await limiter.run(call, 10)
+    assert len(calls) == 1
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_streams_retry_only_before_the_first_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 2)
+    limiter = ProviderLimiter("mock")
+    opened = []
+
+    async def chunks():
+        opened.append(1)
+        if len(opened) == 1:
+            raise ProviderError(502)
+        yield "a"
+        yield "b"
+        raise ProviderError(502)
+
+    received = []
+    with pytest.raises(ProviderError):
+        async for chunk in limiter.stream(chunks, 10):
+            received.append(chunk)
+    assert received == ["a", "b"]
+    assert len(opened) == 2
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_unavailable_providers_return_503_with_retry_after(client, monkeypatch):
+    async def build(request):
+        raise LLMUnavailableError("openai", ProviderError(429), retry_after=12.5)
+
+    monkeypatch.setattr(assess, "build_assessment", build)
+    response = client.post("/api/assess", json={
+        "title": "T", "abstract": "A", "dissemination": "Preprint / arXiv only", "audience": "Domain experts only"
+    })
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "12"
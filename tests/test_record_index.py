@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from app.models import AssessmentFilters, Tier
+from app.services import storage
+from app.services.record_index import SIDECAR_SUFFIX, RecordIndex
+from app.services.segment_log import SegmentLog
+
+BASE = datetime(2024, 1, 20)
+
+
+def build_log(directory, make_assessment, count=6, **kwargs):
+    log = SegmentLog(directory, 2000, "month", **kwargs)
+    log.append_many([make_assessment(i, timestamp=BASE + timedelta(days=5 * i)) for i in range(count)])
+    return log
+
+
+def test_lookup_by_id_decodes_one_record(tmp_path, make_assessment, monkeypatch):
+    log = build_log(tmp_path / "log", make_assessment)
+    index = RecordIndex(log)
+    assert index.refresh() == 6
+
+    monkeypatch.setattr(log, "iter_newest_first", None)  # the index never scans the log
+    assert index.get("a0000003") == make_assessment(3, timestamp=BASE + timedelta(days=15))
+    assert index.get("missing") is None
+    index.close()
+
+
+def test_pages_follow_cursor_and_filters(tmp_path, make_assessment):
+    log = SegmentLog(tmp_path / "log", 2000)
+    log.append_many([make_assessment(i, tier=Tier.HIGH if i % 2 else Tier.LOW) for i in range(6)])
+    index = RecordIndex(log)
+
+    first = index.page(2)
+    assert [a.id for a in first] == ["a0000005", "a0000004"]
+    key = (first[-1].naive_timestamp(), first[-1].id)
+    assert [a.id for a in index.page(2, key)] == ["a0000003", "a0000002"]
+    assert [a.id for a in index.page(10, filters=AssessmentFilters(tier="High"))] == [
+        "a0000005", "a0000003", "a0000001"
+    ]
+    index.close()
+
+
+def test_date_bounds_are_resolved_on_the_index(tmp_path, make_assessment):
+    index = RecordIndex(build_log(tmp_path / "log", make_assessment))
+    filters = AssessmentFilters(date_from=BASE + timedelta(days=5), date_to=BASE + timedelta(days=15))
+
+    assert [a.id for a in index.page(10, filters=filters)] == ["a0000002", "a0000001"]
+    index.close()
+
+
+def test_sidecars_are_reused_and_extended(tmp_path, make_assessment):
+    log = build_log(tmp_path / "log", make_assessment)
+    RecordIndex(log).refresh()
+    sidecars = sorted(p.name for p in (tmp_path / "log").glob(f"*{SIDECAR_SUFFIX}"))
+    assert sidecars == sorted(s.name + SIDECAR_SUFFIX for s in log.segments())
+
+    index = RecordIndex(log)
+    index.refresh()
+    log.append(make_assessment(6, timestamp=BASE + timedelta(days=40)))
+    assert index.refresh() == 7
+    assert index.get("a0000006").id == "a0000006"
+    # An out-of-order record forces a rebuild of the merged order
+    log.append(make_assessment(7, timestamp=BASE - timedelta(days=1)))
+    assert [a.id for a in index.page(10)][-1] == "a0000007"
+    index.close()
+
+
+def test_compacted_archives_are_indexed(tmp_path, make_assessment):
+    log = build_log(tmp_path / "log", make_assessment)
+    index = RecordIndex(log)
+    index.refresh()
+    index.close()
+    log.compact("2024-03")
+
+    assert index.refresh() == 6
+    assert index.get("a0000000").id == "a0000000"
+    assert [a.id for a in index.page(3)] == ["a0000005", "a0000004", "a0000003"]
+    index.close()
+
+
+def test_cold_storage_reads_use_the_index(make_assessment):
+    storage.get_log().append_many([make_assessment(i) for i in range(3)])
+
+    assert storage.get_assessment("a0000001").id == "a0000001"
+    assert [a.id for a in storage.page_assessments(2)] == ["a0000002", "a0000001"]
+    assert not storage.cache_is_warm()
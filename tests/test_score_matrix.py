@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from app.models import AssessmentFilters, ResearchCategory, Tier
+from app.services import score_matrix, storage
+from app.services.score_matrix import ScoreMatrix
+
+AXES = ["A1", "A2", "C1", "D1"]
+
+
+def test_stats_counts_and_axis_averages(make_assessment):
+    reversed_c1 = make_assessment(1, tier=Tier.HIGH, scores={"A1": 3, "C1": 1})
+    reversed_c1.scores.scores["C1"].reverse_scored = True
+    matrix = ScoreMatrix.from_assessments([
+        make_assessment(0, scores={"A1": 1, "A2": 2}),
+        reversed_c1,
+        make_assessment(2, tier=Tier.CRITICAL, category=ResearchCategory.NUCLEAR, scores={"A1": 2, "D1": 3}),
+    ], AXES)
+
+    stats = matrix.stats(AssessmentFilters())
+    assert stats["total_assessed"] == 3
+    assert stats["risk_distribution"] == {"Low": 1, "Medium": 0, "High": 1, "Critical": 1}
+    assert stats["high_critical_count"] == 2
+    assert stats["category_distribution"] == {"nuclear": 1, "ai_ml": 2}
+    # C1 is reverse scored: 3 - 1
+    assert stats["axis_averages"] == {"A1": 2.0, "A2": 2.0, "C1": 2.0, "D1": 3.0}
+    assert stats["most_stressed_axis"] == {"axis": "D1", "average": 3.0}
+    assert stats["recent_high_risk"]["id"] == "a0000002"
+
+
+def test_filters_mask_rows(make_assessment):
+    matrix = ScoreMatrix.from_assessments([
+        make_assessment(0, tier=Tier.HIGH),
+        make_assessment(1, category=ResearchCategory.CHEMISTRY),
+        make_assessment(2, timestamp=datetime(2024, 6, 1)),
+    ], AXES)
+
+    assert matrix.stats(AssessmentFilters(tier="High"))["total_assessed"] == 1
+    assert matrix.stats(AssessmentFilters(category="chemistry"))["total_assessed"] == 1
+    assert matrix.stats(AssessmentFilters(category="not-a-category"))["total_assessed"] == 0
+    assert matrix.stats(AssessmentFilters(date_from=datetime(2024, 5, 1)))["total_assessed"] == 1
+
+
+def test_unknown_axes_and_uncategorized_papers(make_assessment):
+    matrix = ScoreMatrix.from_assessments([make_assessment(0, category=None, scores={"Z9": 2})], AXES)
+
+    assert matrix.axis_ids[-1] == "Z9"
+    stats = matrix.stats(AssessmentFilters())
+    assert stats["axis_averages"] == {"Z9": 2.0}
+    assert stats["category_distribution"] == {"unknown": 1}
+
+
+def test_trend_groups_by_day(make_assessment):
+    day = datetime(2024, 3, 1, 10)
+    matrix = ScoreMatrix.from_assessments([
+        make_assessment(0, timestamp=day),
+        make_assessment(1, timestamp=day + timedelta(hours=2), tier=Tier.HIGH),
+        make_assessment(2, timestamp=day + timedelta(days=2)),
+    ], AXES)
+
+    assert matrix.stats(AssessmentFilters())["trend_data"] == [
+        {"date": "2024-03-01", "total": 2, "high_critical": 1},
+        {"date": "2024-03-03", "total": 1, "high_critical": 0},
+    ]
+
+
+def test_matrix_is_extended_by_local_writes_and_rebuilt_after_external_ones(make_assessment):
+    storage.persist_assessments([make_assessment(0)])
+    matrix = score_matrix.get_score_matrix()
+    assert len(matrix) == 1
+
+    storage.persist_assessments([make_assessment(1)])
+    assert score_matrix.get_score_matrix() is matrix
+    assert len(matrix) == 2
+
+    storage.get_log().append(make_assessment(2))
+    rebuilt = score_matrix.get_score_matrix()
+    assert rebuilt is not matrix
+    assert len(rebuilt) == 3
+
+
+def test_current_matrix_is_served_without_reading_the_store(make_assessment, monkeypatch):
+    storage.persist_assessments([make_assessment(0)])
+    matrix = score_matrix.get_score_matrix()
+    storage.persist_assessments([make_assessment(1)])
+
+    def fail():
+        raise AssertionError("the store was read for an up-to-date matrix")
+
+    monkeypatch.setattr(storage, "get_all_assessments", fail)
+    assert score_matrix.get_score_matrix() is matrix
+    assert len(matrix) == 2
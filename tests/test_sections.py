@@ -0,0 +1,78 @@
+import json
+import pytest
+from app.config import settings
+from app.services import mock_llm, risk_scorer
+from app.services.risk_scorer import AxesSnapshot, get_axes_snapshot, score_research
+
+
+@pytest.fixture
+def sections_mode(monkeypatch):
+    monkeypatch.setattr(settings, "scoring_mode", "sections")
+    prompts = []
+    original = mock_llm.complete
+
+    async def recorded(prompt, schema=None):
+        prompts.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", recorded)
+    return prompts
+
+
+def scoring_prompts(prompts):
+    return [p for p in prompts if '{"score": <0-3>' in p]
+
+
+@pytest.mark.asyncio
+async def test_each_section_is_scored_by_its_own_call(sections_mode, monkeypatch):
+    snapshot = get_axes_snapshot()
+    monkeypatch.setattr(AxesSnapshot, "build_prompt", lambda *args: pytest.fail("single-mode prompt built"))
+
+    result = await score_research("Gene drive design", "We design a gene drive for mosquitoes.")
+
+    assert len(scoring_prompts(sections_mode)) == len(snapshot.sections)
+    assert list(result.scores.scores) == [a.id for a in snapshot.axes]
+    assert all(not s.rationale.startswith("No valid score") for s in result.scores.scores.values())
+    assert result.category is not None
+    assert result.provider == "mock"
+
+
+@pytest.mark.asyncio
+async def test_section_prompts_only_ask_for_their_axes(sections_mode):
+    snapshot = get_axes_snapshot()
+    await score_research("Paper", "Abstract text.")
+
+    for section in snapshot.sections:
+        prompt = next(p for p in scoring_prompts(sections_mode) if p.startswith(section.prompt_prefix))
+        asked = {a.id for a in snapshot.axes if f'"{a.id}": {{"score": <0-3>' in prompt}
+        assert asked == {a.id for a in section.axes}
+
+
+@pytest.mark.asyncio
+async def test_axes_left_out_of_a_section_response_are_re_asked(sections_mode, monkeypatch):
+    snapshot = get_axes_snapshot()
+    dropped = snapshot.sections[0].axes[0].id
+    original = mock_llm.synthesize
+
+    def without_first_axis(prompt):
+        text = original(prompt)
+        if prompt.startswith(snapshot.sections[0].prompt_prefix):
+            data = json.loads(text.removeprefix("```json\n").removesuffix("\n```"))
+            data.pop(dropped)
+            return json.dumps(data)
+        return text
+
+    monkeypatch.setattr(mock_llm, "synthesize", without_first_axis)
+    result = await score_research("Paper", "Abstract text.")
+
+    assert len(scoring_prompts(sections_mode)) == len(snapshot.sections) + 1
+    assert not result.scores.scores[dropped].rationale.startswith("No valid score")
+
+
+def test_merge_keeps_axes_order():
+    snapshot = get_axes_snapshot()
+    axes = list(snapshot.axes)
+    parts = [
+        risk_scorer.build_default_scores([a.id for a in s.axes], {}, "r") for s in reversed(snapshot.sections)
+    ]
+    assert list(risk_scorer.merge_section_scores(axes, parts).scores) == [a.id for a in axes]
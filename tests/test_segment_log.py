@@ -0,0 +1,109 @@
+import json
+from app.config import settings
+from app.models import AssessmentsStore
+from app.services import storage
+from app.services.segment_log import SegmentLog
+
+
+def open_log(directory, max_bytes=1024 * 1024):
+    return SegmentLog(directory, max_bytes)
+
+
+def test_append_and_read_newest_first(tmp_path, make_assessment):
+    log = open_log(tmp_path / "log")
+    log.append_many([make_assessment(i) for i in range(3)])
+    log.append(make_assessment(3))
+
+    assert [a.id for a in log.iter_newest_first()] == ["a0000003", "a0000002", "a0000001", "a0000000"]
+
+
+def test_segments_rotate_past_max_size(tmp_path, make_assessment):
+    log = open_log(tmp_path / "log", max_bytes=1500)
+    log.append_many([make_assessment(i) for i in range(10)])
+
+    segments = log.segments()
+    assert len(segments) > 1
+    assert all(p.stat().st_size <= 1500 or log.manifest().segments[p.name].count == 1 for p in segments)
+    assert [a.id for a in log.iter_newest_first()] == [f"a{i:07d}" for i in reversed(range(10))]
+
+
+def test_manifest_tracks_counts_and_time_range(tmp_path, make_assessment):
+    log = open_log(tmp_path / "log")
+    records = [make_assessment(i) for i in range(4)]
+    log.append_many(records)
+
+    infos = list(log.manifest().segments.values())
+    assert sum(info.count for info in infos) == 4
+    assert min(info.min_ts for info in infos) == records[0].timestamp
+    assert max(info.max_ts for info in infos) == records[-1].timestamp
+
+
+def test_torn_tail_is_skipped_and_segment_sealed(tmp_path, make_assessment):
+    log = open_log(tmp_path / "log")
+    log.append_many([make_assessment(0), make_assessment(1)])
+    segment = log.segments()[-1]
+    with open(segment, "ab") as f:
+        f.write(b'{"id": "a0000002", "timest')
+    (tmp_path / "log" / "manifest.json").unlink()
+
+    reopened = open_log(tmp_path / "log")
+    assert [a.id for a in reopened.iter_newest_first()] == ["a0000001", "a0000000"]
+    assert reopened.manifest().segments[segment.name].sealed
+
+    reopened.append(make_assessment(3))
+    assert reopened.segments()[-1] != segment
+    assert [a.id for a in reopened.iter_newest_first()] == ["a0000003", "a0000001", "a0000000"]
+
+
+def test_legacy_store_is_migrated_once(make_assessment):
+    legacy = [make_assessment(i) for i in reversed(range(3))]
+    settings.data_dir.mkdir(parents=True)
+    settings.assessments_file.write_text(
+        json.dumps(AssessmentsStore(assessments=legacy).model_dump(mode="json")), encoding="utf-8"
+    )
+
+    log = storage.get_log()
+    assert [a.id for a in log.iter_newest_first()] == ["a0000002", "a0000001", "a0000000"]
+    assert not settings.assessments_file.exists()
+    assert settings.assessments_file.with_name("assessments.json.migrated").exists()
+
+    assert storage.migrate_legacy_store(storage.get_log()) == 0
+    assert len(list(storage.get_log().iter_newest_first())) == 3
+
+
+def test_persisted_assessments_are_read_back(make_assessment):
+    storage.persist_assessments([make_assessment(0), make_assessment(1)])
+
+    assert [a.id for a in storage.get_all_assessments()] == ["a0000001", "a0000000"]
+    assert storage.get_assessment("a0000000").input.title == "Paper 0"
+
+
+def test_appends_reuse_the_manifest_in_memory(tmp_path, make_assessment, monkeypatch):
+    log = open_log(tmp_path / "log", max_bytes=1500)
+    log.append(make_assessment(0))
+    listings = []
+    files = log._files
+
+    def spy():
+        listings.append(1)
+        return files()
+
+    monkeypatch.setattr(log, "_files", spy)
+    log.append_many([make_assessment(i) for i in range(1, 10)])
+    assert listings == []
+    assert sum(info.count for info in log.manifest().segments.values()) == 10
+    assert len(log.segments()) > 1
+
+
+def test_appends_from_another_instance_are_picked_up(tmp_path, make_assessment):
+    log = open_log(tmp_path / "log")
+    log.append(make_assessment(0))
+    open_log(tmp_path / "log").append(make_assessment(1))
+
+    log.append(make_assessment(2))
+    assert sum(info.count for info in log.manifest().segments.values()) == 3
+    assert [a.id for a in log.iter_newest_first()] == ["a0000002", "a0000001", "a0000000"]
+
+
+def test_the_log_is_opened_once_per_process():
+    assert storage.get_log() is storage.get_log()
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.services import mock_llm
+from app.services.risk_scorer import score_research
+from app.services.single_flight import SingleFlight, flight_key, normalize_text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight("test")
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert started == [1]
+    assert flights.counters == {"calls": 1, "coalesced": 4}
+    assert flights.in_flight() == 0
+
+    # Nothing is kept once the call has finished
+    await flights.do("k", work)
+    assert len(started) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flights = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail), return_exceptions=True)
+    assert [str(r) for r in results] == ["boom", "boom"]
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("k", work))
+    second = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_every_caller_leaves():
+    flights = SingleFlight("test")
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(flights.do("k", work))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flights.in_flight() == 0
+
+
+def test_keys_ignore_whitespace_differences():
+    assert normalize_text("  A   paper\ntitle ") == "A paper title"
+    assert flight_key(normalize_text("A  paper"), 1) == flight_key(normalize_text("A paper"), 1)
+    assert flight_key("a", 1) != flight_key("a", 2)
+
+
+@pytest.mark.asyncio
+async def test_identical_submissions_score_once(monkeypatch):
+    monkeypatch.setattr(settings, "mock_latency_ms", 20)
+    monkeypatch.setattr(settings, "mock_latency_distribution", "fixed")
+    calls = []
+    original = mock_llm.complete
+
+    async def counted(prompt, schema=None):
+        calls.append(prompt)
+        return await original(prompt, schema)
+
+    monkeypatch.setattr(mock_llm, "complete", counted)
+
+    results = await asyncio.gather(
+        score_research("Gene drive design", "We design a gene drive."),
+        score_research("Gene  drive design", " We design a gene drive. "),
+    )
+    assert results[0] is results[1]
+    single = len(calls)
+    await score_research("Another paper", "Different content.")
+    assert len(calls) == 2 * single
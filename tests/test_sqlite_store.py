@@ -0,0 +1,105 @@
+from datetime import datetime
+from app.config import settings
+from app.models import AssessmentFilters, ResearchCategory, Tier
+from app.services import storage
+from app.services.sqlite_store import SqliteStore
+
+
+def test_append_get_and_replace(tmp_path, make_assessment):
+    store = SqliteStore(tmp_path / "a.db")
+    assert store.is_empty()
+    store.append_many([make_assessment(0), make_assessment(1)])
+
+    assert store.get("a0000001").input.title == "Paper 1"
+    assert store.get("missing") is None
+    store.append_many([make_assessment(1, title="Revised")])
+    assert store.get("a0000001").input.title == "Revised"
+    assert [a.id for a in store.iter_newest_first()] == ["a0000001", "a0000000"]
+
+    store.replace_all([make_assessment(5)])
+    assert [a.id for a in store.iter_newest_first()] == ["a0000005"]
+    store.close()
+
+
+def test_query_filters_and_counts(tmp_path, make_assessment):
+    store = SqliteStore(tmp_path / "a.db")
+    store.append_many([
+        make_assessment(0, tier=Tier.HIGH, category=ResearchCategory.NUCLEAR),
+        make_assessment(1, tier=Tier.LOW),
+        make_assessment(2, tier=Tier.HIGH),
+    ])
+
+    total, items = store.query(AssessmentFilters(tier="High"), limit=1)
+    assert total == 2
+    assert [a.id for a in items] == ["a0000002"]
+    total, items = store.query(AssessmentFilters(tier="High", category="nuclear"))
+    assert (total, [a.id for a in items]) == (1, ["a0000000"])
+    store.close()
+
+
+def test_equal_timestamps_order_by_id(tmp_path, make_assessment):
+    store = SqliteStore(tmp_path / "a.db")
+    ts = datetime(2024, 5, 1, 9, 0, 0)
+    store.append_many([make_assessment(i, timestamp=ts) for i in (2, 0, 3, 1)])
+
+    expected = ["a0000003", "a0000002", "a0000001", "a0000000"]
+    assert [a.id for a in store.iter_newest_first()] == expected
+    assert [a.id for a in store.query(AssessmentFilters())[1]] == expected
+    pages = [a.id for offset in (0, 2) for a in store.query(AssessmentFilters(), 2, offset)[1]]
+    assert pages == expected
+    first = store.page(AssessmentFilters(), 2)
+    rest = store.page(AssessmentFilters(), 2, before=(ts, first[-1].id))
+    assert [a.id for a in first + rest] == expected
+    store.close()
+
+
+def test_fingerprint_and_marker_change_on_write(tmp_path, make_assessment):
+    store = SqliteStore(tmp_path / "a.db")
+    fingerprint, marker = store.fingerprint(), store.marker()
+    store.append_many([make_assessment(0)])
+    assert store.fingerprint() != fingerprint
+    assert store.marker() != marker
+    store.close()
+
+
+def test_marker_never_repeats_after_replace_all(tmp_path, make_assessment):
+    store = SqliteStore(tmp_path / "a.db")
+    store.append_many([make_assessment(0), make_assessment(1)])
+    seen = [store.marker()]
+
+    # Same row count and newest timestamp, different content
+    store.replace_all([make_assessment(0, tier=Tier.HIGH), make_assessment(1, tier=Tier.HIGH)])
+    seen.append(store.marker())
+    store.replace_all([make_assessment(0), make_assessment(1)])
+    seen.append(store.marker())
+    store.close()
+
+    reopened = SqliteStore(tmp_path / "a.db")
+    assert reopened.marker() == seen[-1]
+    assert len({tuple(m) for m in seen}) == 3
+    reopened.close()
+
+
+def test_backend_imports_json_log(monkeypatch, make_assessment):
+    storage.persist_assessments([make_assessment(0), make_assessment(1)])
+    monkeypatch.setattr(settings, "storage_backend", "sqlite")
+
+    assert isinstance(storage.get_backend(), SqliteStore)
+    assert [a.id for a in storage.get_all_assessments()] == ["a0000001", "a0000000"]
+    storage.persist_assessments([make_assessment(2)])
+    assert storage.get_assessment("a0000002").id == "a0000002"
+    total, _ = storage.query_assessments(AssessmentFilters())
+    assert total == 3
+
+
+def test_dashboard_dates_with_an_offset_are_compared_as_utc(client, monkeypatch, make_assessment):
+    storage.persist_assessments([make_assessment(0, timestamp=datetime(2024, 5, 1, 9)), make_assessment(1)])
+    params = {"date_from": "2024-05-01T10:00:00+02:00", "tier": "all"}
+
+    for backend in ("json", "sqlite"):
+        monkeypatch.setattr(settings, "storage_backend", backend)
+        stats = client.get("/api/dashboard/stats", params=params)
+        assert stats.status_code == 200
+        assert stats.json()["total_assessed"] == 1
+        listed = client.get("/api/dashboard/assessments", params={"date_from": "2024-05-01T08:00:00Z"})
+        assert [a["id"] for a in listed.json()["assessments"]] == ["a0000000"]
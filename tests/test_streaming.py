@@ -0,0 +1,94 @@
+import json
+import pytest
+from app.models import RiskAxis
+from app.routes import assess
+from app.services import risk_scorer, storage
+from app.services.provider_pool import LLMResponse
+from app.services.rate_limiter import LLMUnavailableError
+from app.services.risk_scorer import AxisStreamParser, get_universal_axes, score_research_stream
+
+PAPER = {
+    "title": "Automated exploit generation with language models",
+    "abstract": "We fine-tune a language model to write working exploits for known vulnerabilities.",
+    "dissemination": "Preprint / arXiv only",
+    "audience": "Broad developer community",
+}
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_parser_emits_each_axis_as_soon_as_it_closes():
+    axes = [RiskAxis(id="A1", name="A", question="?"), RiskAxis(id="C1", name="C", question="?", reverse_scored=True)]
+    parser = AxisStreamParser(axes)
+    text = '```json\n{"category": "ai_ml", "A1": {"score": 2, "rationale": "has {braces} and \\"quotes\\""}, ' \
+           '"C1": {"score": 1, "rationale": "r"}}\n```'
+
+    events = []
+    for i in range(0, len(text), 7):
+        events.extend(parser.feed(text[i:i + 7]))
+
+    assert [e[0] for e in events] == ["category", "axis", "axis"]
+    assert events[0][1] == "ai_ml"
+    axis_id, score = events[1][1]
+    assert (axis_id, score.score, score.rationale) == ("A1", 2, 'has {braces} and "quotes"')
+    assert events[2][1][1].reverse_scored
+
+
+def test_stream_sends_progress_then_the_stored_assessment(client):
+    response = client.post("/api/assess/stream", json=PAPER)
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "axes"
+    assert names[-4:] == ["scores", "tier", "recommendations", "assessment"]
+    axis_events = [data["id"] for name, data in events if name == "axis"]
+    assert sorted(axis_events) == sorted(a.id for a in get_universal_axes())
+
+    assessment = events[-1][1]
+    assert storage.get_assessment(assessment["id"]).input.title == PAPER["title"]
+    assert set(assessment["scores"]["scores"]) == set(axis_events)
+
+
+def test_failures_after_the_stream_starts_arrive_as_error_events(client, monkeypatch):
+    async def failing(request):
+        yield "axes", []
+        raise LLMUnavailableError("mock", RuntimeError("overloaded"), retry_after=3.0)
+
+    monkeypatch.setattr(assess, "stream_assessment", failing)
+    events = parse_events(client.post("/api/assess/stream", json=PAPER).text)
+
+    assert [name for name, _ in events] == ["axes", "error"]
+    assert events[1][1]["retry_after"] == 3.0
+    assert list(storage.get_all_assessments()) == []
+
+
+def test_empty_abstract_is_rejected_before_streaming(client):
+    assert client.post("/api/assess/stream", json={**PAPER, "abstract": " "}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_a_failure_mid_stream_keeps_the_axes_already_sent(monkeypatch):
+    async def broken_stream(prompt, schema=None):
+        text = '{"category": "Security", "A1": {"score": 3, "rationale": "r"}, '
+        yield LLMResponse(text=text, provider="mock", model="mock-model")
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(risk_scorer, "stream_llm", broken_stream)
+    events = [event async for event in score_research_stream(PAPER["title"], PAPER["abstract"])]
+
+    assert [name for name, _ in events] == ["axes", "category", "axis", "result"]
+    assert events[1][1] == "cybersecurity"
+    result = events[-1][1]
+    assert result.category == "cybersecurity"
+    assert result.scores.scores["A1"].score == 3
+    assert all(
+        score.score == 0 and "connection reset" in score.rationale
+        for axis_id, score in result.scores.scores.items() if axis_id != "A1"
+    )
@@ -0,0 +1,103 @@
+import pytest
+from app.config import settings
+from app.models import AssessRequest, Audience, Dissemination
+from app.services import risk_scorer, token_budget
+from app.services.pipeline import build_assessment
+from app.services.risk_scorer import AxesSnapshot, budgeted_prompt, get_universal_axes
+from app.services.token_budget import (
+    TRUNCATION_MARK, budget_tokens, count_tokens, fit_paper, metered, provider_usage, record_usage,
+    truncate_to_tokens
+)
+
+LONG_TEXT = " ".join(f"word{i}" for i in range(2000))
+
+
+def test_truncation_cuts_at_a_word_and_marks_the_cut():
+    cut = truncate_to_tokens(LONG_TEXT, 100, "anthropic")
+
+    assert cut.endswith(TRUNCATION_MARK)
+    assert budget_tokens(cut, "anthropic") <= 100
+    assert LONG_TEXT.startswith(cut.removesuffix(TRUNCATION_MARK) + " ")
+    assert truncate_to_tokens("short text", 100, "anthropic") == "short text"
+    assert truncate_to_tokens(LONG_TEXT, 1, "anthropic") == ""
+
+
+def test_fit_paper_cuts_the_snippet_before_the_abstract():
+    abstract = " ".join(f"abstract{i}" for i in range(100))
+    assert fit_paper("Title", abstract, LONG_TEXT, 100_000, "anthropic") == (abstract, LONG_TEXT)
+
+    fitted_abstract, snippet = fit_paper("Title", abstract, LONG_TEXT, 600, "anthropic")
+    assert fitted_abstract == abstract
+    assert snippet.endswith(TRUNCATION_MARK)
+
+    fitted_abstract, snippet = fit_paper("Title", LONG_TEXT, LONG_TEXT, 300, "anthropic")
+    assert snippet is None
+    assert fitted_abstract.endswith(TRUNCATION_MARK)
+    assert budget_tokens("Title", "anthropic") + budget_tokens(fitted_abstract, "anthropic") <= 300
+
+
+def test_pasted_pdf_text_is_squeezed_before_cutting():
+    abstract = "A hyphen-\nated   word\n\nsplit " * 200
+    assert budget_tokens(abstract, "anthropic") > 1500
+    fitted, _ = fit_paper("T", abstract, None, 1500, "anthropic")
+    assert fitted == "A hyphenated word split " * 199 + "A hyphenated word split"
+
+
+def test_calibration_changes_estimates_but_not_prompts(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "anthropic")
+    monkeypatch.setattr(settings, "scoring_prompt_max_tokens", 800)
+    prompt = budgeted_prompt("PREFIX ", " SUFFIX", "Title", LONG_TEXT, None)
+    estimate = count_tokens(LONG_TEXT, "anthropic")
+
+    # The provider reports half as many tokens as estimated, several times
+    for _ in range(20):
+        record_usage("anthropic", LONG_TEXT, estimate // 2, "ok", 1)
+
+    assert count_tokens(LONG_TEXT, "anthropic") < estimate
+    assert budget_tokens(LONG_TEXT, "anthropic") == estimate
+    assert budgeted_prompt("PREFIX ", " SUFFIX", "Title", LONG_TEXT, None) == prompt
+
+
+def test_snapshot_tokenizes_its_static_prompt_once_per_provider(monkeypatch):
+    snapshot = AxesSnapshot.build(get_universal_axes(), None)
+    counted = []
+
+    def counting(text, provider=None):
+        counted.append(provider)
+        return budget_tokens(text, provider)
+
+    monkeypatch.setattr(risk_scorer, "budget_tokens", counting)
+    first = snapshot.build_prompt("Title", "Short abstract.", None)
+    assert snapshot.build_prompt("Title", "Short abstract.", None) == first
+    snapshot.build_prompt("Another title", "Another abstract.", None)
+    assert counted == ["mock"]
+
+    monkeypatch.setattr(settings, "llm_provider", "anthropic")
+    snapshot.build_prompt("Title", "Short abstract.", None)
+    assert counted == ["mock", "anthropic"]
+
+
+def test_usage_is_totalled_per_provider_and_metered_per_block():
+    with metered() as usage:
+        record_usage("groq", "prompt text", 10, "completion", 5)
+        record_usage("groq", "prompt text", None, "completion", None)
+    record_usage("groq", "outside", 7, "x", 1)
+
+    assert usage.prompt_tokens == 10 + count_tokens("prompt text", "groq")
+    assert usage.completion_tokens == 5 + count_tokens("completion", "groq")
+    totals = provider_usage("groq")
+    assert totals["calls"] == 3
+    assert totals["prompt_tokens"] == usage.prompt_tokens + 7
+
+
+@pytest.mark.asyncio
+async def test_assessments_record_their_token_usage():
+    assessment = await build_assessment(AssessRequest(
+        title="Gene drive design",
+        abstract="We design a gene drive for mosquitoes.",
+        dissemination=Dissemination.PREPRINT,
+        audience=Audience.EXPERTS
+    ))
+
+    assert assessment.prompt_tokens > 0 and assessment.completion_tokens > 0
+    assert token_budget.provider_usage("mock")["prompt_tokens"] == assessment.prompt_tokens
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from app.services import storage
+from app.services.write_queue import GroupCommitWriter
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_a_batch(make_assessment):
+    batches = []
+    writer = GroupCommitWriter(batches.append, max_batch_size=100, max_delay_seconds=0.05)
+    writer.start()
+
+    await asyncio.gather(*(writer.submit([make_assessment(i)]) for i in range(5)))
+    await writer.stop()
+
+    assert len(batches) == 1
+    assert sorted(a.id for a in batches[0]) == [f"a{i:07d}" for i in range(5)]
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_size(make_assessment):
+    batches = []
+    writer = GroupCommitWriter(batches.append, max_batch_size=2, max_delay_seconds=0.05)
+    writer.start()
+
+    await asyncio.gather(*(writer.submit([make_assessment(i)]) for i in range(5)))
+    await writer.stop()
+
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_flush_errors_reach_every_waiter(make_assessment):
+    def fail(records):
+        raise OSError("disk full")
+
+    writer = GroupCommitWriter(fail, max_batch_size=10, max_delay_seconds=0.01)
+    writer.start()
+    results = await asyncio.gather(
+        writer.submit([make_assessment(0)]), writer.submit([make_assessment(1)]), return_exceptions=True
+    )
+    await writer.stop()
+
+    assert all(isinstance(r, OSError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_writes(make_assessment):
+    batches = []
+    writer = GroupCommitWriter(batches.append, max_batch_size=100, max_delay_seconds=10)
+    writer.start()
+
+    pending = asyncio.create_task(writer.submit([make_assessment(0)]))
+    await asyncio.sleep(0)
+    await writer.stop()
+    await pending
+
+    assert [a.id for a in batches[0]] == ["a0000000"]
+
+
+@pytest.mark.asyncio
+async def test_storage_writes_through_the_writer(make_assessment):
+    storage.start_writer()
+    try:
+        await asyncio.gather(*(storage.add_assessment(make_assessment(i)) for i in range(3)))
+    finally:
+        await storage.stop_writer()
+
+    assert [a.id for a in storage.get_all_assessments()] == ["a0000002", "a0000001", "a0000000"]
+
+
+@pytest.mark.asyncio
+async def test_submissions_after_stop_are_written_directly(make_assessment):
+    batches = []
+    writer = GroupCommitWriter(batches.append, max_batch_size=100, max_delay_seconds=10)
+    writer.start()
+
+    stopping = asyncio.create_task(writer.stop())
+    await asyncio.sleep(0)
+    await asyncio.wait_for(writer.submit([make_assessment(0)]), 1)
+    await stopping
+    await asyncio.wait_for(writer.submit([make_assessment(1)]), 1)
+
+    assert [[a.id for a in b] for b in batches] == [["a0000000"], ["a0000001"]]